@@ -2,6 +2,8 @@
 import django_filters as df
 from django.db.models import Q
 
+from core.utils.searchIndex import search_queryset
+
 from .models import (
     ChartofAccounts,
     BankAccounts,
@@ -84,6 +86,9 @@ class JournalVoucherFilter(df.FilterSet):
         fields = ["approved", "active", "branch", "approved_by", "jv_no"]
 
     def filter_q(self, qs, name, value):
+        indexed = search_queryset(qs, [value], JournalVoucher.search_index_fields)
+        if indexed is not None:
+            return indexed
         return qs.filter(Q(jv_no__icontains=value) | Q(description__icontains=value))
 
 
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_initial'),
+        ('master', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['branch', 'posting_date', 'id'], name='accounting__branch__ffacdb_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def fill_period_balances(apps, schema_editor):
+    GeneralLedger = apps.get_model("accounting", "GeneralLedger")
+    PeriodBalance = apps.get_model("accounting", "GeneralLedgerPeriodBalance")
+    db = schema_editor.connection.alias
+    totals = (
+        GeneralLedger.objects.using(db)
+        .annotate(period=TruncMonth("posting_date"))
+        .values("branch_id", "account_id", "period")
+        .annotate(total_debit=Sum("debit"), total_credit=Sum("credit"), count=Count("id"))
+        .order_by()
+    )
+    PeriodBalance.objects.using(db).bulk_create(
+        (
+            PeriodBalance(
+                branch_id=row["branch_id"], account_id=row["account_id"], period=row["period"],
+                debit=row["total_debit"] or 0, credit=row["total_credit"] or 0, entries=row["count"],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_generalledger_accounting__branch__ffacdb_idx'),
+        ('master', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneralLedgerPeriodBalance',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('period', models.DateField(help_text='First day of the month.')),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('entries', models.PositiveIntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='period_balances', to='accounting.chartofaccounts')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_branch', to='master.branch')),
+            ],
+            options={
+                'verbose_name': 'General Ledger Period Balance',
+                'verbose_name_plural': 'General Ledger Period Balances',
+                'indexes': [models.Index(fields=['account', 'period'], name='accounting__account_f8898b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('branch', 'account', 'period'), name='uniq_gl_period_balance')],
+            },
+        ),
+        migrations.RunPython(fill_period_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_gl_period_balance'),
+        ('master', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['account', 'posting_date', 'id'], name='accounting__account_e7bb5b_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:49
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_periods(apps, schema_editor):
+    """Fold the duplicate rows concurrent postings without a branch could leave into one per period."""
+    PeriodBalance = apps.get_model("accounting", "GeneralLedgerPeriodBalance")
+    db = schema_editor.connection.alias
+    rows = PeriodBalance.objects.using(db).filter(branch__isnull=True)
+    duplicates = (
+        rows.values("account_id", "period")
+        .annotate(n=Count("id"), total_debit=Sum("debit"), total_credit=Sum("credit"), total_entries=Sum("entries"))
+        .filter(n__gt=1)
+        .order_by()
+    )
+    for row in list(duplicates):
+        same = rows.filter(account_id=row["account_id"], period=row["period"]).order_by("id")
+        keep = same.first()
+        same.exclude(pk=keep.pk).delete()
+        keep.debit, keep.credit, keep.entries = row["total_debit"], row["total_credit"], row["total_entries"]
+        keep.save(update_fields=["debit", "credit", "entries"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0006_gl_account_statement_index'),
+        ('master', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_periods, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='generalledgerperiodbalance',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', True)), fields=('account', 'period'), name='uniq_gl_period_balance_no_branch'),
+        ),
+    ]
@@ -11,9 +11,9 @@ from django.core.validators import MinValueValidator
 from django.db import models, transaction
 from django.db.models import Q, Sum
 from django.utils import timezone
-from accounting.utils.coa_seed import *
-from core.utils.coreModels import TransactionBasedBranchScopedStampedOwnedActive,BranchScopedStampedOwnedActive,StampedOwnedActive
-from actors.models import *
+from accounting.utils.coa_seed import generate_coa_code, lock_bucket_for_code_generation
+from accounting.utils.gl_rollup import post_to_rollup
+from core.utils.coreModels import TransactionBasedBranchScopedStampedOwnedActive,BranchScopedStampedOwnedActive,StampedOwnedActive,BranchScoped
 def get_current_user(): return None
 def get_current_user_branch(): return None
 
@@ -245,7 +245,44 @@ class GeneralLedger(BranchScopedStampedOwnedActive):
     class Meta:
         verbose_name = "General Ledger Entry"
         verbose_name_plural = "General Ledger Entries"
-        indexes = [models.Index(fields=["posting_date"]), models.Index(fields=["account"]), models.Index(fields=["journal_voucher"])]
+        indexes = [
+            models.Index(fields=["posting_date"]),
+            models.Index(fields=["account"]),
+            models.Index(fields=["journal_voucher"]),
+            # ledger list of one branch, latest postings first
+            models.Index(fields=["branch", "posting_date", "id"]),
+            # one account's statement, in date order
+            models.Index(fields=["account", "posting_date", "id"]),
+        ]
+
+class GeneralLedgerPeriodBalance(BranchScoped):
+    """
+    Debit / credit totals of one account's GL postings in one month of one
+    branch, kept up to date by JournalVoucher._post_to_gl (see
+    accounting.utils.gl_rollup) and rebuilt with `rebuild_gl_rollup`.
+    """
+    id = models.BigAutoField(primary_key=True)
+    account = models.ForeignKey(ChartofAccounts, on_delete=models.PROTECT, related_name="period_balances")
+    period = models.DateField(help_text="First day of the month.")
+    debit = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    entries = models.PositiveIntegerField(default=0)
+
+    def __str__(self): return f"{self.account_id} {self.period:%Y-%m} Dr {self.debit} Cr {self.credit}"
+
+    class Meta:
+        verbose_name = "General Ledger Period Balance"
+        verbose_name_plural = "General Ledger Period Balances"
+        constraints = [
+            models.UniqueConstraint(fields=["branch", "account", "period"], name="uniq_gl_period_balance"),
+            # NULLs are distinct in the one above: one row per period for postings without a branch too
+            # (a partial index, where nulls_distinct=False is PostgreSQL 15+ only)
+            models.UniqueConstraint(
+                fields=["account", "period"], condition=models.Q(branch__isnull=True), name="uniq_gl_period_balance_no_branch"
+            ),
+        ]
+        # balances of an account over all branches
+        indexes = [models.Index(fields=["account", "period"])]
 
 class JournalVoucher(TransactionBasedBranchScopedStampedOwnedActive):
     id = models.AutoField(primary_key=True)
@@ -253,7 +290,8 @@ class JournalVoucher(TransactionBasedBranchScopedStampedOwnedActive):
     jv_no = models.CharField(max_length=50, verbose_name="Journal Voucher Number", default="#DRAFT")
     jv_date = models.DateField(default=timezone.now, verbose_name="Journal Voucher Date")
     description = models.TextField(blank=True, null=True, verbose_name="Description")
-     
+
+    search_index_fields = ("jv_no", "description")
 
     def __str__(self): return f"JV {self.jv_no} ({self.jv_date})"
 
@@ -285,6 +323,8 @@ class JournalVoucher(TransactionBasedBranchScopedStampedOwnedActive):
         if self.ledger_entries.exists(): return
         gl_rows = [GeneralLedger(posting_date=self.jv_date, account=item.account, journal_voucher=self, description=item.description or self.description, debit=item.debit or Decimal("0"), credit=item.credit or Decimal("0"), branch=self.branch) for item in self.items.select_related("account")]
         GeneralLedger.objects.bulk_create(gl_rows)
+        # same transaction as the postings (save() runs this inside atomic)
+        post_to_rollup(gl_rows)
 
     def clean(self):
         _enforce_void_reason_and_no_reactivation(self, has_void_field=True)
@@ -354,9 +394,9 @@ class ChequeRegister(TransactionBasedBranchScopedStampedOwnedActive):
     cheque_no = models.CharField(max_length=50, verbose_name="Cheque Number")
     cheque_type = models.CharField(max_length=10, choices=CHEQUE_CHOICES, verbose_name="Cheque Type")
     amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0.01)], verbose_name="Cheque Amount")
-    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="cheques", verbose_name="Customer", blank=True, null=True)
-    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="cheques", verbose_name="Vendor", blank=True, null=True)
-    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name="cheques", verbose_name="Supplier", blank=True, null=True)
+    customer = models.ForeignKey("actors.Customer", on_delete=models.CASCADE, related_name="cheques", verbose_name="Customer", blank=True, null=True)
+    vendor = models.ForeignKey("actors.Vendor", on_delete=models.CASCADE, related_name="cheques", verbose_name="Vendor", blank=True, null=True)
+    supplier = models.ForeignKey("actors.Supplier", on_delete=models.CASCADE, related_name="cheques", verbose_name="Supplier", blank=True, null=True)
     bank_account = models.ForeignKey(BankAccounts, on_delete=models.CASCADE, related_name="cheques", verbose_name="Bank Account")
     offset_account = models.ForeignKey(ChartofAccounts, on_delete=models.PROTECT, related_name="cheque_offset_for", verbose_name="Offset/Counterpart Account", help_text="Account to offset the bank/cash when cheque clears (e.g., AR, AP, Expense).", blank=True, null=True)
     issued_received_date = models.DateField(verbose_name="Issued/Received Date")
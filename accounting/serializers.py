@@ -1,5 +1,6 @@
 # api/serializers.py
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from core.utils.AdaptedBulkListSerializer import BulkModelSerializer
@@ -152,3 +153,26 @@ class ChequeRegisterSerializer(BulkModelSerializer):
         model = ChequeRegister
         fields = "__all__"
         read_only_fields = ("id", "uuid")
+
+
+# -----------------------------
+# Reports (query params)
+# -----------------------------
+class ReportPeriodParamsSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    branch = serializers.ListField(child=serializers.UUIDField(), required=False)
+
+    def validate(self, attrs):
+        date_to = attrs.setdefault("date_to", timezone.localdate())
+        # default: the financial year so far, taken as the calendar year
+        date_from = attrs.setdefault("date_from", date_to.replace(month=1, day=1))
+        if date_from > date_to:
+            raise serializers.ValidationError({"date_from": "Must not be after date_to."})
+        return attrs
+
+
+class FinancialStatementParamsSerializer(ReportPeriodParamsSerializer):
+    compare = serializers.ChoiceField(choices=["previous_period", "previous_year"], required=False)
+    periods = serializers.IntegerField(min_value=1, max_value=12, default=1)
+    include_zero = serializers.BooleanField(default=False)
@@ -1,3 +1,296 @@
+import datetime
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounting.models import Accounts, ChartofAccounts, Currency, GeneralLedger, GeneralLedgerPeriodBalance
+from accounting.utils.account_statement import AccountStatement
+from accounting.utils.financial_statements import build_statement, comparative_columns, financial_reports_config, ledger_version
+from accounting.utils.gl_rollup import balances_as_of, balances_between, post_to_rollup, rebuild_rollup
+from core.models import CustomUser
+from core.utils.KeysetPagination import PagedKeysetPagination
+from master.models import Branch
+from sales.models import Sales
+from sales.tests import create_customer
+
+D = datetime.date
+
+
+def post(account, branch, day, debit=0, credit=0):
+    """One GL row, added to the rollup the way JournalVoucher._post_to_gl does."""
+    entry = GeneralLedger.objects.create(
+        account=account, branch=branch, posting_date=day, debit=Decimal(debit), credit=Decimal(credit)
+    )
+    post_to_rollup([entry])
+    return entry
+
+
+class GeneralLedgerRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.cash = ChartofAccounts.objects.get(branch=cls.branch, type="asset", parent_account__isnull=True)
+        cls.sales = ChartofAccounts.objects.get(branch=cls.branch, type="income", parent_account__isnull=True)
+        cls.accounts = [cls.cash.pk, cls.sales.pk]
+        postings = [
+            (D(2026, 1, 15), "100.10"), (D(2026, 1, 31), "20.00"), (D(2026, 2, 1), "5.55"),
+            (D(2026, 2, 14), "300.00"), (D(2026, 3, 31), "41.25"), (D(2026, 4, 2), "7.00"),
+        ]
+        for day, amount in postings:
+            for branch in (cls.branch, None):
+                post(cls.cash, branch, day, debit=amount)
+                post(cls.sales, branch, day, credit=amount)
+
+    def raw(self, date_from=None, date_to=None, branch_ids=None):
+        rows = GeneralLedger.objects.filter(account_id__in=self.accounts, posting_date__lte=date_to)
+        if date_from is not None:
+            rows = rows.filter(posting_date__gte=date_from)
+        if branch_ids is not None:
+            rows = rows.filter(branch_id__in=branch_ids)
+        sums = rows.values("account_id").annotate(debit=Sum("debit"), credit=Sum("credit")).order_by()
+        return {
+            row["account_id"]: (Decimal(row["debit"]).quantize(Decimal("0.01")), Decimal(row["credit"]).quantize(Decimal("0.01")))
+            for row in sums
+        }
+
+    def assertMatchesLedger(self):
+        for as_of in (D(2025, 12, 31), D(2026, 1, 14), D(2026, 1, 31), D(2026, 2, 1), D(2026, 2, 20), D(2026, 3, 31), D(2026, 4, 30)):
+            with self.subTest(as_of=as_of):
+                self.assertEqual(balances_as_of(as_of, account_ids=self.accounts), self.raw(date_to=as_of))
+                branch = [self.branch.pk]
+                self.assertEqual(balances_as_of(as_of, branch, self.accounts), self.raw(date_to=as_of, branch_ids=branch))
+        for date_from, date_to in ((D(2026, 1, 16), D(2026, 3, 31)), (D(2026, 2, 1), D(2026, 2, 28)), (D(2026, 1, 31), D(2026, 2, 1))):
+            with self.subTest(date_from=date_from, date_to=date_to):
+                self.assertEqual(balances_between(date_from, date_to, account_ids=self.accounts), self.raw(date_from, date_to))
+
+    def test_balances_match_the_ledger(self):
+        self.assertMatchesLedger()
+
+    def test_rebuild_restores_a_drifted_rollup(self):
+        expected = set(GeneralLedgerPeriodBalance.objects.values_list("branch_id", "account_id", "period", "debit", "credit", "entries"))
+        GeneralLedgerPeriodBalance.objects.filter(branch=None).update(debit=0)
+        GeneralLedgerPeriodBalance.objects.filter(branch=self.branch, period=D(2026, 2, 1)).delete()
+
+        rebuild_rollup()
+        self.assertEqual(
+            set(GeneralLedgerPeriodBalance.objects.values_list("branch_id", "account_id", "period", "debit", "credit", "entries")),
+            expected,
+        )
+        self.assertMatchesLedger()
+
+    def test_one_period_row_without_a_branch(self):
+        self.assertEqual(GeneralLedgerPeriodBalance.objects.filter(branch=None, account=self.cash, period=D(2026, 1, 1)).count(), 1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GeneralLedgerPeriodBalance.objects.create(branch=None, account=self.cash, period=D(2026, 1, 1))
+
+
+class GeneralLedgerListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.user = CustomUser.objects.create_superuser(username="gl-list", email="gl-list@example.invalid", branch=cls.branch)
+        cash = ChartofAccounts.objects.get(branch=cls.branch, code="1110")
+        cls.entries = [post(cash, cls.branch, D(2026, 1, day), debit="10.00") for day in (1, 2, 3)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_plain_list_returns_one_page(self):
+        with mock.patch.object(PagedKeysetPagination, "page_size", 2):
+            first = self.client.get("/accounting/general-ledger/").json()
+            self.assertEqual([row["id"] for row in first["results"]], [entry.pk for entry in self.entries[:0:-1]])
+            self.assertIsNotNone(first["next"])
+            rest = self.client.get(first["next"]).json()
+        self.assertEqual([row["id"] for row in rest["results"]], [self.entries[0].pk])
+        self.assertIsNone(rest["next"])
+
+
+class AccountStatementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.other = Branch.objects.create(
+            name="Statement Branch", address="1 Quay", city="Dubai", state="Dubai", country="AE", contact_number="0"
+        )
+        cls.cash = ChartofAccounts.objects.get(branch=cls.branch, type="asset", parent_account__isnull=True)
+        cls.account = Accounts.objects.filter(chart_account=cls.cash).first() or Accounts.objects.create(
+            name=cls.cash.name, source=Accounts.SourceType.CHART_OF_ACCOUNTS, chart_account=cls.cash, branch=cls.branch
+        )
+        for day, debit, credit in (
+            (D(2026, 1, 20), "100.00", 0), (D(2026, 1, 31), 0, "30.00"), (D(2026, 2, 1), "50.00", 0), (D(2026, 2, 15), 0, "10.00"),
+        ):
+            post(cls.cash, cls.branch, day, debit, credit)
+        post(cls.cash, cls.other, D(2026, 1, 25), "999.00")
+        cls.main_user = CustomUser.objects.create_superuser(username="statement-main", email="sm@example.invalid", branch=cls.branch)
+        cls.other_user = CustomUser.objects.create_user(username="statement-other", email="so@example.invalid", branch=cls.other)
+
+    def rows(self, account, date_from, date_to, branch_ids=None):
+        return list(AccountStatement(account, date_from, date_to, branch_ids=branch_ids).rows())
+
+    def balances(self, rows):
+        return [(row["type"], row["date"], row["balance"]) for row in rows]
+
+    def test_gl_account_across_a_month_boundary(self):
+        rows = self.rows(self.account, D(2026, 1, 25), D(2026, 2, 10), [self.branch.pk])
+        self.assertEqual(self.balances(rows), [
+            ("opening", D(2026, 1, 25), Decimal("100.00")),
+            ("line", D(2026, 1, 31), Decimal("70.00")),
+            ("line", D(2026, 2, 1), Decimal("120.00")),
+            ("closing", D(2026, 2, 10), Decimal("120.00")),
+        ])
+        self.assertEqual((rows[-1]["debit"], rows[-1]["credit"]), (Decimal("50.00"), Decimal("30.00")))
+
+    def test_whole_month_opening_comes_from_the_rollup(self):
+        rows = self.rows(self.account, D(2026, 2, 1), D(2026, 2, 28), [self.branch.pk])
+        self.assertEqual([row["balance"] for row in rows], [Decimal("70.00"), Decimal("120.00"), Decimal("110.00"), Decimal("110.00")])
+        # every branch: the other branch's posting is in the opening
+        self.assertEqual(self.rows(self.account, D(2026, 2, 1), D(2026, 2, 28))[0]["balance"], Decimal("1069.00"))
+
+    def test_window_running_balance_matches_the_python_one(self):
+        expected = self.rows(self.account, D(2026, 1, 25), D(2026, 2, 28), [self.branch.pk])
+        # the PostgreSQL path: running balances from a window sum in the query
+        with mock.patch("accounting.utils.account_statement.connections", {"default": SimpleNamespace(vendor="postgresql")}):
+            windowed = self.rows(self.account, D(2026, 1, 25), D(2026, 2, 28), [self.branch.pk])
+        self.assertEqual(self.balances(windowed), self.balances(expected))
+
+    def test_customer_statement_closes_on_the_document_totals(self):
+        currency = Currency.objects.create(name="Statement Dollar", symbol="S$")
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = create_customer(self.branch, currency)
+        invoices = [
+            (D(2026, 1, 10), "120.00", True), (D(2026, 2, 3), "80.50", True), (D(2026, 2, 4), "999.00", False),
+        ]
+        for day, total, approved in invoices:
+            with self.captureOnCommitCallbacks(execute=True):
+                Sales.objects.create(
+                    customer=customer, currency=currency, branch=self.branch, invoice_date=day, total=Decimal(total),
+                    approved=approved, status="approved" if approved else "draft",
+                )
+        account = Accounts.objects.get(actor__customer=customer)
+
+        rows = self.rows(account, D(2026, 2, 1), D(2026, 2, 28))
+        self.assertEqual(self.balances(rows), [
+            ("opening", D(2026, 2, 1), Decimal("120.00")),
+            ("line", D(2026, 2, 3), Decimal("200.50")),
+            ("closing", D(2026, 2, 28), Decimal("200.50")),
+        ])
+        approved = Sales.objects.filter(customer=customer, approved=True).aggregate(total=Sum("total"))["total"]
+        self.assertEqual(rows[-1]["balance"], approved)
+        account.refresh_from_db()
+        self.assertEqual(rows[-1]["balance"], account.balance)
+
+    def get(self, user, account):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client.get(f"/accounting/accounts/{account.pk}/statement/", {"date_from": "2026-01-25", "date_to": "2026-02-10"})
+
+    def test_api_streams_the_statement(self):
+        response = self.get(self.main_user, self.account)
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(b"".join(response.streaming_content))
+        # every branch's lines for a main-branch user
+        self.assertEqual(body["opening"]["balance"], "100.00")
+        self.assertEqual([line["balance"] for line in body["lines"]], ["1099.00", "1069.00", "1119.00"])
+        self.assertEqual(body["closing"]["balance"], "1119.00")
+
+    def test_other_branch_users_get_404_for_the_account(self):
+        self.assertEqual(self.get(self.other_user, self.account).status_code, 404)
+
+
+class FinancialStatementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.coa = {account.code: account for account in ChartofAccounts.objects.filter(branch=cls.branch)}
+        cls.journal(D(2026, 1, 10), "1110", "3000", "1000.00")  # capital paid in
+        cls.journal(D(2026, 2, 5), "1110", "4100", "500.00")  # freight sold for cash
+        cls.journal(D(2026, 2, 20), "5120", "2200", "200.00")  # rent on account
+        cls.journal(D(2026, 3, 3), "1200", "4100", "50.00")
+
+    @classmethod
+    def journal(cls, day, debit_code, credit_code, amount):
+        post(cls.coa[debit_code], cls.branch, day, debit=amount)
+        post(cls.coa[credit_code], cls.branch, day, credit=amount)
+
+    def setUp(self):
+        caches[financial_reports_config()["CACHE"]].clear()
+
+    def build(self, statement, date_from, date_to, **kwargs):
+        return build_statement(statement, date_from, date_to, branch_ids=[self.branch.pk], **kwargs)
+
+    def row(self, report, code, column="current"):
+        for section in report["sections"]:
+            for row in section["rows"]:
+                if row["code"] == code:
+                    return row["values"][column]
+        return None
+
+    def test_trial_balance_nets_to_zero(self):
+        report = self.build("trial_balance", D(2026, 2, 1), D(2026, 3, 31), compare="previous_period")
+        for key, totals in report["totals"].items():
+            with self.subTest(column=key):
+                self.assertTrue(totals["balanced"])
+                self.assertEqual(totals["debit"], totals["credit"])
+                self.assertEqual(totals["closing"], 0)
+        self.assertEqual(report["totals"]["current"]["debit"], Decimal("750.00"))
+        cash = self.row(report, "1110")
+        self.assertEqual((cash["opening"], cash["debit"], cash["closing"]), (Decimal("1000.00"), Decimal("500.00"), Decimal("1500.00")))
+        # the parent carries its children
+        self.assertEqual(self.row(report, "1000")["closing"], Decimal("1550.00"))
+
+    def test_balance_sheet_balances_with_the_earnings_line(self):
+        report = self.build("balance_sheet", D(2026, 1, 1), D(2026, 2, 28))
+        totals = report["totals"]["current"]
+        self.assertEqual(totals["assets"], Decimal("1500.00"))
+        self.assertEqual(totals["liabilities"], Decimal("200.00"))
+        self.assertEqual(totals["earnings"], Decimal("300.00"))
+        self.assertEqual(totals["equity"], Decimal("1300.00"))
+        self.assertTrue(totals["balanced"])
+        self.assertEqual(totals["assets"], totals["liabilities"] + totals["equity"])
+
+    def test_comparative_columns_cover_the_right_ranges(self):
+        def ranges(*args, **kwargs):
+            return [(column.key, column.date_from, column.date_to) for column in comparative_columns(*args, **kwargs)]
+
+        self.assertEqual(ranges(D(2026, 3, 1), D(2026, 3, 31), "previous_period", periods=2), [
+            ("current", D(2026, 3, 1), D(2026, 3, 31)),
+            ("previous_1", D(2026, 2, 1), D(2026, 2, 28)),
+            ("previous_2", D(2026, 1, 1), D(2026, 1, 31)),
+        ])
+        self.assertEqual(ranges(D(2026, 1, 1), D(2026, 3, 31), "previous_period"), [
+            ("current", D(2026, 1, 1), D(2026, 3, 31)), ("previous_1", D(2025, 10, 1), D(2025, 12, 31)),
+        ])
+        self.assertEqual(ranges(D(2026, 2, 10), D(2026, 2, 19), "previous_period"), [
+            ("current", D(2026, 2, 10), D(2026, 2, 19)), ("previous_1", D(2026, 1, 31), D(2026, 2, 9)),
+        ])
+        self.assertEqual(ranges(D(2028, 2, 1), D(2028, 2, 29), "previous_year"), [
+            ("current", D(2028, 2, 1), D(2028, 2, 29)), ("previous_1", D(2027, 2, 1), D(2027, 2, 28)),
+        ])
+
+        report = self.build("profit_and_loss", D(2026, 3, 1), D(2026, 3, 31), compare="previous_period", periods=2)
+        self.assertEqual([column["key"] for column in report["columns"]], ["current", "previous_1", "previous_2"])
+        self.assertEqual(
+            [report["totals"][key]["net_profit"] for key in ("current", "previous_1", "previous_2")],
+            [Decimal("50.00"), Decimal("300.00"), Decimal("0")],
+        )
+
+    def test_a_new_posting_invalidates_the_cached_report(self):
+        version = ledger_version()
+        before = self.build("trial_balance", D(2026, 1, 1), D(2026, 3, 31))
+        with self.assertNumQueries(2):
+            # only the version is read: the report comes from the cache
+            self.assertEqual(self.build("trial_balance", D(2026, 1, 1), D(2026, 3, 31)), before)
 
-# Create your tests here.
+        self.journal(D(2026, 3, 15), "1110", "4200", "25.00")
+        self.assertNotEqual(ledger_version(), version)
+        after = self.build("trial_balance", D(2026, 1, 1), D(2026, 3, 31))
+        self.assertEqual(after["totals"]["current"]["debit"], before["totals"]["current"]["debit"] + Decimal("25.00"))
+        self.assertEqual(self.row(after, "4200")["closing"], Decimal("-25.00"))
@@ -1,8 +1,11 @@
 # api/urls.py
+from django.urls import path
 from rest_framework_bulk.routes import BulkRouter
+
 from .views import (
     ChartofAccountsViewSet, BankAccountsViewSet, CurrencyViewSet, PaymentMethodViewSet,
     GeneralLedgerViewSet, JournalVoucherViewSet, ChequeRegisterViewSet, CashTransferViewSet,
+    FinancialStatementView, AccountStatementView,
 )
 
 router = BulkRouter()
@@ -16,4 +19,7 @@ router.register("cheques", ChequeRegisterViewSet)
 router.register("cash-transfers", CashTransferViewSet)
 
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("reports/<str:statement>/", FinancialStatementView.as_view(), name="financial-statement"),
+    path("accounts/<uuid:pk>/statement/", AccountStatementView.as_view(), name="account-statement"),
+] + router.urls
@@ -0,0 +1,226 @@
+# accounting/utils/account_statement.py
+#
+# Statement of one accounting.Accounts row between two dates: the opening
+# balance, every line in date order with its running balance, and the
+# closing balance, produced as a generator so long statements stream.
+
+import datetime
+import heapq
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Q, Sum, Window
+from django.db.models.expressions import RowRange
+
+from accounting.utils.gl_rollup import CENT, ZERO, balances_as_of
+from core.utils.dbRouting import reading_from_replica
+
+CHUNK_SIZE = 2000
+DEBIT_NORMAL = {"asset", "expense"}
+
+
+@dataclass(frozen=True)
+class DocumentSource:
+    """One kind of document that moves an actor account's balance (see sales.signals / purchase.signals)."""
+
+    kind: str
+    model: str
+    party: str
+    date: str
+    amount: str
+    side: str
+    description: str
+    status: str = "status"
+    void_statuses: tuple = ("void", "voided")
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def applied(self):
+        """The documents the balance signals count: approved, active and not voided."""
+        approved = Q(approved=True) | Q(**{f"{self.status}__iexact": "approved"})
+        voided = Q(voided_at__isnull=False)
+        for status in self.void_statuses:
+            voided |= Q(**{f"{self.status}__iexact": status})
+        return approved & Q(active=True) & ~voided
+
+
+# per actor type, in the order same-day documents are listed
+ACTOR_SOURCES = {
+    "customer": (
+        DocumentSource("invoice", "sales.Sales", "customer", "invoice_date", "total", "debit", "reference"),
+        DocumentSource("payment", "sales.CustomerPayment", "customer", "date", "amount", "credit", "desc"),
+    ),
+    "vendor": (
+        DocumentSource(
+            "bill", "purchase.VendorBills", "vendor", "date", "total_amount", "credit", "remarks",
+            status="bill_status", void_statuses=("void", "voided", "cancelled", "rejected"),
+        ),
+        DocumentSource("payment", "purchase.VendorPayments", "vendor", "date", "amount", "debit", "remarks"),
+    ),
+}
+
+
+def _row(row_type, date, debit, credit, balance, kind=None, reference=None, description=None):
+    # every row has the same keys, so CSV gets one header
+    return {
+        "type": row_type, "date": date, "kind": kind, "reference": reference, "description": description,
+        "debit": debit, "credit": credit, "balance": balance,
+    }
+
+
+class AccountStatement:
+    """
+    Chart of accounts and bank accounts read their linked GL account: the
+    opening balance comes from the period rollup (whole months) plus the GL
+    rows of the part month before `date_from`, and the lines' running
+    balance from a window sum in the database (in Python on SQLite, which
+    sums decimals as floats). Actor accounts read the invoices, bills and
+    payments their balance is made of, merged in date order.
+
+    Balances are on the account's normal side: debit for assets, expenses
+    and customers, credit for liabilities, equity, income and vendors.
+    """
+
+    def __init__(self, account, date_from, date_to, branch_ids=None, using=None, chunk_size=CHUNK_SIZE):
+        self.account = account
+        self.date_from = date_from
+        self.date_to = date_to
+        self.branch_ids = branch_ids
+        # bound now: the rows are read after the view has returned
+        self.using = using or reading_from_replica() or DEFAULT_DB_ALIAS
+        self.chunk_size = chunk_size
+        self.party_id = None
+        self.gl_account_id, self.sources, self.debit_normal = self._resolve()
+
+    def _resolve(self):
+        """(GL account id or None, actor document sources, debit normal?) of the account."""
+        account = self.account
+        Accounts = apps.get_model("accounting", "Accounts")
+        if account.source == Accounts.SourceType.ACTOR and account.actor_id:
+            actor_type = account.actor.actor_type
+            # the Customer / Vendor row the documents point at
+            self.party_id = getattr(account.actor, f"{actor_type}_id", None)
+            sources = ACTOR_SOURCES.get(actor_type, ()) if self.party_id else ()
+            return None, sources, actor_type != "vendor"
+        if account.bank_account_id:
+            # Bank / cash GL accounts are assets
+            return account.bank_account.gl_account_id, (), True
+        if account.chart_account_id:
+            return account.chart_account_id, (), account.chart_account.type in DEBIT_NORMAL
+        return None, (), True
+
+    def _signed(self, debit, credit):
+        return debit - credit if self.debit_normal else credit - debit
+
+    def header(self):
+        return {
+            "account": {
+                "id": self.account.pk,
+                "name": self.account.name,
+                "source": self.account.source,
+                "gl_account": self.gl_account_id,
+            },
+            "date_from": self.date_from,
+            "date_to": self.date_to,
+            "branches": self.branch_ids,
+        }
+
+    # GL-backed accounts
+
+    def _ledger(self):
+        GeneralLedger = apps.get_model("accounting", "GeneralLedger")
+        queryset = GeneralLedger.objects.using(self.using).filter(account_id=self.gl_account_id)
+        if self.branch_ids is not None:
+            queryset = queryset.filter(branch_id__in=self.branch_ids)
+        return queryset
+
+    def _ledger_opening(self):
+        as_of = self.date_from - datetime.timedelta(days=1)
+        totals = balances_as_of(as_of, self.branch_ids, [self.gl_account_id], using=self.using)
+        return totals.get(self.gl_account_id, (ZERO, ZERO))
+
+    def _ledger_lines(self):
+        order = (F("posting_date").asc(), F("id").asc())
+        queryset = self._ledger().filter(posting_date__range=(self.date_from, self.date_to)).order_by(*order)
+        windowed = connections[self.using].vendor != "sqlite"
+        if windowed:
+            queryset = queryset.annotate(
+                running=Window(Sum(F("debit") - F("credit")), order_by=order, frame=RowRange(start=None, end=0))
+            )
+        rows = queryset.values(
+            "posting_date", "description", "debit", "credit", *(("running",) if windowed else ()),
+            reference=F("journal_voucher__jv_no"),
+        )
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            yield (
+                row["posting_date"], "journal", row["reference"], row["description"],
+                row["debit"], row["credit"], row.get("running"),
+            )
+
+    # actor accounts
+
+    def _documents(self, source):
+        queryset = source.get_model()._default_manager.using(self.using)
+        queryset = queryset.filter(source.applied(), **{f"{source.party}_id": self.party_id})
+        if self.branch_ids is not None:
+            queryset = queryset.filter(branch_id__in=self.branch_ids)
+        return queryset
+
+    def _document_opening(self):
+        debit = credit = ZERO
+        for source in self.sources:
+            before = self._documents(source).filter(**{f"{source.date}__lt": self.date_from})
+            amount = before.aggregate(total=Sum(source.amount))["total"] or ZERO
+            if source.side == "debit":
+                debit += amount
+            else:
+                credit += amount
+        return debit, credit
+
+    def _document_stream(self, position, source):
+        rows = (
+            self._documents(source)
+            .filter(**{f"{source.date}__range": (self.date_from, self.date_to)})
+            .order_by(source.date, "created", "pk")
+            .values("pk", "no", source.date, source.amount, source.description)
+        )
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            amount = (row[source.amount] or ZERO).quantize(CENT)
+            debit, credit = (amount, ZERO) if source.side == "debit" else (ZERO, amount)
+            # (date, position) orders the merge, so pks of different models are never compared
+            yield row[source.date], position, source.kind, row["no"], row[source.description], debit, credit
+
+    def _document_lines(self):
+        streams = [self._document_stream(position, source) for position, source in enumerate(self.sources)]
+        for date, _, kind, reference, description, debit, credit in heapq.merge(*streams, key=lambda line: line[:2]):
+            yield date, kind, reference, description, debit, credit, None
+
+    def rows(self):
+        """The opening row, one row per line with its running balance, and the closing row."""
+        if self.gl_account_id is not None:
+            opening_debit, opening_credit = self._ledger_opening()
+            lines = self._ledger_lines()
+        elif self.sources:
+            opening_debit, opening_credit = self._document_opening()
+            lines = self._document_lines()
+        else:
+            opening_debit, opening_credit, lines = ZERO, ZERO, iter(())
+
+        opening = self._signed(opening_debit, opening_credit).quantize(CENT)
+        yield _row("opening", self.date_from, opening_debit.quantize(CENT), opening_credit.quantize(CENT), opening)
+
+        balance, total_debit, total_credit = opening, ZERO, ZERO
+        for date, kind, reference, description, debit, credit, running in lines:
+            total_debit += debit
+            total_credit += credit
+            if running is None:
+                balance += self._signed(debit, credit)
+            else:
+                # the window sums debit - credit from the first line of the range
+                balance = opening + (running if self.debit_normal else -running)
+            yield _row("line", date, debit, credit, balance, kind, reference, description)
+
+        closing = opening + self._signed(total_debit, total_credit)
+        yield _row("closing", self.date_to, total_debit.quantize(CENT), total_credit.quantize(CENT), closing.quantize(CENT))
@@ -0,0 +1,311 @@
+# accounting/utils/financial_statements.py
+#
+# Trial balance, profit & loss and balance sheet over the ChartofAccounts
+# tree: per-account sums come from the GL rollup (accounting.utils.gl_rollup)
+# in one pass for every column and are rolled up the tree in memory.
+
+import calendar
+import datetime
+import hashlib
+import json
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from accounting.utils.gl_rollup import ZERO, balances_for_ranges
+from core.utils.dbRouting import replica_reads
+
+DEFAULTS = {
+    "CACHE": "default",
+    "TIMEOUT": 900,
+}
+
+STATEMENTS = ("trial_balance", "profit_and_loss", "balance_sheet")
+COMPARE = ("previous_period", "previous_year")
+DEBIT_NORMAL = {"asset", "expense"}
+SECTIONS = {
+    "trial_balance": ("asset", "liability", "equity", "income", "expense"),
+    "profit_and_loss": ("income", "expense"),
+    "balance_sheet": ("asset", "liability", "equity"),
+}
+
+
+def financial_reports_config():
+    return {**DEFAULTS, **(getattr(settings, "FINANCIAL_REPORTS", {}) or {})}
+
+
+@dataclass(frozen=True)
+class Column:
+    key: str
+    date_from: datetime.date
+    date_to: datetime.date
+
+    def as_dict(self):
+        return {"key": self.key, "date_from": self.date_from, "date_to": self.date_to}
+
+
+def _shift_months(day, months, month_end=False):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    last = calendar.monthrange(year, month)[1]
+    return datetime.date(year, month, last if month_end else min(day.day, last))
+
+
+def comparative_columns(date_from, date_to, compare=None, periods=1):
+    """
+    The requested range plus `periods` earlier ones: the same span right
+    before it (whole months stay whole months) or the same dates in the
+    previous years.
+    """
+    columns = [Column("current", date_from, date_to)]
+    if compare is None:
+        return columns
+    whole_months = date_from.day == 1 and date_to == _shift_months(date_to, 0, month_end=True)
+    months = (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+    days = (date_to - date_from).days + 1
+    for n in range(1, periods + 1):
+        if compare == "previous_year":
+            start, end = _shift_months(date_from, -12 * n), _shift_months(date_to, -12 * n, month_end=whole_months)
+        elif whole_months:
+            start, end = _shift_months(date_from, -months * n), _shift_months(date_to, -months * n, month_end=True)
+        else:
+            start, end = date_from - datetime.timedelta(days=days * n), date_to - datetime.timedelta(days=days * n)
+        columns.append(Column(f"previous_{n}", start, end))
+    return columns
+
+
+class AccountTree:
+    """The chart of accounts loaded once, with figures summed from the leaves up."""
+
+    def __init__(self, accounts):
+        self.accounts = {account["id"]: account for account in accounts}
+        self.children = {}
+        for account in sorted(accounts, key=lambda a: (a["code"] or "", a["name"])):
+            parent = account["parent_account_id"] if account["parent_account_id"] in self.accounts else None
+            self.children.setdefault(parent, []).append(account["id"])
+
+    @classmethod
+    def load(cls):
+        ChartofAccounts = apps.get_model("accounting", "ChartofAccounts")
+        return cls(list(ChartofAccounts.objects.values("id", "code", "name", "type", "parent_account_id", "branch_id")))
+
+    def walk(self, parent=None, depth=0, seen=None):
+        """(account id, depth) in tree order; a parent cycle is cut where it closes."""
+        seen = set() if seen is None else seen
+        for account_id in self.children.get(parent, ()):
+            if account_id in seen:
+                continue
+            seen.add(account_id)
+            yield account_id, depth
+            yield from self.walk(account_id, depth + 1, seen)
+
+    def rollup(self, own):
+        """{account id: {figure: amount}} of each account plus all its descendants."""
+        order = list(self.walk())
+        totals = {account_id: dict(own.get(account_id, {})) for account_id, _ in order}
+        parents = {child: parent for parent, children in self.children.items() for child in children}
+        for account_id, _ in reversed(order):
+            parent = parents.get(account_id)
+            if parent is None or parent not in totals:
+                continue
+            for figure, amount in totals[account_id].items():
+                totals[parent][figure] = totals[parent].get(figure, ZERO) + amount
+        return totals
+
+
+def _net(debit, credit, account_type):
+    """Balance on the account's normal side (debit for assets / expenses, credit otherwise)."""
+    return debit - credit if account_type in DEBIT_NORMAL else credit - debit
+
+
+def _rows(tree, rolled, types, branch_ids, include_zero):
+    """Rows of the accounts of `types` in tree order, with their figures from tree.rollup()."""
+    rows = []
+    for account_id, depth in tree.walk():
+        account = tree.accounts[account_id]
+        values = rolled[account_id]
+        if account["type"] not in types:
+            continue
+        if not any(values.values()):
+            if not include_zero:
+                continue
+            if branch_ids is not None and account["branch_id"] not in branch_ids and account["branch_id"] is not None:
+                continue
+        rows.append({
+            "id": account_id,
+            "code": account["code"],
+            "name": account["name"],
+            "type": account["type"],
+            "parent": account["parent_account_id"],
+            "depth": depth,
+            "is_group": bool(tree.children.get(account_id)),
+            "values": values,
+        })
+    return rows
+
+
+def _section_total(tree, rows, key):
+    """Sum over the section's top-level rows (their values already include the children)."""
+    top = (row for row in rows if tree.accounts[row["id"]]["parent_account_id"] not in tree.accounts)
+    return sum((row["values"].get(key, ZERO) for row in top), ZERO)
+
+
+def _trial_balance(tree, columns, branch_ids, include_zero):
+    ranges = {}
+    for column in columns:
+        ranges[f"{column.key}:opening"] = (None, column.date_from - datetime.timedelta(days=1))
+        ranges[f"{column.key}:movement"] = (column.date_from, column.date_to)
+    sums = balances_for_ranges(ranges, branch_ids=branch_ids)
+
+    figures = {}
+    for account_id, columns_sums in sums.items():
+        values = {}
+        for column in columns:
+            opening_debit, opening_credit = columns_sums.get(f"{column.key}:opening", (ZERO, ZERO))
+            debit, credit = columns_sums.get(f"{column.key}:movement", (ZERO, ZERO))
+            # signed debit-positive, as trial balances are read
+            values[f"{column.key}:opening"] = opening_debit - opening_credit
+            values[f"{column.key}:debit"] = debit
+            values[f"{column.key}:credit"] = credit
+            values[f"{column.key}:closing"] = opening_debit - opening_credit + debit - credit
+        figures[account_id] = values
+
+    rolled = tree.rollup(figures)
+    sections, totals = [], {column.key: {"debit": ZERO, "credit": ZERO, "closing": ZERO} for column in columns}
+    for account_type in SECTIONS["trial_balance"]:
+        rows = _rows(tree, rolled, {account_type}, branch_ids, include_zero)
+        for column in columns:
+            for figure in totals[column.key]:
+                totals[column.key][figure] += _section_total(tree, rows, f"{column.key}:{figure}")
+        for row in rows:
+            # {"current": {"opening": ..., "debit": ..., ...}, "previous_1": {...}}
+            nested = {}
+            for key, amount in row["values"].items():
+                column_key, figure = key.split(":")
+                nested.setdefault(column_key, {})[figure] = amount
+            row["values"] = nested
+        sections.append({"type": account_type, "rows": rows})
+    for column_totals in totals.values():
+        # debits equal credits, so the net closing of the whole ledger is zero
+        column_totals["balanced"] = column_totals["debit"] == column_totals["credit"] and not column_totals["closing"]
+    return sections, totals
+
+
+def _profit_and_loss(tree, columns, branch_ids, include_zero):
+    sums = balances_for_ranges({column.key: (column.date_from, column.date_to) for column in columns}, branch_ids=branch_ids)
+    figures = {}
+    for account_id, column_sums in sums.items():
+        account = tree.accounts.get(account_id)
+        if account is not None:
+            figures[account_id] = {key: _net(debit, credit, account["type"]) for key, (debit, credit) in column_sums.items()}
+    rolled = tree.rollup(figures)
+    sections = []
+    for account_type in SECTIONS["profit_and_loss"]:
+        rows = _rows(tree, rolled, {account_type}, branch_ids, include_zero)
+        section_totals = {c.key: _section_total(tree, rows, c.key) for c in columns}
+        sections.append({"type": account_type, "rows": rows, "totals": section_totals})
+    income, expense = sections[0]["totals"], sections[1]["totals"]
+    totals = {
+        column.key: {
+            "income": income[column.key],
+            "expense": expense[column.key],
+            "net_profit": income[column.key] - expense[column.key],
+        }
+        for column in columns
+    }
+    return sections, totals
+
+
+def _balance_sheet(tree, columns, branch_ids, include_zero):
+    sums = balances_for_ranges({column.key: (None, column.date_to) for column in columns}, branch_ids=branch_ids)
+    figures, earnings = {}, {column.key: ZERO for column in columns}
+    for account_id, column_sums in sums.items():
+        account = tree.accounts.get(account_id)
+        if account is None:
+            continue
+        values = {key: _net(debit, credit, account["type"]) for key, (debit, credit) in column_sums.items()}
+        if account["type"] in ("income", "expense"):
+            # not closed into retained earnings by a posting: shown as its own equity line
+            for key, amount in values.items():
+                earnings[key] += amount if account["type"] == "income" else -amount
+        else:
+            figures[account_id] = values
+
+    rolled = tree.rollup(figures)
+    sections = []
+    for account_type in SECTIONS["balance_sheet"]:
+        rows = _rows(tree, rolled, {account_type}, branch_ids, include_zero)
+        section_totals = {c.key: _section_total(tree, rows, c.key) for c in columns}
+        if account_type == "equity":
+            section_totals = {key: amount + earnings[key] for key, amount in section_totals.items()}
+        sections.append({"type": account_type, "rows": rows, "totals": section_totals})
+    assets, liabilities, equity = (section["totals"] for section in sections)
+    totals = {
+        column.key: {
+            "assets": assets[column.key],
+            "liabilities": liabilities[column.key],
+            "equity": equity[column.key],
+            "earnings": earnings[column.key],
+            "balanced": assets[column.key] == liabilities[column.key] + equity[column.key],
+        }
+        for column in columns
+    }
+    return sections, totals
+
+
+BUILDERS = {
+    "trial_balance": _trial_balance,
+    "profit_and_loss": _profit_and_loss,
+    "balance_sheet": _balance_sheet,
+}
+
+
+def ledger_version():
+    """Changes with every GL posting and every chart of accounts edit: the cache key of the reports."""
+    GeneralLedger = apps.get_model("accounting", "GeneralLedger")
+    ChartofAccounts = apps.get_model("accounting", "ChartofAccounts")
+    latest = GeneralLedger.objects.aggregate(latest=Max("id"))["latest"]
+    chart = ChartofAccounts.objects.aggregate(updated=Max("updated"), count=Count("id"))
+    return f"{latest}:{chart['updated']}:{chart['count']}"
+
+
+def _cache_key(statement, columns, branch_ids, include_zero, version):
+    params = {
+        "columns": [(c.key, c.date_from.isoformat(), c.date_to.isoformat()) for c in columns],
+        "branches": sorted(map(str, branch_ids)) if branch_ids is not None else None,
+        "include_zero": include_zero,
+        "version": version,
+    }
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f"finstmt:{statement}:{digest}"
+
+
+@replica_reads
+def build_statement(statement, date_from, date_to, branch_ids=None, compare=None, periods=1, include_zero=False):
+    """
+    The statement as a JSON-ready dict: `columns` (current range first, then
+    the comparative ones), `sections` of account rows in tree order with
+    their figures per column (children included) and `totals`. Cached until
+    the next GL posting or chart of accounts edit.
+    """
+    if statement not in BUILDERS:
+        raise ValueError(f"Unknown statement {statement!r}; expected one of {', '.join(STATEMENTS)}.")
+    columns = comparative_columns(date_from, date_to, compare, periods)
+    config = financial_reports_config()
+    cache = caches[config["CACHE"]]
+    key = _cache_key(statement, columns, branch_ids, include_zero, ledger_version())
+    report = cache.get(key)
+    if report is None:
+        sections, totals = BUILDERS[statement](AccountTree.load(), columns, branch_ids, include_zero)
+        report = {
+            "statement": statement,
+            "branches": branch_ids,
+            "columns": [column.as_dict() for column in columns],
+            "sections": sections,
+            "totals": totals,
+        }
+        cache.set(key, report, config["TIMEOUT"])
+    return report
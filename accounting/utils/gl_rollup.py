@@ -0,0 +1,212 @@
+# accounting/utils/gl_rollup.py
+#
+# Per (branch, account, month) totals of the general ledger, so balances
+# don't have to sum every GL row since the beginning.
+
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+ZERO = Decimal("0")
+CENT = Decimal("0.01")
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def _models():
+    return apps.get_model("accounting", "GeneralLedger"), apps.get_model("accounting", "GeneralLedgerPeriodBalance")
+
+
+def period_of(day):
+    """The rollup period (first day of the month) a posting date falls in."""
+    return day.replace(day=1)
+
+
+def _period_end(period):
+    return (period + datetime.timedelta(days=32)).replace(day=1) - ONE_DAY
+
+
+def post_to_rollup(entries, using=None):
+    """
+    Add freshly created GeneralLedger rows to their period balances. Call it
+    in the transaction that inserted them, so the rollup commits (or rolls
+    back) with the postings.
+    """
+    _, PeriodBalance = _models()
+    deltas = {}
+    for entry in entries:
+        key = (entry.branch_id, entry.account_id, period_of(entry.posting_date))
+        debit, credit, count = deltas.get(key, (ZERO, ZERO, 0))
+        deltas[key] = (debit + (entry.debit or ZERO), credit + (entry.credit or ZERO), count + 1)
+
+    using = using or router.db_for_write(PeriodBalance)
+    # a fixed order, so concurrent postings lock the rows in the same order
+    for (branch_id, account_id, period), (debit, credit, count) in sorted(deltas.items(), key=lambda item: str(item[0])):
+        rows = PeriodBalance.objects.using(using).filter(branch_id=branch_id, account_id=account_id, period=period)
+        increments = {"debit": F("debit") + debit, "credit": F("credit") + credit, "entries": F("entries") + count}
+        if rows.update(**increments):
+            continue
+        try:
+            with transaction.atomic(using=using):
+                PeriodBalance.objects.using(using).create(
+                    branch_id=branch_id, account_id=account_id, period=period, debit=debit, credit=credit, entries=count
+                )
+        except IntegrityError:
+            # another posting created the period row first
+            rows.update(**increments)
+
+
+def rebuild_branch(branch_id, using="default"):
+    """Recompute one branch's period balances (None: postings without a branch) from its GL rows."""
+    GeneralLedger, PeriodBalance = _models()
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == "postgresql":
+            # postings wait until the branch is recomputed instead of being missed by it
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {connection.ops.quote_name(GeneralLedger._meta.db_table)} IN SHARE MODE")
+        # on SQLite the delete takes the write lock first, with the same effect
+        PeriodBalance.objects.using(using).filter(branch_id=branch_id).delete()
+        totals = (
+            GeneralLedger.objects.using(using).filter(branch_id=branch_id)
+            .annotate(period=TruncMonth("posting_date"))
+            .values("account_id", "period")
+            .annotate(total_debit=Sum("debit"), total_credit=Sum("credit"), count=Count("id"))
+            .order_by()
+        )
+        balances = [
+            PeriodBalance(
+                branch_id=branch_id, account_id=row["account_id"], period=row["period"],
+                debit=(row["total_debit"] or ZERO).quantize(CENT), credit=(row["total_credit"] or ZERO).quantize(CENT),
+                entries=row["count"],
+            )
+            for row in totals.iterator()
+        ]
+        PeriodBalance.objects.using(using).bulk_create(balances, batch_size=1000)
+    return len(balances)
+
+
+def _rebuild_in_thread(branch_id, using):
+    try:
+        return rebuild_branch(branch_id, using=using)
+    finally:
+        # worker threads own their connections
+        connections.close_all()
+
+
+def rebuild_rollup(branch_ids=None, using="default", workers=4):
+    """
+    Recompute the period balances of the given branches (default: every
+    branch with postings or balances), one transaction per branch and up to
+    `workers` branches at a time. Returns {branch_id: period rows}.
+    """
+    GeneralLedger, PeriodBalance = _models()
+    if branch_ids is None:
+        branch_ids = set(GeneralLedger.objects.using(using).values_list("branch_id", flat=True).distinct())
+        branch_ids |= set(PeriodBalance.objects.using(using).values_list("branch_id", flat=True).distinct())
+    branch_ids = sorted(branch_ids, key=str)
+    if connections[using].vendor == "sqlite":
+        # a single writer at a time; parallel rebuilds only trade places on the file lock
+        workers = 1
+    if workers <= 1 or len(branch_ids) <= 1:
+        return {branch_id: rebuild_branch(branch_id, using=using) for branch_id in branch_ids}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gl-rollup") as pool:
+        counts = pool.map(_rebuild_in_thread, branch_ids, [using] * len(branch_ids))
+        return dict(zip(branch_ids, counts))
+
+
+def _split(date_from, date_to):
+    """
+    (whole months, raw date ranges) covering `date_from` (None: from the
+    beginning) to `date_to`: a Q on the rollup's periods, or None when no
+    whole month fits, and the (first, last) day ranges left at the edges.
+    """
+    first = date_from if date_from is None or date_from.day == 1 else _period_end(period_of(date_from)) + ONE_DAY
+    last = period_of(date_to) if date_to == _period_end(period_of(date_to)) else period_of(period_of(date_to) - ONE_DAY)
+    if first is not None and first > last:
+        return None, [(date_from, date_to)]
+    months = Q(period__lte=last) if first is None else Q(period__gte=first, period__lte=last)
+    edges = []
+    if date_from is not None and date_from < first:
+        edges.append((date_from, first - ONE_DAY))
+    if date_to > _period_end(last):
+        edges.append((_period_end(last) + ONE_DAY, date_to))
+    return months, edges
+
+
+def balances_for_ranges(ranges, branch_ids=None, account_ids=None, by_branch=False, using=None):
+    """
+    Debit / credit totals of the postings in several date ranges at once:
+    `ranges` is {name: (date_from or None, date_to)} and the result
+    {account_id: {name: (debit, credit)}}, or keyed by (branch_id,
+    account_id) with `by_branch`; an account without postings in a range
+    has no entry for it. One grouped query sums the rollup's whole
+    months of every range and one the GL rows of the partial months at the
+    range edges, so a range costs at most two partial months of raw rows.
+    """
+    GeneralLedger, PeriodBalance = _models()
+    rollup_sums, ledger_sums, ledger_dates = {}, {}, Q()
+    for index, (date_from, date_to) in enumerate(ranges.values()):
+        months, edges = _split(date_from, date_to)
+        if months is not None:
+            rollup_sums[f"d{index}"] = Sum("debit", filter=months)
+            rollup_sums[f"c{index}"] = Sum("credit", filter=months)
+        if edges:
+            dates = Q()
+            for first, last in edges:
+                dates |= Q(posting_date__range=(first, last)) if first is not None else Q(posting_date__lte=last)
+            ledger_sums[f"d{index}"] = Sum("debit", filter=dates)
+            ledger_sums[f"c{index}"] = Sum("credit", filter=dates)
+            ledger_dates |= dates
+
+    group = ("branch_id", "account_id") if by_branch else ("account_id",)
+    names = list(ranges)
+    totals = {}
+    for queryset, sums in (
+        (PeriodBalance.objects.all(), rollup_sums),
+        (GeneralLedger.objects.filter(ledger_dates), ledger_sums),
+    ):
+        if not sums:
+            continue
+        if using:
+            queryset = queryset.using(using)
+        if branch_ids is not None:
+            queryset = queryset.filter(branch_id__in=branch_ids)
+        if account_ids is not None:
+            queryset = queryset.filter(account_id__in=account_ids)
+        for row in queryset.values(*group).annotate(**sums).order_by():
+            key = tuple(row[name] for name in group) if by_branch else row["account_id"]
+            columns = totals.setdefault(key, {})
+            for index, name in enumerate(names):
+                if row.get(f"d{index}") is None and row.get(f"c{index}") is None:
+                    # no postings of the account in this range
+                    continue
+                debit, credit = columns.get(name, (ZERO, ZERO))
+                columns[name] = (debit + (row.get(f"d{index}") or ZERO), credit + (row.get(f"c{index}") or ZERO))
+    # SQLite sums decimals as floats
+    return {
+        key: {name: (debit.quantize(CENT), credit.quantize(CENT)) for name, (debit, credit) in columns.items()}
+        for key, columns in totals.items()
+    }
+
+
+def balances_as_of(as_of, branch_ids=None, account_ids=None, by_branch=False, using=None):
+    """
+    Debit / credit totals of all postings up to and including `as_of`:
+    {account_id: (debit, credit)}, or {(branch_id, account_id): ...} with
+    `by_branch`. Whole months come from the rollup; only the postings of
+    `as_of`'s own month up to that day are summed from the GL (none when
+    `as_of` is a month end).
+    """
+    totals = balances_for_ranges({"as_of": (None, as_of)}, branch_ids, account_ids, by_branch, using)
+    return {key: columns["as_of"] for key, columns in totals.items() if "as_of" in columns}
+
+
+def balances_between(date_from, date_to, branch_ids=None, account_ids=None, by_branch=False, using=None):
+    """Debit / credit totals of the postings dated `date_from` to `date_to`, shaped like balances_as_of()."""
+    totals = balances_for_ranges({"range": (date_from, date_to)}, branch_ids, account_ids, by_branch, using)
+    return {key: columns["range"] for key, columns in totals.items() if "range" in columns}
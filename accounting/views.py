@@ -1,7 +1,11 @@
 # api/views.py
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
+from rest_framework.exceptions import NotFound
 from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from .filters import (
     BankAccountsFilter,
@@ -14,6 +18,7 @@ from .filters import (
     PaymentMethodFilter,
 )
 from .models import (
+    Accounts,
     BankAccounts,
     CashTransfer,
     ChartofAccounts,
@@ -29,12 +34,23 @@ from .serializers import (
     ChartofAccountsSerializer,
     ChequeRegisterSerializer,
     CurrencySerializer,
+    FinancialStatementParamsSerializer,
     GeneralLedgerSerializer,
     JournalVoucherSerializer,
     PaymentMethodSerializer,
+    ReportPeriodParamsSerializer,
 )
 
+from accounting.utils.account_statement import AccountStatement
+from accounting.utils.financial_statements import build_statement
 from core.utils.BaseModelViewSet import BaseModelViewSet
+from core.utils.branchContext import get_branch_context
+from core.utils.dbRouting import ReplicaReadMixin
+from core.utils.FastJSON import FastJSONRenderer, json_dumps
+from core.utils.KeysetPagination import PagedKeysetPagination
+from core.utils.referenceCacheAPI import ReferenceCacheMixin
+from core.utils.searchIndexAPI import IndexedSearchFilter
+from core.utils.StreamingExport import CSVRenderer, NDJSONRenderer, StreamingExportMixin
 
 class ChartofAccountsViewSet(BaseModelViewSet):
     queryset = ChartofAccounts.objects.all()
@@ -56,7 +72,7 @@ class BankAccountsViewSet(BaseModelViewSet):
     ordering = ("name",)
 
 
-class CurrencyViewSet(BaseModelViewSet):
+class CurrencyViewSet(ReferenceCacheMixin, BaseModelViewSet):
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
     filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
@@ -66,7 +82,7 @@ class CurrencyViewSet(BaseModelViewSet):
     ordering = ("name",)
 
 
-class PaymentMethodViewSet(BaseModelViewSet):
+class PaymentMethodViewSet(ReferenceCacheMixin, BaseModelViewSet):
     queryset = PaymentMethod.objects.all()
     serializer_class = PaymentMethodSerializer
     filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
@@ -76,19 +92,20 @@ class PaymentMethodViewSet(BaseModelViewSet):
     ordering = ("name",)
 
 
-class GeneralLedgerViewSet(viewsets.ReadOnlyModelViewSet):
+class GeneralLedgerViewSet(ReplicaReadMixin, StreamingExportMixin, viewsets.ReadOnlyModelViewSet):
     queryset = GeneralLedger.objects.all()
     serializer_class = GeneralLedgerSerializer
     filter_backends = (DjangoFilterBackend, OrderingFilter)
     filterset_class = GeneralLedgerFilter
     ordering_fields = ("posting_date", "id", "debit", "credit")
     ordering = ("-posting_date", "-id")
+    pagination_class = PagedKeysetPagination
 
 
 class JournalVoucherViewSet(BaseModelViewSet):
     queryset = JournalVoucher.objects.all().prefetch_related("items")
     serializer_class = JournalVoucherSerializer
-    filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
+    filter_backends = (DjangoFilterBackend, IndexedSearchFilter, OrderingFilter)
     filterset_class = JournalVoucherFilter
     search_fields = ("jv_no", "description")
     ordering_fields = ("jv_date", "jv_no", "approved", "id")
@@ -113,3 +130,100 @@ class CashTransferViewSet(BaseModelViewSet):
     search_fields = ("cash_transfer_no", "description")
     ordering_fields = ("ct_date", "cash_transfer_no", "approved", "id")
     ordering = ("-ct_date", "-id")
+
+
+class FinancialStatementView(APIView):
+    """
+    GET /accounting/reports/<trial-balance|profit-and-loss|balance-sheet>/
+    ?date_from=&date_to=&branch=<id>&branch=<id>&compare=previous_period|previous_year&periods=&include_zero=
+
+    Main-branch users get every branch unless `branch` narrows it; everyone
+    else gets their own branch only.
+    """
+
+    statements = {
+        "trial-balance": "trial_balance",
+        "profit-and-loss": "profit_and_loss",
+        "balance-sheet": "balance_sheet",
+    }
+
+    def get(self, request, statement):
+        if statement not in self.statements:
+            raise NotFound(f"Unknown statement; expected one of {', '.join(self.statements)}.")
+        params = FinancialStatementParamsSerializer(data={
+            **request.query_params.dict(), "branch": request.query_params.getlist("branch"),
+        })
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        ctx = get_branch_context(request)
+        if ctx.is_main_branch:
+            branch_ids = data["branch"] or None
+        else:
+            branch_ids = [ctx.branch_id]
+
+        return Response(build_statement(
+            self.statements[statement], data["date_from"], data["date_to"], branch_ids=branch_ids,
+            compare=data.get("compare"), periods=data["periods"], include_zero=data["include_zero"],
+        ))
+
+
+def _statement_json(statement):
+    """The statement as one JSON document, written a line at a time."""
+    rows = statement.rows()
+    opening = next(rows)
+    yield json_dumps(statement.header())[:-1] + b',"opening":' + json_dumps(opening) + b',"lines":['
+    separator = b""
+    for row in rows:
+        if row["type"] == "closing":
+            yield b'],"closing":' + json_dumps(row) + b"}"
+            return
+        yield separator + json_dumps(row)
+        separator = b","
+
+
+class AccountStatementView(ReplicaReadMixin, APIView):
+    """
+    GET /accounting/accounts/<id>/statement/?date_from=&date_to=&branch=<id>
+
+    Opening balance, every line between the dates with its running balance,
+    and the closing balance of one account (chart of accounts, bank or
+    actor), streamed: as one JSON document (`opening`, `lines`, `closing`),
+    or row by row with `?format=ndjson` / `?format=csv`. Main-branch users
+    may narrow the lines to some branches; everyone else gets their own
+    branch's accounts and lines only.
+    """
+
+    renderer_classes = [FastJSONRenderer, NDJSONRenderer, CSVRenderer]
+
+    def get(self, request, pk):
+        params = ReportPeriodParamsSerializer(data={
+            **request.query_params.dict(), "branch": request.query_params.getlist("branch"),
+        })
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        ctx = get_branch_context(request)
+        accounts = Accounts.objects.select_related("actor", "bank_account", "chart_account")
+        if ctx.is_main_branch:
+            branch_ids = data["branch"] or None
+        else:
+            accounts = accounts.filter(branch_id=ctx.branch_id)
+            branch_ids = [ctx.branch_id]
+        account = accounts.filter(pk=pk).first()
+        if account is None:
+            raise NotFound("Account not found.")
+
+        statement = AccountStatement(account, data["date_from"], data["date_to"], branch_ids=branch_ids)
+        renderer = request.accepted_renderer
+        if isinstance(renderer, CSVRenderer):
+            content = renderer.lines(statement.rows())
+        elif isinstance(renderer, NDJSONRenderer):
+            content = (renderer.line(row) for row in statement.rows())
+        else:
+            content = _statement_json(statement)
+        content_type = f"{renderer.media_type}; charset={renderer.charset or 'utf-8'}"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        if renderer.format in ("csv", "ndjson"):
+            response["Content-Disposition"] = f'attachment; filename="statement-{account.pk}.{renderer.format}"'
+        return response
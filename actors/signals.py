@@ -1,7 +1,9 @@
+from django.apps import apps
 from django.db.models.signals import post_save, post_delete
 from actors.models import BookingAgency, Carrier, CustomsAgent, Vendor, Customer, Department, Designation, Employee, CustomerPerson, CustomerCompany
 from actors.models import MainActor
-from actors.utils import upsert_main_actor, delete_main_actor, refresh_customer_main_actor_display
+from actors.utils import upsert_main_actor, delete_main_actor
+from core.utils.outbox import enqueue, outbox_handler
 
 
 ACTOR_SIGNAL_MAP = [
@@ -15,26 +17,59 @@ ACTOR_SIGNAL_MAP = [
     (Employee, "employee", MainActor.ActorType.EMPLOYEE),
 ]
 
+UPSERT_MAIN_ACTOR = "actors.upsert_main_actor"
 
-def register_main_actor_signals():
+
+def enqueue_main_actor_upsert(model, pk):
+    label = model._meta.label
+    enqueue(UPSERT_MAIN_ACTOR, {"model": label, "pk": pk}, key=f"{UPSERT_MAIN_ACTOR}:{label}:{pk}")
+
+
+def ensure_main_actor(instance):
+    """Create the MainActor now if its (queued) upsert has not run yet."""
+    main_actor = getattr(instance, "main_actor", None) if instance is not None else None
+    if main_actor is not None or instance is None:
+        return main_actor
     for model, field_name, actor_type in ACTOR_SIGNAL_MAP:
+        if isinstance(instance, model):
+            main_actor = upsert_main_actor(instance, field_name=field_name, actor_type=actor_type)
+            instance.main_actor = main_actor
+            return main_actor
+    return None
+
 
-        def _post_save(sender, instance, **kwargs):
+@outbox_handler(UPSERT_MAIN_ACTOR)
+def _upsert_main_actor_event(payload):
+    model = apps.get_model(payload["model"])
+    instance = model.objects.filter(pk=payload["pk"]).first()
+    if instance is None:
+        # deleted since; the MainActor went with it (CASCADE)
+        return
+    for actor_model, field_name, actor_type in ACTOR_SIGNAL_MAP:
+        if actor_model is model:
             upsert_main_actor(instance, field_name=field_name, actor_type=actor_type)
+            return
 
-        def _post_delete(sender, instance, **kwargs):
-            delete_main_actor(instance, field_name=field_name)
 
+def register_main_actor_signals():
+    def _post_save(sender, instance, raw=False, **kwargs):
+        if not raw:
+            enqueue_main_actor_upsert(sender, instance.pk)
+
+    def _post_delete(sender, instance, **kwargs):
+        field_name = next(field for model, field, _ in ACTOR_SIGNAL_MAP if model is sender)
+        delete_main_actor(instance, field_name=field_name)
+
+    for model, field_name, actor_type in ACTOR_SIGNAL_MAP:
         post_save.connect(_post_save, sender=model, dispatch_uid=f"mainactor_postsave_{model.__name__}")
         post_delete.connect(_post_delete, sender=model, dispatch_uid=f"mainactor_postdelete_{model.__name__}")
 
-    def _customer_person_company_save(sender, instance, **kwargs):
-        refresh_customer_main_actor_display(instance.customer)
-
-    def _customer_person_company_delete(sender, instance, **kwargs):
-        refresh_customer_main_actor_display(instance.customer)
+    def _customer_person_company_changed(sender, instance, **kwargs):
+        if instance.customer_id and not kwargs.get("raw", False):
+            # the customer's display name comes from its person / company
+            enqueue_main_actor_upsert(Customer, instance.customer_id)
 
-    post_save.connect(_customer_person_company_save, sender=CustomerPerson, dispatch_uid="customerperson_refresh_mainactor")
-    post_save.connect(_customer_person_company_save, sender=CustomerCompany, dispatch_uid="customercompany_refresh_mainactor")
-    post_delete.connect(_customer_person_company_delete, sender=CustomerPerson, dispatch_uid="customerperson_refresh_mainactor_del")
-    post_delete.connect(_customer_person_company_delete, sender=CustomerCompany, dispatch_uid="customercompany_refresh_mainactor_del")
+    post_save.connect(_customer_person_company_changed, sender=CustomerPerson, dispatch_uid="customerperson_refresh_mainactor")
+    post_save.connect(_customer_person_company_changed, sender=CustomerCompany, dispatch_uid="customercompany_refresh_mainactor")
+    post_delete.connect(_customer_person_company_changed, sender=CustomerPerson, dispatch_uid="customerperson_refresh_mainactor_del")
+    post_delete.connect(_customer_person_company_changed, sender=CustomerCompany, dispatch_uid="customercompany_refresh_mainactor_del")
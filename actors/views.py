@@ -14,6 +14,7 @@ from actors.filters import (
     DepartmentFilter, DesignationFilter, EmployeeFilter, MainActorFilter,
 )
 from core.utils.BaseModelViewSet import BaseModelViewSet 
+from core.utils.dbRouting import ReplicaReadMixin
 
 
 class BulkCreateMixin:
@@ -98,7 +99,7 @@ class EmployeeViewSet(BaseModelViewSet):
     ordering_fields = ["first_name", "last_name", "created"]
 
 
-class MainActorViewSet(viewsets.ReadOnlyModelViewSet):
+class MainActorViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = MainActor.objects.all()
     serializer_class = MainActorSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
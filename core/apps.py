@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core.utils.modelCapabilities import build_model_registry
+        build_model_registry()
+
+        from core.signals import register_seed_signals
+        register_seed_signals(self)
+
+        from core.utils.referenceCache import register_reference_cache_signals
+        register_reference_cache_signals()
+
+        from core.utils.authCache import register_auth_cache_signals
+        register_auth_cache_signals()
+
+        from core.utils.sqliteProfile import register_sqlite_profile_signals
+        register_sqlite_profile_signals()
+
+        from core.utils.searchIndex import register_search_index_signals
+        register_search_index_signals(self)
@@ -0,0 +1,50 @@
+from django.db.backends.sqlite3 import base
+
+from core.utils.sqliteProfile import WriteGate, in_read_transactions
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Stock SQLite backend plus the production profile of
+    core.utils.sqliteProfile: pragmas on connect (connection_created) and a
+    per-process write gate held from BEGIN to COMMIT / ROLLBACK. Use it with
+    OPTIONS["transaction_mode"] = "IMMEDIATE" so transactions of other
+    processes wait on busy_timeout instead of failing on lock upgrade.
+
+    Both only apply to transactions that may write: inside
+    `read_transactions()` (every GET / HEAD / OPTIONS request, see
+    ReadTransactionsMiddleware) BEGIN is DEFERRED and the gate is not taken.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.write_gate = WriteGate(self.settings_dict)
+
+    def _start_transaction_under_autocommit(self):
+        if in_read_transactions():
+            self.cursor().execute("BEGIN DEFERRED")
+            return
+        self.write_gate.acquire()
+        try:
+            super()._start_transaction_under_autocommit()
+        except Exception:
+            self.write_gate.release()
+            raise
+
+    def _commit(self):
+        result = super()._commit()
+        # on failure the transaction is still open; the rollback that follows releases the gate
+        self.write_gate.release()
+        return result
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self.write_gate.release()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self.write_gate.release()
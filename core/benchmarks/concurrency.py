@@ -0,0 +1,88 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import OperationalError, connections, transaction
+
+# The same workload against a scratch SQLite file with the stock backend and
+# with the production profile (core.backends.sqlite3: WAL, busy_timeout,
+# BEGIN IMMEDIATE, write gate). Each transaction reads a counter, bumps it
+# and appends a row: the read-then-write shape of LocalSequence.next, the
+# balance adjustments and JournalVoucher.save.
+PROFILES = [
+    ("stock", {"ENGINE": "django.db.backends.sqlite3"}),
+    ("profile", {"ENGINE": "core.backends.sqlite3", "OPTIONS": {"transaction_mode": "IMMEDIATE"}}),
+]
+
+
+def _transaction(alias, worker):
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT value FROM bench_counter WHERE id = 1")
+            value = cursor.fetchone()[0]
+            cursor.execute("UPDATE bench_counter SET value = %s WHERE id = 1", [value + 1])
+            cursor.execute("INSERT INTO bench_ledger (seq, worker) VALUES (%s, %s)", [value + 1, worker])
+
+
+def _worker(alias, worker, transactions, results):
+    ok = failed = 0
+    try:
+        for _ in range(transactions):
+            try:
+                _transaction(alias, worker)
+                ok += 1
+            except OperationalError:
+                failed += 1
+    finally:
+        connections[alias].close()
+    results.append((ok, failed))
+
+
+def run_profile(name, settings_dict, threads, transactions, directory):
+    alias = f"benchmark_{name}"
+    configured = connections.configure_settings(
+        {**connections.settings, alias: {**settings_dict, "NAME": str(Path(directory) / f"{name}.sqlite3")}}
+    )
+    connections.settings[alias] = configured[alias]
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("CREATE TABLE bench_counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)")
+            cursor.execute("CREATE TABLE bench_ledger (id INTEGER PRIMARY KEY AUTOINCREMENT, seq INTEGER NOT NULL, worker INTEGER NOT NULL)")
+            cursor.execute("INSERT INTO bench_counter (id, value) VALUES (1, 0)")
+        connections[alias].close()
+
+        results = []
+        pool = [threading.Thread(target=_worker, args=(alias, i, transactions, results)) for i in range(threads)]
+        start = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT value FROM bench_counter WHERE id = 1")
+            counter = cursor.fetchone()[0]
+        connections[alias].close()
+    finally:
+        del connections[alias]
+        del connections.settings[alias]
+
+    committed = sum(ok for ok, _ in results)
+    return {
+        "name": f"sqlite.concurrency.{name}",
+        "kind": "concurrency",
+        "threads": threads,
+        "attempted": threads * transactions,
+        "committed": committed,
+        "failed": sum(failed for _, failed in results),
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "throughput_tps": round(committed / elapsed, 1) if elapsed else None,
+        "consistent": counter == committed,
+    }
+
+
+def run_sqlite_concurrency(threads=8, transactions=200):
+    with tempfile.TemporaryDirectory(prefix="sqlite-concurrency-") as directory:
+        return [run_profile(name, settings_dict, threads, transactions, directory) for name, settings_dict in PROFILES]
@@ -0,0 +1,69 @@
+import io
+import time
+
+from django.utils.text import compress_string
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.utils.FastJSON import FastJSONParser, FastJSONRenderer
+
+# Renderer / parser throughput on an invoice list of `rows` rows: SalesSerializer
+# output (what the API actually renders) and raw `.values()` rows (Decimal,
+# UUID, date and datetime objects, the encoder's own conversions).
+RENDERERS = [("drf", JSONRenderer), ("fast", FastJSONRenderer)]
+PARSERS = [("drf", JSONParser), ("fast", FastJSONParser)]
+
+
+def invoice_payloads(rows):
+    from sales.models import Sales
+    from sales.serializers import SalesSerializer
+
+    sample = list(Sales.objects.select_related("customer", "currency", "shipment", "branch").prefetch_related("items")[:200])
+    if not sample:
+        return {}
+    serialized = SalesSerializer(sample, many=True).data
+    values = list(Sales.objects.values()[:200])
+    return {
+        "serialized": [serialized[i % len(serialized)] for i in range(rows)],
+        "values": [values[i % len(values)] for i in range(rows)],
+    }
+
+
+def _time(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), sorted(timings)[len(timings) // 2], result
+
+
+def _result(name, rows, best, median, **extra):
+    return {
+        "name": name,
+        "kind": "renderer",
+        "rows": rows,
+        "min_ms": round(best * 1000, 3),
+        "median_ms": round(median * 1000, 3),
+        "rows_per_s": round(rows / median) if median else None,
+        **extra,
+    }
+
+
+def run_renderer_benchmark(rows=10000, iterations=5):
+    results = []
+    for variant, data in invoice_payloads(rows).items():
+        body = None
+        for label, renderer_class in RENDERERS:
+            renderer = renderer_class()
+            best, median, body = _time(lambda: renderer.render(data, "application/json", {}), iterations)
+            results.append(_result(f"render.{variant}.{label}", rows, best, median, bytes=len(body)))
+
+        best, median, compressed = _time(lambda: compress_string(body, max_random_bytes=100), iterations)
+        results.append(_result(f"gzip.{variant}", rows, best, median, bytes=len(compressed), ratio=round(len(compressed) / len(body), 3)))
+
+        for label, parser_class in PARSERS:
+            parser = parser_class()
+            best, median, _ = _time(lambda: parser.parse(io.BytesIO(body), "application/json", {}), iterations)
+            results.append(_result(f"parse.{variant}.{label}", rows, best, median))
+    return results
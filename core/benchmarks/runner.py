@@ -0,0 +1,186 @@
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+# Endpoints are hit in-process through the test client with a main-branch
+# superuser, so numbers include auth, filtering, pagination and rendering.
+ENDPOINTS = [
+    ("shipments.list", "/operations/shipments/"),
+    ("shipments.list.search", "/operations/shipments/?search=SHP"),
+    ("payment-summaries.list", "/operations/payment-summaries/"),
+    ("shipment-charges.list", "/operations/shipment-charges/"),
+    ("sales.list", "/sales/sales/"),
+    ("customer-payments.list", "/sales/customer-payments/"),
+    ("general-ledger.list", "/accounting/general-ledger/"),
+    ("general-ledger.list.deep", "/accounting/general-ledger/?ordering=-posting_date&page_size=200"),
+    ("journal-vouchers.list", "/accounting/journal-vouchers/"),
+    ("customers.list", "/actors/customers/"),
+    ("handling-units.list", "/warehouse/handling-units/"),
+    ("inventory-moves.list", "/warehouse/inventory-moves/"),
+    ("pickup-orders.list", "/pickup/pickup-orders/"),
+]
+
+
+def _recompute_sales_totals():
+    from sales.models import Sales
+
+    for sale in Sales.objects.order_by("-invoice_date")[:50]:
+        sale.recompute_totals()
+
+
+def _recompute_payment_summaries():
+    from operations.models import PaymentSummary
+
+    for summary in PaymentSummary.objects.order_by("-created")[:50]:
+        summary.recompute_from_lines()
+
+
+def _trial_balance_query():
+    from django.db.models import Sum
+    from accounting.models import GeneralLedger
+
+    list(GeneralLedger.objects.values("branch_id", "account_id").annotate(dr=Sum("debit"), cr=Sum("credit")))
+
+
+# Service functions run inside a transaction that is rolled back, so every
+# iteration sees the same data.
+SERVICES = [
+    ("sales.recompute_totals x50", _recompute_sales_totals),
+    ("payment_summary.recompute_from_lines x50", _recompute_payment_summaries),
+    ("gl.trial_balance_aggregate", _trial_balance_query),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _summarize(name, kind, timings, queries, status=None):
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[min(len(timings_ms) - 1, int(round(0.95 * (len(timings_ms) - 1))))]
+    result = {
+        "name": name,
+        "kind": kind,
+        "iterations": len(timings_ms),
+        "min_ms": round(timings_ms[0], 3),
+        "median_ms": round(statistics.median(timings_ms), 3),
+        "p95_ms": round(p95, 3),
+        "max_ms": round(timings_ms[-1], 3),
+        "queries": queries,
+    }
+    if status is not None:
+        result["status"] = status
+    return result
+
+
+class BenchmarkRunner:
+    def __init__(self, *, iterations=10, warmup=2, only=None, stdout=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.only = only
+        self.stdout = stdout
+
+    def log(self, msg):
+        if self.stdout is not None:
+            self.stdout.write(msg)
+
+    def selected(self, name):
+        return not self.only or any(token in name for token in self.only)
+
+    def client(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        from core.models import CustomUser
+        from master.models import Branch
+
+        branch = Branch.objects.filter(is_main_branch=True).first()
+        user = CustomUser.objects.filter(username="benchmark-runner").first()
+        if user is None:
+            user = CustomUser.objects.create_superuser(
+                username="benchmark-runner", email="benchmark-runner@example.invalid", branch=branch,
+            )
+        client = Client()
+        client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+        return client
+
+    def time_endpoint(self, client, name, path):
+        timings, queries, status = [], 0, None
+        for i in range(self.warmup + self.iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(path)
+                if getattr(response, "streaming", False):
+                    for _ in response.streaming_content:
+                        pass
+                elapsed = time.perf_counter() - start
+            status = response.status_code
+            if i >= self.warmup:
+                timings.append(elapsed)
+                queries = len(captured.captured_queries)
+        return _summarize(name, "endpoint", timings, queries, status)
+
+    def time_service(self, name, func):
+        timings, queries = [], 0
+        for i in range(self.warmup + self.iterations):
+            try:
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as captured:
+                        start = time.perf_counter()
+                        func()
+                        elapsed = time.perf_counter() - start
+                    raise _Rollback()
+            except _Rollback:
+                pass
+            if i >= self.warmup:
+                timings.append(elapsed)
+                queries = len(captured.captured_queries)
+        return _summarize(name, "service", timings, queries)
+
+    def dataset(self):
+        from django.apps import apps
+
+        labels = ["operations.Shipment", "sales.Sales", "accounting.GeneralLedger", "warehouse.HandlingUnit", "pickup.PickupOrder"]
+        return {label: apps.get_model(label).objects.count() for label in labels}
+
+    def run(self):
+        results = []
+        client = self.client()
+        for name, path in ENDPOINTS:
+            if self.selected(name):
+                results.append(self.time_endpoint(client, name, path))
+                self.log(f"  {name}: {results[-1]['median_ms']} ms median, {results[-1]['queries']} queries")
+        for name, func in SERVICES:
+            if self.selected(name):
+                results.append(self.time_service(name, func))
+                self.log(f"  {name}: {results[-1]['median_ms']} ms median, {results[-1]['queries']} queries")
+
+        return {
+            "meta": {
+                "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "iterations": self.iterations,
+                "warmup": self.warmup,
+                "dataset": self.dataset(),
+            },
+            "results": results,
+        }
@@ -0,0 +1,120 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+# Run in a fresh interpreter with `-X importtime`: settings, app / model
+# import (apps.populate), every AppConfig.ready() and the URLconf, i.e. what a
+# worker does before it can serve its first request.
+PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings_module!r})
+
+from django.apps.config import AppConfig
+
+ready_ms = {{}}
+_create = AppConfig.create.__func__
+
+def _timed_create(cls, entry):
+    config = _create(cls, entry)
+    ready = config.ready
+
+    def timed_ready():
+        t = time.perf_counter()
+        ready()
+        ready_ms[config.label] = (time.perf_counter() - t) * 1000
+
+    config.ready = timed_ready
+    return config
+
+AppConfig.create = classmethod(_timed_create)
+
+import django
+from django.conf import settings
+t = time.perf_counter()
+settings.INSTALLED_APPS
+phases = {{"settings": (time.perf_counter() - t) * 1000}}
+t = time.perf_counter()
+django.setup()
+phases["setup"] = (time.perf_counter() - t) * 1000
+if {urls!r}:
+    from django.urls import get_resolver
+    t = time.perf_counter()
+    get_resolver().url_patterns
+    phases["urls"] = (time.perf_counter() - t) * 1000
+phases["total"] = (time.perf_counter() - start) * 1000
+phases["apps_ready"] = sum(ready_ms.values())
+print(json.dumps({{"phases": phases, "ready_ms": ready_ms}}))
+"""
+
+
+def _parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from `-X importtime` output."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+def _probe(urls):
+    source = PROBE.format(settings_module=os.environ.get("DJANGO_SETTINGS_MODULE", "mainserver.settings"), urls=urls)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source],
+        cwd=Path(settings.BASE_DIR), capture_output=True, text=True, check=False,
+    )
+    if completed.returncode:
+        raise RuntimeError(f"Startup probe failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), _parse_importtime(completed.stderr)
+
+
+def _project_package(name):
+    top = name.split(".", 1)[0]
+    return (Path(settings.BASE_DIR) / top).is_dir()
+
+
+def run_startup_profile(runs=3, urls=True, limit=25):
+    """
+    Median phase / ready() timings over `runs` cold starts, and the import
+    costs of the last one: slowest modules by self and cumulative time and
+    self time summed per top-level package.
+    """
+    samples = [_probe(urls) for _ in range(runs)]
+    modules = samples[-1][1]
+
+    phases = {key: round(statistics.median(s["phases"][key] for s, _ in samples), 1) for key in samples[0][0]["phases"]}
+    ready_ms = {
+        label: round(statistics.median(s["ready_ms"].get(label, 0) for s, _ in samples), 1)
+        for label in samples[0][0]["ready_ms"]
+    }
+
+    packages = defaultdict(int)
+    for name, own, _ in modules:
+        packages[name.split(".", 1)[0]] += own
+
+    def rows(items, key):
+        return [
+            {"module": name, "self_ms": round(own / 1000, 1), "cumulative_ms": round(cumulative / 1000, 1), "project": _project_package(name)}
+            for name, own, cumulative in sorted(items, key=key, reverse=True)[:limit]
+        ]
+
+    return {
+        "runs": runs,
+        "phases_ms": phases,
+        "ready_ms": dict(sorted(ready_ms.items(), key=lambda item: item[1], reverse=True)),
+        "modules": len(modules),
+        "by_self": rows(modules, key=lambda m: m[1]),
+        "by_cumulative": rows(modules, key=lambda m: m[2]),
+        "by_package": [
+            {"package": name, "self_ms": round(own / 1000, 1), "project": _project_package(name)}
+            for name, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+        ],
+    }
@@ -0,0 +1,400 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from accounting.utils.gl_rollup import post_to_rollup
+from core.seeders.seed_default import run_seed_pipeline, seed_chart_of_accounts
+from core.utils.searchIndex import install_search_indexes
+
+PORTS = ["NPKTM", "AEJEA", "INNSA", "CNSHA", "SGSIN", "NLRTM", "DEHAM", "USNYC", "GBFXT", "HKHKG"]
+CHARGES = ["Ocean Freight", "Air Freight", "THC", "Documentation", "Customs Clearance", "Trucking", "Insurance"]
+CITIES = ["Kathmandu", "Dubai", "Mumbai", "Shanghai", "Singapore", "Rotterdam", "Hamburg"]
+
+
+class SyntheticDataGenerator:
+    """
+    Builds a realistic freight-forwarder dataset with bulk inserts only.
+
+    Rows are created directly with bulk_create, so model save() overrides,
+    signals and simple_history are skipped on purpose. The rows those hooks
+    would have produced (MainActor + Accounts for parties, GL rows for
+    approved JVs and their period balances, PaymentSummary per shipment) are
+    built explicitly here, and
+    the search index is refilled at the end.
+    """
+
+    def __init__(self, *, branches=2, customers=50, vendors=20, shipments=500, pickups=200,
+                 batch_size=2000, seed=42, stdout=None):
+        self.n_branches = branches
+        self.n_customers = customers
+        self.n_vendors = vendors
+        self.n_shipments = shipments
+        self.n_pickups = pickups
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.run = uuid.uuid4().hex[:6].upper()
+        self.stdout = stdout
+        self.counts = {}
+        self.today = timezone.localdate()
+
+    # --- helpers ----------------------------------------------------------
+
+    def log(self, msg):
+        if self.stdout is not None:
+            self.stdout.write(msg)
+
+    def insert(self, Model, objs):
+        if objs:
+            Model.objects.bulk_create(objs, batch_size=self.batch_size)
+            key = Model._meta.label
+            self.counts[key] = self.counts.get(key, 0) + len(objs)
+        return objs
+
+    def money(self, low, high):
+        return Decimal(self.rng.randint(low * 100, high * 100)) / 100
+
+    def past_date(self, days=730):
+        return self.today - timedelta(days=self.rng.randint(0, days))
+
+    def phone(self):
+        return f"98{self.rng.randint(10000000, 99999999)}"
+
+    # --- reference data ---------------------------------------------------
+
+    def reference_data(self):
+        from accounting.models import Currency
+        from master.models import MasterData, UnitofMeasurement, UnitofMeasurementLength
+
+        run_seed_pipeline()
+        self.currency = Currency.objects.order_by("id").first()
+        self.agency = MasterData.objects.order_by("type_master", "name").first()
+        self.uom = UnitofMeasurement.objects.first() or UnitofMeasurement.objects.create(
+            name="Kilogram", symbol="kg", conversion_to_kg=Decimal("1")
+        )
+        self.uom_length = UnitofMeasurementLength.objects.first() or UnitofMeasurementLength.objects.create(
+            name="Centimeter", symbol="cm", conversion_to_cm=Decimal("1")
+        )
+
+    def branches(self):
+        from accounting.models import ChartofAccounts
+        from master.models import Branch
+
+        branches = [
+            Branch(
+                branch_id=f"SYN{self.run}{i:04d}",
+                name=f"Synthetic Branch {self.run}-{i}",
+                address="Synthetic Street",
+                city=self.rng.choice(CITIES),
+                state="State",
+                country="Nepal",
+                contact_number=self.phone(),
+            )
+            for i in range(self.n_branches)
+        ]
+        self.insert(Branch, branches)
+        self.counts["accounting.ChartofAccounts"] = seed_chart_of_accounts(branches)
+
+        self.coa = {}
+        for chart in ChartofAccounts.objects.filter(branch__in=branches, code__in=["1110", "1200", "2200", "4100", "5100"]):
+            self.coa[(chart.branch_id, chart.code)] = chart
+        return branches
+
+    # --- parties ----------------------------------------------------------
+
+    def parties(self, branch):
+        from accounting.models import Accounts
+        from actors.models import Customer, MainActor, Vendor
+
+        customers = [
+            Customer(
+                branch=branch,
+                customer_type="company",
+                country="Nepal",
+                city=self.rng.choice(CITIES),
+                address_line_1=f"{self.rng.randint(1, 999)} Trade Road",
+                mobile_country_code="+977",
+                mobile_no=self.phone(),
+                account=self.coa[(branch.pk, "1200")],
+                currency=self.currency,
+                credit_limit=self.money(1000, 50000),
+                remarks=f"Synthetic customer {i}",
+            )
+            for i in range(self.n_customers)
+        ]
+        vendors = [
+            Vendor(
+                branch=branch,
+                name=f"Vendor {self.run}-{i}",
+                address="Vendor Lane",
+                country="Nepal",
+                agency=self.agency,
+                currency=self.currency,
+                account=self.coa[(branch.pk, "2200")],
+                cellphone_country_code="+977",
+                cellphone=self.phone(),
+            )
+            for i in range(self.n_vendors)
+        ]
+        self.insert(Customer, customers)
+        self.insert(Vendor, vendors)
+
+        actors, accounts = [], []
+        for kind, rows in (("customer", customers), ("vendor", vendors)):
+            for row in rows:
+                name = getattr(row, "name", None) or row.remarks
+                actor = MainActor(branch=branch, actor_type=kind, display_name=name, **{kind: row})
+                actors.append(actor)
+                accounts.append(Accounts(branch=branch, name=name, source=Accounts.SourceType.ACTOR, actor=actor))
+        self.insert(MainActor, actors)
+        self.insert(Accounts, accounts)
+        return customers, vendors
+
+    # --- operations / sales / accounting ----------------------------------
+
+    def shipments(self, branch, customers):
+        from operations.models import (
+            PaymentSummary, Shipment, ShipmentCharges, ShipmentCostings, ShipmentPackages, ShipmentTransportInfo,
+        )
+
+        shipments, summaries, transport, packages, charges, costings = [], [], [], [], [], []
+        for i in range(self.n_shipments):
+            origin, destination = self.rng.sample(PORTS, 2)
+            created = self.past_date()
+            mode = self.rng.choice(["air", "ocean", "land"])
+            shipment = Shipment(
+                branch=branch,
+                transportation_mode=mode,
+                direction=self.rng.choice(["export", "import"]),
+                origin_port=origin,
+                destination_port=destination,
+                shipper=f"Shipper {i}",
+                consignee=f"Consignee {i}",
+                created_date=created,
+                doc_ref_no=f"SHP-{self.run}-{branch.branch_id[-4:]}-{i:06d}",
+                scheduled_start_date=created,
+                scheduled_end_date=created + timedelta(days=self.rng.randint(3, 40)),
+            )
+            shipments.append(shipment)
+            transport.append(ShipmentTransportInfo(
+                branch=branch,
+                shipment=shipment,
+                port_of_departure=origin,
+                port_of_arrival=destination,
+                bill_of_lading=f"BL{self.run}{branch.branch_id[-4:]}{i:06d}",
+                tracking_no=f"TRK{self.run}{branch.branch_id[-4:]}{i:06d}",
+                expected_start_date=created,
+            ))
+
+            total_charges, total_costings = Decimal("0"), Decimal("0")
+            summary = PaymentSummary(branch=branch, shipment=shipment, currency=self.currency)
+            for n in range(self.rng.randint(1, 3)):
+                packages.append(ShipmentPackages(
+                    branch=branch,
+                    shipment=shipment,
+                    # set explicitly: the field default runs a query per row
+                    shipment_package=f"PKG-{self.run}-{i:06d}-{n}",
+                    good_desc="General cargo",
+                    length=self.rng.randint(20, 120),
+                    width=self.rng.randint(20, 120),
+                    height=self.rng.randint(20, 120),
+                    package_unit=self.uom_length,
+                    gross_weight=self.rng.randint(5, 900),
+                    mass_unit=self.uom,
+                    quantity=self.rng.randint(1, 20),
+                ))
+            for name in self.rng.sample(CHARGES, 2):
+                amount = self.money(50, 2500)
+                total_charges += amount
+                charges.append(ShipmentCharges(
+                    branch=branch, payment_summary=summary, charge_name=name, qty=Decimal("1"),
+                    charge_currency=self.currency, invoice_currency=self.currency,
+                    unit_price_charge=amount, subtotal_charge=amount, total_with_tax_charge=amount,
+                    unit_price_invoice=amount, subtotal_invoice=amount, total_with_tax_invoice=amount,
+                ))
+            cost = self.money(30, 1500)
+            total_costings += cost
+            costings.append(ShipmentCostings(
+                branch=branch, payment_summary=summary, charge_name=self.rng.choice(CHARGES), qty=Decimal("1"),
+                charge_currency=self.currency, invoice_currency=self.currency,
+                unit_price_charge=cost, subtotal_charge=cost, total_with_tax_charge=cost,
+                unit_price_invoice=cost, subtotal_invoice=cost, total_with_tax_invoice=cost,
+            ))
+            summary.total_amount = total_charges
+            summary.total_costings = total_costings
+            summary.profit_amount = total_charges - total_costings
+            summaries.append(summary)
+
+        self.insert(Shipment, shipments)
+        self.insert(ShipmentTransportInfo, transport)
+        self.insert(PaymentSummary, summaries)
+        self.insert(ShipmentPackages, packages)
+        self.insert(ShipmentCharges, charges)
+        self.insert(ShipmentCostings, costings)
+        return shipments, summaries
+
+    def invoices(self, branch, customers, shipments, summaries):
+        from sales.models import CustomerPayment, CustomerPaymentItems, Sales, SalesItem
+
+        sales, items, payments, allocations = [], [], [], []
+        for i, (shipment, summary) in enumerate(zip(shipments, summaries)):
+            customer = self.rng.choice(customers)
+            date = shipment.created_date
+            invoice = Sales(
+                branch=branch,
+                no=f"INV-{self.run}-{branch.branch_id[-4:]}-{i:06d}",
+                invoice_date=date,
+                due_date=date + timedelta(days=30),
+                currency=self.currency,
+                customer=customer,
+                shipment=shipment,
+                total=summary.total_amount,
+                approved=True,
+                approved_at=timezone.now(),
+                status="approved",
+                balance_due=summary.total_amount,
+            )
+            sales.append(invoice)
+            items.append(SalesItem(
+                branch=branch, sales=invoice, item_name="Freight charges",
+                quantity=Decimal("1"), rate=summary.total_amount, total=summary.total_amount,
+            ))
+            if self.rng.random() < 0.5:
+                payment = CustomerPayment(
+                    branch=branch,
+                    no=f"PAY-{self.run}-{branch.branch_id[-4:]}-{i:06d}",
+                    customer=customer,
+                    currency=self.currency,
+                    date=date + timedelta(days=self.rng.randint(1, 30)),
+                    amount=summary.total_amount,
+                    total=summary.total_amount,
+                    status="approved",
+                    approved=True,
+                    approved_at=timezone.now(),
+                )
+                payments.append(payment)
+                allocations.append(CustomerPaymentItems(
+                    branch=branch, customerpayment=payment, sales=invoice, allocated_amount=summary.total_amount,
+                ))
+                invoice.paid_amount = summary.total_amount
+                invoice.balance_due = Decimal("0")
+                invoice.status = "paid"
+
+        self.insert(Sales, sales)
+        self.insert(SalesItem, items)
+        self.insert(CustomerPayment, payments)
+        self.insert(CustomerPaymentItems, allocations)
+        return sales
+
+    def journals(self, branch, sales):
+        from accounting.models import GeneralLedger, JournalVoucher, JournalVoucherItems
+
+        receivable, income = self.coa[(branch.pk, "1200")], self.coa[(branch.pk, "4100")]
+        vouchers = [
+            JournalVoucher(
+                branch=branch,
+                jv_no=f"JV-{self.run}-{branch.branch_id[-4:]}-{i:06d}",
+                jv_date=invoice.invoice_date,
+                description=f"Invoice {invoice.no}",
+                total=invoice.total,
+                approved=True,
+                approved_at=timezone.now(),
+            )
+            for i, invoice in enumerate(sales)
+        ]
+        # JV ids are auto-increment: bulk_create returns them on SQLite/Postgres
+        self.insert(JournalVoucher, vouchers)
+
+        items, ledger = [], []
+        for jv in vouchers:
+            for account, debit, credit in ((receivable, jv.total, Decimal("0")), (income, Decimal("0"), jv.total)):
+                items.append(JournalVoucherItems(journal_voucher=jv, account=account, debit=debit, credit=credit))
+                ledger.append(GeneralLedger(
+                    branch=branch, posting_date=jv.jv_date, account=account, journal_voucher=jv,
+                    description=jv.description, debit=debit, credit=credit,
+                ))
+        self.insert(JournalVoucherItems, items)
+        self.insert(GeneralLedger, ledger)
+        post_to_rollup(ledger)
+
+    # --- warehouse / pickup -----------------------------------------------
+
+    def warehouse(self, branch, shipments):
+        from warehouse.models import HandlingUnit, Inventory, InventoryMove, Location, Warehouse, Zone
+
+        wh = Warehouse(branch=branch, name=f"Main Warehouse {branch.branch_id}", code="WH1", type="self")
+        zones = [Zone(branch=branch, warehouse=wh, name=f"Zone {z}", code=f"Z{z}") for z in range(2)]
+        locations = [
+            Location(branch=branch, zone=zone, code=f"{zone.code}-L{n:03d}", name=f"Bin {n}", type="STORAGE")
+            for zone in zones for n in range(10)
+        ]
+        receiving = Location(branch=branch, zone=zones[0], code="RCV", name="Receiving", type="RECEIVING")
+        self.insert(Warehouse, [wh])
+        self.insert(Zone, zones)
+        self.insert(Location, locations + [receiving])
+
+        units, moves, inventory = [], [], []
+        now = timezone.now()
+        for i, shipment in enumerate(shipments):
+            for n in range(self.rng.randint(1, 2)):
+                hu = HandlingUnit(
+                    branch=branch, shipment=shipment, hu_code=f"HU-{self.run}-{branch.branch_id[-4:]}-{i:06d}-{n}",
+                    status="STORED", gross_weight=self.money(5, 900), weight_uom=self.uom,
+                )
+                units.append(hu)
+                target = self.rng.choice(locations)
+                moves.append(InventoryMove(branch=branch, handling_unit=hu, move_type="RECEIVE", to_location=receiving, moved_at=now))
+                moves.append(InventoryMove(branch=branch, handling_unit=hu, move_type="PUTAWAY", from_location=receiving, to_location=target, moved_at=now))
+                inventory.append(Inventory(branch=branch, handling_unit=hu, location=target, last_moved_at=now))
+        self.insert(HandlingUnit, units)
+        self.insert(InventoryMove, moves)
+        self.insert(Inventory, inventory)
+
+    def pickups(self, branch, customers, vendors):
+        from pickup.models import PickupOrder
+
+        orders = []
+        for i in range(self.n_pickups):
+            customer = self.rng.choice(customers)
+            orders.append(PickupOrder(
+                branch=branch,
+                vendor=self.rng.choice(vendors),
+                from_location=self.rng.choice(CITIES),
+                destination=self.rng.choice(CITIES),
+                sender_Customer=customer,
+                sender_address=customer.address_line_1,
+                sender_phone=customer.mobile_no,
+                receiver_name=f"Receiver {i}",
+                receiver_address="Receiver Street",
+                receiver_phone=self.phone(),
+                service_type="standard",
+                payment_method="cash",
+                total_charge=self.money(5, 200),
+                piece=self.rng.randint(1, 10),
+                ref_no=f"PU-{self.run}-{branch.branch_id[-4:]}-{i:06d}",
+            ))
+        self.insert(PickupOrder, orders)
+
+    # --- entry point ------------------------------------------------------
+
+    def generate(self):
+        started = time.perf_counter()
+        self.reference_data()
+        with transaction.atomic():
+            branches = self.branches()
+        for branch in branches:
+            with transaction.atomic():
+                customers, vendors = self.parties(branch)
+                shipments, summaries = self.shipments(branch, customers)
+                sales = self.invoices(branch, customers, shipments, summaries)
+                self.journals(branch, sales)
+                self.warehouse(branch, shipments)
+                self.pickups(branch, customers, vendors)
+            self.log(f"  branch {branch.branch_id}: done")
+        install_search_indexes(rebuild=True)
+        self.elapsed = time.perf_counter() - started
+        return self.counts
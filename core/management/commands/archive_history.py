@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.historyPolicy import archivable, archive_chunk, archive_cutoff, history_models, history_policy_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Move superseded simple_history rows older than --days into compressed HistoryArchive chunks. "
+        "The latest history row of every object is kept."
+    )
+
+    def add_arguments(self, parser):
+        config = history_policy_config()
+        parser.add_argument("--days", type=int, default=config["ARCHIVE_AFTER_DAYS"], help="Archive history older than this many days.")
+        parser.add_argument("--models", nargs="+", help="Limit to these models, e.g. purchase.VendorBills sales.Sales.")
+        parser.add_argument("--chunk-size", type=int, default=config["ARCHIVE_CHUNK_SIZE"], help="History rows per archive chunk.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived.")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        targets = history_models(options["models"])
+        if options["models"] and len(targets) < len(options["models"]):
+            found = {model._meta.label for model, _ in targets}
+            missing = ", ".join(label for label in options["models"] if label not in found)
+            self.stderr.write(self.style.WARNING(f"No history for: {missing}"))
+
+        total = 0
+        for model, history_model in targets:
+            if options["dry_run"]:
+                moved = archivable(model, history_model, cutoff).count()
+            else:
+                moved = 0
+                while True:
+                    # one transaction per chunk, so an interrupted run keeps what it moved
+                    count = archive_chunk(model, history_model, cutoff, options["chunk_size"])
+                    if not count:
+                        break
+                    moved += count
+            if moved:
+                self.stdout.write(f"  {history_model._meta.label}: {moved}")
+            total += moved
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} history rows older than {cutoff:%Y-%m-%d}."))
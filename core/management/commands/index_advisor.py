@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.indexAdvisor import advise, create_index_sql, iter_viewsets
+
+
+class Command(BaseCommand):
+    help = (
+        "Walk every routed viewset, EXPLAIN its list query under the branch scope and each filter column, "
+        "and propose the Meta.indexes (and SQL) for queries that scan or sort the whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--apps", nargs="+", help="Only viewsets of these app labels.")
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--min-rows", type=int, default=1000,
+            help="Only propose indexes for tables with at least this many rows (0 = all).",
+        )
+        parser.add_argument("--no-explain", action="store_true", help="Propose every uncovered shape without running EXPLAIN.")
+        parser.add_argument("--sql", action="store_true", help="Also print the CREATE INDEX statements.")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the query plan of every shape.")
+
+    def handle(self, *args, **options):
+        viewsets = [
+            viewset for viewset in iter_viewsets()
+            if not options["apps"] or viewset.queryset.model._meta.app_label in options["apps"]
+        ]
+        reports, proposals = advise(
+            viewsets, using=options["database"], run_explain=not options["no_explain"], min_rows=options["min_rows"]
+        )
+
+        for report in reports:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{report.viewset.__name__} ({report.model._meta.label}, {report.rows} rows)"))
+            for shape in report.shapes:
+                flags = ", ".join(flag for flag, on in (("full scan", shape.full_scan), ("sort", shape.sort)) if on) or "index"
+                self.stdout.write(f"  {shape.label:<36} {flags}")
+                if options["verbose_plans"] and shape.plan:
+                    for line in shape.plan.splitlines():
+                        self.stdout.write(f"      {line}")
+            if report.text_search:
+                self.stdout.write(f"  substring search (no B-tree help): {', '.join(dict.fromkeys(report.text_search))}")
+            if report.low_cardinality:
+                self.stdout.write(f"  low-cardinality filters (not indexed alone): {', '.join(report.low_cardinality)}")
+            if report.skipped:
+                self.stdout.write(f"  not analysed (method / related filters): {', '.join(report.skipped)}")
+
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("Every analysed list query is served by an index."))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Proposed indexes (add to Meta.indexes, then makemigrations)"))
+        for proposal in proposals:
+            self.stdout.write(f"  {proposal.model._meta.label}: {proposal.meta()}")
+            for reason in dict.fromkeys(proposal.reasons):
+                self.stdout.write(f"      {reason}")
+            if options["sql"]:
+                self.stdout.write(f"      {create_index_sql(proposal, options['database'])}")
+        self.stdout.write(self.style.WARNING(f"{len(proposals)} index(es) proposed."))
@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.searchIndex import get_backend, indexed_models, install_search_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Create and refill the search index of every model with `search_index_fields` "
+        "(needed after bulk_create / update() / raw SQL, which skip the sync signals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--models", nargs="+", help="Only these models (app_label.ModelName).")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        backend = get_backend(options["database"])
+        if backend is None:
+            self.stdout.write(self.style.WARNING("No search index backend for this database; searches use icontains."))
+            return
+
+        models = indexed_models()
+        if options["models"]:
+            try:
+                models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as exc:
+                raise CommandError(exc)
+            missing = [model._meta.label for model in models if not getattr(model, "search_index_fields", None)]
+            if missing:
+                raise CommandError(f"No search_index_fields on: {', '.join(missing)}")
+
+        for model in install_search_indexes(options["database"], models=models, rebuild=True):
+            self.stdout.write(f"  {model._meta.label}: {', '.join(model.search_index_fields)}")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the search index ({type(backend).__name__})."))
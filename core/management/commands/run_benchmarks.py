@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks.concurrency import run_sqlite_concurrency
+from core.benchmarks.renderers import run_renderer_benchmark
+from core.benchmarks.runner import BenchmarkRunner
+
+
+class Command(BaseCommand):
+    help = "Time the key list endpoints and service functions and write a JSON report that can be diffed between releases."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="benchmark-report.json")
+        parser.add_argument("--iterations", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", nargs="*", help="Only run benchmarks whose name contains one of these tokens.")
+        parser.add_argument(
+            "--sqlite-concurrency", type=int, metavar="THREADS", default=0,
+            help="Also compare concurrent write throughput of the stock SQLite backend and the production profile.",
+        )
+        parser.add_argument("--sqlite-transactions", type=int, default=200, help="Transactions per thread for --sqlite-concurrency.")
+        parser.add_argument(
+            "--renderer-rows", type=int, metavar="ROWS", default=0,
+            help="Also compare the stock and fast JSON renderer / parser (and gzip) on an invoice list of ROWS rows.",
+        )
+
+    def handle(self, *args, **options):
+        runner = BenchmarkRunner(
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            only=options["only"],
+            stdout=self.stdout,
+        )
+        report = runner.run()
+        if options["sqlite_concurrency"]:
+            for result in run_sqlite_concurrency(options["sqlite_concurrency"], options["sqlite_transactions"]):
+                report["results"].append(result)
+                self.stdout.write(
+                    f"  {result['name']}: {result['throughput_tps']} tx/s, "
+                    f"{result['committed']} committed, {result['failed']} failed"
+                )
+
+        if options["renderer_rows"]:
+            for result in run_renderer_benchmark(options["renderer_rows"], options["iterations"]):
+                report["results"].append(result)
+                self.stdout.write(f"  {result['name']}: {result['median_ms']} ms median, {result.get('bytes', '-')} bytes")
+
+        output = Path(options["output"])
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(report['results'])} results to {output}"))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.utils.outbox import drain, outbox_config, purge_processed
+
+
+class Command(BaseCommand):
+    help = "Drain the outbox: run the post-save side effects (balances, main actors, HU / delivery / costing sync) recorded by API writes."
+
+    PURGE_EVERY_SECONDS = 3600
+
+    def add_arguments(self, parser):
+        config = outbox_config()
+        parser.add_argument("--threads", type=int, default=config["THREADS"], help="Handler threads per batch.")
+        parser.add_argument("--batch-size", type=int, default=config["BATCH_SIZE"], help="Events claimed per poll.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument("--once", action="store_true", help="Drain everything that is due, then exit.")
+
+    def handle(self, *args, **options):
+        threads, batch_size = options["threads"], options["batch_size"]
+        total_ok = total_failed = 0
+        last_purge = 0.0
+
+        while True:
+            if time.monotonic() - last_purge > self.PURGE_EVERY_SECONDS:
+                purged = purge_processed()
+                if purged:
+                    self.stdout.write(f"Purged {purged} processed events.")
+                last_purge = time.monotonic()
+
+            close_old_connections()
+            ok, failed = drain(batch_size=batch_size, threads=threads)
+            total_ok += ok
+            total_failed += failed
+            if ok or failed:
+                self.stdout.write(f"Processed {ok + failed} events ({failed} failed).")
+                continue
+
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: {total_ok} succeeded, {total_failed} failed."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.models import SeedManifest
+from core.seeders.seed_default import SEED_MANIFEST_NAME, SEED_MANIFEST_VERSION, run_seed_pipeline
+
+
+class Command(BaseCommand):
+    help = "Apply the default seed data (currencies, payment methods, master data, main branch, COA) if the manifest is out of date."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Re-check every seed step even if the manifest is current.")
+
+    def handle(self, *args, **options):
+        result = run_seed_pipeline(force=options["force"])
+        if result is None:
+            manifest = SeedManifest.objects.filter(name=SEED_MANIFEST_NAME).first()
+            version = manifest.version if manifest else 0
+            self.stdout.write(f"Seeds up to date (manifest v{version}, code v{SEED_MANIFEST_VERSION}).")
+            return
+
+        for step, count in result.items():
+            self.stdout.write(f"  {step}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Seeds applied (manifest v{SEED_MANIFEST_VERSION})."))
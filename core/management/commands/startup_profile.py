@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks.startup import run_startup_profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile a cold start in fresh interpreters: settings, app / model import, each AppConfig.ready() "
+        "and the URLconf, plus the slowest imports (python -X importtime)."
+    )
+    # the profile runs in child interpreters; checking this one would only add noise
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Cold starts to take the median phase timings from.")
+        parser.add_argument("--limit", type=int, default=25, help="Rows per import table.")
+        parser.add_argument("--no-urls", action="store_true", help="Stop after django.setup() (management commands, tests).")
+        parser.add_argument("--project-only", action="store_true", help="Only list modules of this project's apps.")
+        parser.add_argument("--output", help="Also write the full report as JSON to this file.")
+
+    def handle(self, *args, **options):
+        report = run_startup_profile(runs=options["runs"], urls=not options["no_urls"], limit=options["limit"])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Phases (median of {report['runs']} runs, {report['modules']} modules imported)"))
+        for phase, ms in report["phases_ms"].items():
+            self.stdout.write(f"  {phase:<12} {ms:>9.1f} ms")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("AppConfig.ready()"))
+        for label, ms in report["ready_ms"].items():
+            if ms >= 0.1:
+                self.stdout.write(f"  {label:<24} {ms:>9.1f} ms")
+
+        for title, key in (("Slowest imports (self)", "by_self"), ("Slowest imports (cumulative)", "by_cumulative")):
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            for row in report[key]:
+                if options["project_only"] and not row["project"]:
+                    continue
+                self.stdout.write(f"  {row['self_ms']:>8.1f} {row['cumulative_ms']:>9.1f} ms  {row['module']}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Self time per package"))
+        for row in report["by_package"]:
+            if options["project_only"] and not row["project"]:
+                continue
+            self.stdout.write(f"  {row['self_ms']:>8.1f} ms  {row['package']}")
+
+        if options["output"]:
+            output = Path(options["output"])
+            output.write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Wrote startup profile to {output}"))
@@ -1,6 +1,7 @@
-from django.core.exceptions import FieldDoesNotExist
 from django.http import JsonResponse
 
+from core.utils.modelCapabilities import get_model_capabilities
+
 
 class SystemGeneratedWriteProtectMiddleware:
     def __init__(self, get_response):
@@ -13,18 +14,21 @@ class SystemGeneratedWriteProtectMiddleware:
         if request.method not in {"PUT", "PATCH", "DELETE"}:
             return None
 
-        view_class = getattr(view_func, "view_class", None)
+        # APIView.as_view() sets `view_class`, ViewSet.as_view() sets `cls`
+        view_class = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
         if view_class is None:
             return None
 
+        # BaseModelViewSet checks the row it loads itself, no need to query twice
+        if getattr(view_class, "protects_system_generated", False):
+            return None
+
         queryset = getattr(view_class, "queryset", None)
         model = getattr(queryset, "model", None)
         if model is None:
             return None
 
-        try:
-            model._meta.get_field("is_system_generated")
-        except FieldDoesNotExist:
+        if not get_model_capabilities(model).has_is_system_generated:
             return None
 
         lookup_field = getattr(view_class, "lookup_field", "pk")
@@ -0,0 +1,20 @@
+from core.utils.sqliteProfile import read_transactions
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadTransactionsMiddleware:
+    """
+    Run safe-method requests inside `read_transactions()`: their atomic
+    blocks begin DEFERRED and don't queue on the SQLite write gate, which
+    stays reserved for requests that write.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS:
+            return self.get_response(request)
+        with read_transactions():
+            return self.get_response(request)
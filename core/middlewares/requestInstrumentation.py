@@ -0,0 +1,106 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core.utils.requestMetrics import fingerprint, metrics_store
+
+logger = logging.getLogger("core.instrumentation")
+
+
+class _QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Opt-in (settings.REQUEST_INSTRUMENTATION["ENABLED"]) per-request query
+    count, DB time, response time and duplicate-query (N+1) detection.
+    Aggregates are served by core.utils.requestMetrics.RequestMetricsView;
+    requests over their endpoint budget are logged to "core.instrumentation".
+    Streamed responses are recorded when their body has been sent, with the
+    queries it ran; async streams are recorded when the view returns.
+    """
+
+    def __init__(self, get_response):
+        config = getattr(settings, "REQUEST_INSTRUMENTATION", {}) or {}
+        if not config.get("ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.duplicate_threshold = config.get("DUPLICATE_THRESHOLD", 3)
+        self.budgets = config.get("BUDGETS", {}) or {}
+        self.default_budget = config.get("DEFAULT_BUDGET", {}) or {}
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        start = time.perf_counter()
+        with self._recording(recorder):
+            response = self.get_response(request)
+
+        def finish():
+            self._record(request, recorder, (time.perf_counter() - start) * 1000)
+
+        if response.streaming and not getattr(response, "is_async", False):
+            # a streamed export reads its rows while the body is sent: count
+            # those queries too, and record once the stream is done
+            response.streaming_content = self._stream(response.streaming_content, recorder, finish)
+        else:
+            finish()
+        return response
+
+    @staticmethod
+    def _recording(recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def _stream(self, content, recorder, finish):
+        try:
+            with self._recording(recorder):
+                yield from content
+        finally:
+            finish()
+
+    def _record(self, request, recorder, response_ms):
+        match = getattr(request, "resolver_match", None)
+        view_name = (match.view_name or match.route) if match else request.path
+        endpoint = f"{request.method} {view_name}"
+
+        duplicates = {sql: n for sql, n in recorder.fingerprints.items() if n >= self.duplicate_threshold}
+        metrics_store.record(
+            endpoint,
+            queries=recorder.count,
+            db_ms=recorder.db_seconds * 1000,
+            response_ms=response_ms,
+            duplicates=duplicates,
+        )
+        self._check_budget(endpoint, view_name, recorder, response_ms, duplicates)
+
+    def _check_budget(self, endpoint, view_name, recorder, response_ms, duplicates):
+        budget = self.budgets.get(view_name) or self.budgets.get(endpoint) or self.default_budget
+        max_queries = budget.get("queries")
+        max_ms = budget.get("ms")
+        over = (max_queries is not None and recorder.count > max_queries) or (max_ms is not None and response_ms > max_ms)
+        if not over:
+            return
+        logger.warning(
+            "%s over budget: %d queries (budget %s), %.1f ms (budget %s), db %.1f ms, %d duplicate statement(s)",
+            endpoint, recorder.count, max_queries, response_ms, max_ms, recorder.db_seconds * 1000, len(duplicates),
+        )
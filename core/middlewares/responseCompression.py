@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+
+
+class ResponseCompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware (Accept-Encoding negotiation, Vary header, BREACH padding,
+    streamed exports compressed chunk by chunk) that leaves responses under
+    settings.RESPONSE_COMPRESSION["MIN_LENGTH"] bytes alone: compressing a
+    small JSON object costs more than it saves on the wire.
+    """
+
+    def __init__(self, get_response):
+        config = getattr(settings, "RESPONSE_COMPRESSION", {}) or {}
+        if not config.get("ENABLED", True):
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+        self.min_length = config.get("MIN_LENGTH", 1024)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+        return super().process_response(request, response)
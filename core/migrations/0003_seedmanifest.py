@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeedManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('applied_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoryArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=150)),
+                ('from_date', models.DateTimeField()),
+                ('to_date', models.DateTimeField()),
+                ('row_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['model', 'from_date'],
+                'indexes': [models.Index(fields=['model', 'from_date'], name='core_histor_model_0c9b59_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,10 @@
+import json
+import zlib
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from actors.models import Customer, BookingAgency, Carrier, CustomsAgent
  
 class CustomUserManager(BaseUserManager):
@@ -24,6 +29,10 @@ class CustomUserManager(BaseUserManager):
             raise ValueError("Superuser must have is_staff=True.")
         if extra_fields.get("is_superuser") is not True:
             raise ValueError("Superuser must have is_superuser=True.")
+        if "branch" not in extra_fields and "branch_id" not in extra_fields:
+            # the seed pipeline only attaches superusers that exist when it runs
+            Branch = self.model._meta.get_field("branch").related_model
+            extra_fields["branch"] = Branch._default_manager.db_manager(self._db).filter(is_main_branch=True).first()
         return self.create_user(username=username, email=email, password=password, **extra_fields)
 
 
@@ -79,3 +88,74 @@ class CustomUser(AbstractUser):
             return f"{self.username} - {self.branch}"
         full = f"{self.first_name} {self.last_name}".strip()
         return full or self.username
+
+
+class SeedManifest(models.Model):
+    """Version of each default-data seed already applied to this database."""
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveIntegerField(default=0)
+    applied_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Follow-up work recorded next to the row that caused it and drained by
+    `manage.py run_outbox_worker` (see core.utils.outbox).
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # events sharing a key coalesce while one of them is still pending
+    key = models.CharField(max_length=200, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=32, blank=True, null=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default="")
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+            models.Index(fields=["key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk} ({self.status})"
+
+
+class HistoryArchive(models.Model):
+    """
+    A chunk of superseded historical rows moved out of a history table by
+    `manage.py archive_history`, stored as zlib-compressed JSON.
+    """
+
+    model = models.CharField(max_length=150)  # history model label, e.g. purchase.HistoricalVendorBills
+    from_date = models.DateTimeField()
+    to_date = models.DateTimeField()
+    row_count = models.PositiveIntegerField()
+    data = models.BinaryField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["model", "from_date"]
+        indexes = [models.Index(fields=["model", "from_date"])]
+
+    def __str__(self):
+        return f"{self.model} {self.from_date:%Y-%m-%d}..{self.to_date:%Y-%m-%d} ({self.row_count} rows)"
+
+    def rows(self):
+        """The archived rows as dicts (`values()` of the history model, dates as ISO strings)."""
+        return json.loads(zlib.decompress(bytes(self.data)))
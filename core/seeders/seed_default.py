@@ -1,164 +1,237 @@
 from django.db import transaction
 from django.db.utils import OperationalError, ProgrammingError
+from simple_history.utils import bulk_create_with_history
+
+# Bump whenever the defaults below change; the pipeline re-applies deltas
+# only when the stored manifest version is older than this.
+SEED_MANIFEST_NAME = "defaults"
+SEED_MANIFEST_VERSION = 1
+
+MAIN_BRANCH_DEFAULTS = {
+    "name": "Main Branch",
+    "address": "Head Office",
+    "city": "Dubai",
+    "state": "Dubai",
+    "country": "United Arab Emirates",
+    "contact_number": "+971000000000",
+    "status": "operational",
+    "active": True,
+    "is_main_branch": True,
+}
+
+DEFAULT_CURRENCIES = [
+    {"name": "US Dollar", "symbol": "$"},
+    {"name": "UAE Dirham", "symbol": "AED"},
+    {"name": "Nepalese Rupee", "symbol": "NPR"},
+    {"name": "Euro", "symbol": "€"},
+    {"name": "British Pound", "symbol": "£"},
+    {"name": "Indian Rupee", "symbol": "₹"},
+]
+
+DEFAULT_PAYMENT_METHODS = ["Cash", "Bank Transfer", "Cheque", "Card"]
+
+MASTER_DEFAULTS = {
+    "INCO": ["EXW", "FOB", "CIF", "CFR", "DAP", "DDP"],
+    "STATUS": ["Draft", "Pending", "Approved", "Void", "Cancelled"],
+    "CONTAINER_TYPE": ["20GP", "40GP", "40HC", "45HC"],
+    "CARGO_TYPE": ["General", "Perishable", "Fragile", "Dangerous Goods"],
+    "TRAILER_TYPE": ["Flatbed", "Reefer", "Dry Van", "Lowbed"],
+    "DELIVERY_TYPE": ["Door to Door", "Port to Door", "Door to Port", "Port to Port"],
+    "ShipmenSubType": ["FCL", "LCL", "Breakbulk", "RORO"],  # your model has this typo, matching it
+}
+
+COA_TEMPLATE = [
+    {"code": "1000", "name": "Assets", "type": "asset", "parent": None},
+    {"code": "1100", "name": "Current Assets", "type": "asset", "parent": "1000"},
+    {"code": "1110", "name": "Cash", "type": "asset", "parent": "1100"},
+    {"code": "1120", "name": "Bank", "type": "asset", "parent": "1100"},
+    {"code": "1200", "name": "Accounts Receivable", "type": "asset", "parent": "1000"},
+
+    {"code": "2000", "name": "Liabilities", "type": "liability", "parent": None},
+    {"code": "2100", "name": "Current Liabilities", "type": "liability", "parent": "2000"},
+    {"code": "2200", "name": "Accounts Payable", "type": "liability", "parent": "2000"},
+
+    {"code": "3000", "name": "Equity", "type": "equity", "parent": None},
+
+    {"code": "4000", "name": "Income", "type": "income", "parent": None},
+    {"code": "4100", "name": "Freight Income", "type": "income", "parent": "4000"},
+    {"code": "4200", "name": "Service Income", "type": "income", "parent": "4000"},
+
+    {"code": "5000", "name": "Expenses", "type": "expense", "parent": None},
+    {"code": "5100", "name": "Operating Expenses", "type": "expense", "parent": "5000"},
+    {"code": "5110", "name": "Salaries", "type": "expense", "parent": "5100"},
+    {"code": "5120", "name": "Rent", "type": "expense", "parent": "5100"},
+    {"code": "5130", "name": "Utilities", "type": "expense", "parent": "5100"},
+]
+
+
+def _bulk_insert(Model, objs):
+    if not objs:
+        return 0
+    if hasattr(Model, "history"):
+        bulk_create_with_history(objs, Model)
+    else:
+        Model.objects.bulk_create(objs)
+    return len(objs)
+
+
+def seed_singletons():
+    from master.models import ShipmentPrefixes, ApplicationSettings
+
+    created = 0
+    if not ShipmentPrefixes.objects.exists():
+        ShipmentPrefixes.objects.create()
+        created += 1
+    if not ApplicationSettings.objects.exists():
+        ApplicationSettings.objects.create()
+        created += 1
+    return created
+
+
+def seed_main_branch():
+    from master.models import Branch
+    from core.models import CustomUser
+
+    main_branch = (
+        Branch.objects.filter(is_main_branch=True).order_by("created").first()
+        or Branch.objects.order_by("created").first()
+    )
+
+    changed = 0
+    if main_branch:
+        dirty = [
+            field_name for field_name, field_value in MAIN_BRANCH_DEFAULTS.items()
+            if field_name != "is_main_branch" and not getattr(main_branch, field_name, None)
+        ]
+        for field_name in dirty:
+            setattr(main_branch, field_name, MAIN_BRANCH_DEFAULTS[field_name])
+        if dirty or not main_branch.is_main_branch:
+            main_branch.is_main_branch = True
+            main_branch.save()
+            changed += 1
+    else:
+        main_branch = Branch.objects.create(**MAIN_BRANCH_DEFAULTS)
+        changed += 1
+
+    changed += Branch.objects.exclude(pk=main_branch.pk).filter(is_main_branch=True).update(is_main_branch=False)
+
+    # Associate superusers with the main branch
+    changed += CustomUser.objects.filter(is_superuser=True).exclude(branch=main_branch).update(branch=main_branch)
+    return changed
+
+
+def seed_currencies():
+    from accounting.models import Currency
+
+    existing = set(Currency.objects.values_list("name", flat=True))
+    return _bulk_insert(Currency, [Currency(**row) for row in DEFAULT_CURRENCIES if row["name"] not in existing])
+
+
+def seed_payment_methods():
+    from accounting.models import PaymentMethod
+
+    existing = set(PaymentMethod.objects.values_list("name", flat=True))
+    return _bulk_insert(PaymentMethod, [PaymentMethod(name=name) for name in DEFAULT_PAYMENT_METHODS if name not in existing])
+
+
+def seed_master_data():
+    from master.models import MasterData
+
+    existing = set(MasterData.objects.values_list("type_master", "name"))
+    missing = [
+        MasterData(type_master=type_master, name=name, active=True)
+        for type_master, names in MASTER_DEFAULTS.items()
+        for name in names
+        if (type_master, name) not in existing
+    ]
+    return _bulk_insert(MasterData, missing)
+
+
+def seed_chart_of_accounts(branches=None):
+    """
+    Default COA for branches that have none yet, written with the template
+    codes in two bulk inserts (accounts + their Accounts rows).
+    ChartofAccounts.save() is bypassed on purpose: its code generator steps
+    children by +10 and collides on a three-level template.
+    """
+    from accounting.models import Accounts, ChartofAccounts
+    from master.models import Branch
+
+    seeded = set(ChartofAccounts.objects.values_list("branch_id", flat=True).distinct())
+    if branches is None:
+        branches = Branch.objects.exclude(pk__in=[pk for pk in seeded if pk is not None])
+    else:
+        branches = [branch for branch in branches if branch.pk not in seeded]
+
+    charts, accounts = [], []
+    for branch in branches:
+        by_code = {}
+        # COA_TEMPLATE lists parents before their children
+        for row in COA_TEMPLATE:
+            obj = ChartofAccounts(
+                branch=branch,
+                code=row["code"],
+                name=row["name"],
+                type=row["type"],
+                description="",
+                parent_account=by_code.get(row["parent"]),
+            )
+            by_code[row["code"]] = obj
+            charts.append(obj)
+            # same row the accounts post_save signal would have created
+            accounts.append(Accounts(
+                chart_account=obj,
+                name=obj.name,
+                branch=branch,
+                active=obj.active,
+                source=Accounts.SourceType.CHART_OF_ACCOUNTS,
+            ))
+
+    _bulk_insert(ChartofAccounts, charts)
+    _bulk_insert(Accounts, accounts)
+    return len(charts)
+
+
+SEED_STEPS = [
+    ("singletons", seed_singletons),
+    ("main_branch", seed_main_branch),
+    ("currencies", seed_currencies),
+    ("payment_methods", seed_payment_methods),
+    ("master_data", seed_master_data),
+    ("chart_of_accounts", seed_chart_of_accounts),
+]
+
 
+def seed_all_defaults(schema_name: str = "default"):
+    """Apply every seed step; each step only writes the rows that are missing."""
+    from core.utils.referenceCache import invalidate_all_references
+
+    with transaction.atomic():
+        result = {name: step() for name, step in SEED_STEPS}
+    # bulk inserts skip post_save, so the reference cache is not told about them
+    transaction.on_commit(invalidate_all_references)
+    return result
 
-def _model_has_field(Model, field_name: str) -> bool:
-    return any(f.name == field_name for f in Model._meta.get_fields())
 
+def run_seed_pipeline(force: bool = False, schema_name: str = "default"):
+    """
+    Seed defaults unless the stored manifest is already at SEED_MANIFEST_VERSION.
+    Returns the per-step counts, or None when nothing had to run.
+    """
+    from core.models import SeedManifest
 
-def seed_all_defaults(schema_name: str = "default"):
     try:
-        from accounting.models import Currency, ChartofAccounts, PaymentMethod
-        from master.models import Branch, MasterData, ShipmentPrefixes, ApplicationSettings
-        from core.models import CustomUser
-    except Exception:
-        return
+        manifest = SeedManifest.objects.filter(name=SEED_MANIFEST_NAME).first()
+    except (OperationalError, ProgrammingError):
+        # DB tables not ready (partial migrate)
+        return None
+
+    if manifest and manifest.version >= SEED_MANIFEST_VERSION and not force:
+        return None
 
     with transaction.atomic():
-        # ---- Singleton defaults ----
-        if not ShipmentPrefixes.objects.exists():
-            ShipmentPrefixes.objects.create()
-
-        if not ApplicationSettings.objects.exists():
-            ApplicationSettings.objects.create()
-
-        # ---- Branch defaults ----
-        main_branch_defaults = {
-            "name": "Main Branch",
-            "address": "Head Office",
-            "city": "Dubai",
-            "state": "Dubai",
-            "country": "United Arab Emirates",
-            "contact_number": "+971000000000",
-            "status": "operational",
-            "active": True,
-            "is_main_branch": True,
-        }
-
-        main_branch = (
-            Branch.objects.filter(is_main_branch=True).order_by("created").first()
-            or Branch.objects.order_by("created").first()
+        result = seed_all_defaults(schema_name=schema_name)
+        SeedManifest.objects.update_or_create(
+            name=SEED_MANIFEST_NAME, defaults={"version": SEED_MANIFEST_VERSION}
         )
-
-        if main_branch:
-            for field_name, field_value in main_branch_defaults.items():
-                if field_name == "is_main_branch":
-                    continue
-                if not getattr(main_branch, field_name, None):
-                    setattr(main_branch, field_name, field_value)
-            main_branch.is_main_branch = True
-            main_branch.save()
-        else:
-            main_branch = Branch.objects.create(**main_branch_defaults)
-
-        Branch.objects.exclude(pk=main_branch.pk).filter(is_main_branch=True).update(is_main_branch=False)
-
-        # Associate superusers with the main branch
-        CustomUser.objects.filter(is_superuser=True).exclude(branch=main_branch).update(branch=main_branch)
-
-        # ---- Currency defaults ----
-        default_currencies = [
-            {"name": "US Dollar", "symbol": "$"},
-            {"name": "UAE Dirham", "symbol": "AED"},
-            {"name": "Nepalese Rupee", "symbol": "NPR"},
-            {"name": "Euro", "symbol": "€"},
-            {"name": "British Pound", "symbol": "£"},
-            {"name": "Indian Rupee", "symbol": "₹"},
-        ]
-        for row in default_currencies:
-            Currency.objects.get_or_create(name=row["name"], defaults={"symbol": row["symbol"]})
-
-        # ---- Payment methods (optional) ----
-        try:
-            default_payment_methods = [
-                {"name": "Cash"},
-                {"name": "Bank Transfer"},
-                {"name": "Cheque"},
-                {"name": "Card"},
-            ]
-            for row in default_payment_methods:
-                PaymentMethod.objects.get_or_create(name=row["name"])
-        except Exception:
-            pass
-
-        # ---- MasterData defaults ----
-        master_defaults = {
-            "INCO": ["EXW", "FOB", "CIF", "CFR", "DAP", "DDP"],
-            "STATUS": ["Draft", "Pending", "Approved", "Void", "Cancelled"],
-            "CONTAINER_TYPE": ["20GP", "40GP", "40HC", "45HC"],
-            "CARGO_TYPE": ["General", "Perishable", "Fragile", "Dangerous Goods"],
-            "TRAILER_TYPE": ["Flatbed", "Reefer", "Dry Van", "Lowbed"],
-            "DELIVERY_TYPE": ["Door to Door", "Port to Door", "Door to Port", "Port to Port"],
-            "ShipmenSubType": ["FCL", "LCL", "Breakbulk", "RORO"],  # your model has this typo, matching it
-        }
-
-        for type_master, names in master_defaults.items():
-            for name in names:
-                MasterData.objects.get_or_create(type_master=type_master, name=name, defaults={"active": True})
-
-        # ---- Chart of Accounts defaults (per branch) ----
-        coa_template = [
-            {"code": "1000", "name": "Assets", "type": "asset", "parent": None},
-            {"code": "1100", "name": "Current Assets", "type": "asset", "parent": "1000"},
-            {"code": "1110", "name": "Cash", "type": "asset", "parent": "1100"},
-            {"code": "1120", "name": "Bank", "type": "asset", "parent": "1100"},
-            {"code": "1200", "name": "Accounts Receivable", "type": "asset", "parent": "1000"},
-
-            {"code": "2000", "name": "Liabilities", "type": "liability", "parent": None},
-            {"code": "2100", "name": "Current Liabilities", "type": "liability", "parent": "2000"},
-            {"code": "2200", "name": "Accounts Payable", "type": "liability", "parent": "2000"},
-
-            {"code": "3000", "name": "Equity", "type": "equity", "parent": None},
-
-            {"code": "4000", "name": "Income", "type": "income", "parent": None},
-            {"code": "4100", "name": "Freight Income", "type": "income", "parent": "4000"},
-            {"code": "4200", "name": "Service Income", "type": "income", "parent": "4000"},
-
-            {"code": "5000", "name": "Expenses", "type": "expense", "parent": None},
-            {"code": "5100", "name": "Operating Expenses", "type": "expense", "parent": "5000"},
-            {"code": "5110", "name": "Salaries", "type": "expense", "parent": "5100"},
-            {"code": "5120", "name": "Rent", "type": "expense", "parent": "5100"},
-            {"code": "5130", "name": "Utilities", "type": "expense", "parent": "5100"},
-        ]
-
-        for branch in Branch.objects.all():
-            base_filter = {}
-            if _model_has_field(ChartofAccounts, "branch"):
-                base_filter["branch"] = branch
-
-            # if branch already has COA, don't spam duplicates
-            if base_filter and ChartofAccounts.objects.filter(**base_filter).exists():
-                continue
-            if not base_filter and ChartofAccounts.objects.exists():
-                continue
-
-            by_code = {}
-
-            # create parents first
-            for row in [r for r in coa_template if r["parent"] is None]:
-                defaults = {"name": row["name"], "type": row["type"]}
-                if _model_has_field(ChartofAccounts, "description"):
-                    defaults["description"] = ""
-
-                obj, _ = ChartofAccounts.objects.get_or_create(
-                    code=row["code"],
-                    defaults=defaults,
-                    **base_filter,
-                )
-                by_code[row["code"]] = obj
-
-            # create children
-            for row in [r for r in coa_template if r["parent"] is not None]:
-                parent_obj = by_code.get(row["parent"])
-                defaults = {"name": row["name"], "type": row["type"]}
-                if _model_has_field(ChartofAccounts, "parent_account"):
-                    defaults["parent_account"] = parent_obj
-                if _model_has_field(ChartofAccounts, "description"):
-                    defaults["description"] = ""
-
-                obj, _ = ChartofAccounts.objects.get_or_create(
-                    code=row["code"],
-                    defaults=defaults,
-                    **base_filter,
-                )
-                by_code[row["code"]] = obj
+    return result
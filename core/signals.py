@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_migrate, post_save
+
+
+def register_seed_signals(app_config) -> None:
+    from master.models import Branch
+
+    # the seeders are imported when a handler first runs, not at startup
+    def _seed_after_migrate(sender, **kwargs):
+        from core.seeders.seed_default import run_seed_pipeline
+
+        run_seed_pipeline()
+
+    def _branch_post_save(sender, instance, created, raw=False, **kwargs):
+        if created and not raw:
+            from core.seeders.seed_default import seed_chart_of_accounts
+
+            transaction.on_commit(lambda: seed_chart_of_accounts([instance]))
+
+    post_migrate.connect(_seed_after_migrate, sender=app_config, dispatch_uid="core_seed_post_migrate")
+    post_save.connect(_branch_post_save, sender=Branch, dispatch_uid="core_seed_branch_coa")
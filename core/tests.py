@@ -1,3 +1,1117 @@
-from django.test import TestCase
+import datetime
+import json
+import pickle
+import re
+import threading
+import uuid
+from contextlib import ExitStack
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_save
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounting.models import Accounts, ChartofAccounts, Currency, GeneralLedger, PaymentMethod
+from accounting.serializers import PaymentMethodSerializer
+from crm.models import ContactGroup
+from core.middlewares.readTransactions import ReadTransactionsMiddleware
+from core.middlewares.requestInstrumentation import RequestInstrumentationMiddleware
+from core.models import CustomUser, SeedManifest
+from core.utils.authCache import _cache, _entry_key
+from core.utils.authCacheAPI import CachedJWTAuthentication
+from core.seeders.seed_default import COA_TEMPLATE, SEED_MANIFEST_NAME, SEED_MANIFEST_VERSION, run_seed_pipeline
+from core.utils.AdaptedBulkListSerializer import AdaptedBulkListSerializer, BulkModelSerializer, has_per_row_save_hooks
+from core.utils.BaseModelViewSet import BaseModelViewSet
+from core.utils.IsMainBranchOrOwnBranch import IsMainBranchOrOwnBranch
+from core.utils.dbRouting import use_replica
+from core.utils.FastJSON import FastJSONRenderer, orjson
+from core.utils.historyPolicy import history_batch
+from core.utils.indexAdvisor import advise, iter_viewsets
+from core.utils.KeysetPagination import KeysetPagination, OffsetPagination, PagedKeysetPagination
+from core.utils.searchIndex import get_backend, search_queryset
+from core.utils.sqliteProfile import in_read_transactions, read_transactions, sqlite_profile_config
+from core.utils.referenceCache import _version, get_reference, get_reference_list, invalidate_reference
+from core.utils.referenceCacheAPI import ReferenceRelatedField
+from core.utils.requestMetrics import metrics_store
+from master.models import Branch
+from operations.models import Shipment
+from purchase.models import ExpenseCategory
+from sales.models import Sales
+from sales.tests import create_customer
+
+
+def main_branch_superuser(username="tester"):
+    branch = Branch.objects.filter(is_main_branch=True).first()
+    return CustomUser.objects.create_superuser(username=username, email=f"{username}@example.invalid", branch=branch)
+
+
+class _View:
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+
+class KeysetPaginationTests(TestCase):
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        # ties on 1 and 2, two NULLs
+        commissions = ["1", "1", "2", None, "3", None, "2"]
+        cls.methods = [
+            PaymentMethod.objects.create(name=f"kp-{i}", commission=Decimal(c) if c is not None else None)
+            for i, c in enumerate(commissions)
+        ]
+
+    def queryset(self, ordering):
+        return PaymentMethod.objects.filter(name__startswith="kp-").order_by(ordering)
+
+    def page(self, ordering, params):
+        paginator = KeysetPagination()
+        request = Request(self.factory.get("/payment-methods/", params))
+        rows = paginator.paginate_queryset(self.queryset(ordering), request, _View([ordering]))
+        return paginator, rows
+
+    @staticmethod
+    def _params(link):
+        return {key: values[0] for key, values in parse_qs(urlparse(link).query).items()}
+
+    def walk(self, ordering, page_size=2):
+        """Every page following the next links, as lists of ids."""
+        pages, params = [], {"page_size": page_size}
+        while True:
+            paginator, rows = self.page(ordering, params)
+            pages.append([row.pk for row in rows])
+            link = paginator.get_next_link()
+            if link is None:
+                return pages, paginator
+            params = self._params(link)
+
+    def expected(self, descending):
+        present = sorted((m for m in self.methods if m.commission is not None), key=lambda m: (m.commission, m.pk))
+        nulls = sorted((m for m in self.methods if m.commission is None), key=lambda m: m.pk)
+        if descending:
+            present.reverse()
+            nulls.reverse()
+        # NULLs come last in both directions
+        return [m.pk for m in present + nulls]
+
+    def test_without_page_params_the_list_is_not_paginated(self):
+        paginator, rows = self.page("commission", {})
+        self.assertIsNone(rows)
+
+    def test_next_pages_cover_every_row_once_with_nulls_last_and_pk_tiebreak(self):
+        pages, _ = self.walk("commission")
+        self.assertTrue(all(len(page) <= 2 for page in pages))
+        self.assertEqual([pk for page in pages for pk in page], self.expected(descending=False))
+
+    def test_reverse_ordering(self):
+        pages, _ = self.walk("-commission")
+        self.assertEqual([pk for page in pages for pk in page], self.expected(descending=True))
+
+    def test_previous_links_walk_back_over_the_same_pages(self):
+        forward, paginator = self.walk("commission")
+        backward = []
+        link = paginator.get_previous_link()
+        while link is not None:
+            paginator, rows = self.page("commission", self._params(link))
+            backward.append([row.pk for row in rows])
+            link = paginator.get_previous_link() if paginator.has_previous else None
+        self.assertEqual(backward, list(reversed(forward[:-1])))
+
+    def test_invalid_cursor_is_not_found(self):
+        with self.assertRaises(NotFound):
+            self.page("commission", {"cursor": "not-a-cursor"})
+
+
+class PaymentMethodListViewSet(BaseModelViewSet):
+    queryset = PaymentMethod.objects.all()
+    serializer_class = PaymentMethodSerializer
+    ordering = ("id",)
+
+
+class PaymentMethodOffsetViewSet(PaymentMethodListViewSet):
+    pagination_class = OffsetPagination
+
+
+class ListPaginationContractTests(TestCase):
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = main_branch_superuser()
+        for i in range(3):
+            PaymentMethod.objects.create(name=f"lp-{i}")
+
+    def list(self, viewset, params):
+        request = self.factory.get("/payment-methods/", params)
+        force_authenticate(request, user=self.user)
+        response = viewset.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_default_list_is_a_plain_array(self):
+        data = self.list(PaymentMethodListViewSet, {})
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), PaymentMethod.objects.count())
+
+    def test_page_size_opts_into_keyset_pages(self):
+        data = self.list(PaymentMethodListViewSet, {"page_size": 2})
+        self.assertEqual(set(data), {"next", "previous", "results"})
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNotNone(data["next"])
+
+    def test_offset_pagination_opt_out(self):
+        data = self.list(PaymentMethodOffsetViewSet, {"limit": 2, "offset": 1})
+        self.assertEqual(data["count"], PaymentMethod.objects.count())
+        self.assertEqual(len(data["results"]), 2)
+        expected = list(PaymentMethod.objects.order_by("id").values_list("id", flat=True)[1:3])
+        self.assertEqual([row["id"] for row in data["results"]], expected)
+
+
+class ContactGroupBulkSerializer(BulkModelSerializer):
+    class Meta:
+        model = ContactGroup
+        fields = ("id", "name", "description")
+        list_serializer_class = AdaptedBulkListSerializer
+
+
+class ContactGroupBulkViewSet(BaseModelViewSet):
+    queryset = ContactGroup.objects.all()
+    serializer_class = ContactGroupBulkSerializer
+
+
+class BulkSaveTests(TestCase):
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = main_branch_superuser()
+        branch = cls.user.branch
+        cls.groups = [ContactGroup.objects.create(name=f"bulk-{i}", branch=branch) for i in range(6)]
+
+    def bulk_patch(self, groups, description):
+        data = [{"id": str(group.pk), "description": description} for group in groups]
+        request = self.factory.patch("/contact-groups/", data, format="json")
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = ContactGroupBulkViewSet.as_view({"patch": "partial_bulk_update"})(request)
+        self.assertEqual(response.status_code, 200, response.data)
+        return len(queries.captured_queries)
+
+    def test_history_receivers_keep_the_set_based_path(self):
+        self.assertTrue(post_save.has_listeners(ContactGroup))
+        self.assertFalse(has_per_row_save_hooks(ContactGroup))
+        with mock.patch.object(ContactGroup, "bulk_save_per_row", True, create=True):
+            self.assertTrue(has_per_row_save_hooks(ContactGroup))
+
+    def test_bulk_update_query_count_does_not_grow_with_rows(self):
+        two = self.bulk_patch(self.groups[:2], "two")
+        six = self.bulk_patch(self.groups, "six")
+        self.assertEqual(two, six)
+        self.assertEqual(set(ContactGroup.objects.filter(name__startswith="bulk-").values_list("description", flat=True)), {"six"})
+        self.assertEqual(ContactGroup.history.filter(description="six").count(), 6)
+
+    def test_connected_receiver_gets_every_row_saved(self):
+        saved = []
+
+        def receiver(sender, instance, **kwargs):
+            saved.append(instance.pk)
+
+        pre_save.connect(receiver, sender=ContactGroup)
+        try:
+            self.assertTrue(has_per_row_save_hooks(ContactGroup))
+            self.bulk_patch(self.groups[:3], "per-row")
+        finally:
+            pre_save.disconnect(receiver, sender=ContactGroup)
+        self.assertEqual(sorted(saved), sorted(group.pk for group in self.groups[:3]))
+
+
+class BranchPermissionTests(TestCase):
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.main_user = main_branch_superuser("perm-main")
+        cls.other = Branch.objects.create(
+            name="Perm Branch", address="1 Quay", city="Dubai", state="Dubai", country="AE", contact_number="0"
+        )
+        cls.other_user = CustomUser.objects.create_user(username="perm-other", email="perm-other@example.invalid", branch=cls.other)
+        cls.main_group = ContactGroup.objects.create(name="perm-main", branch=cls.main_user.branch)
+        cls.other_group = ContactGroup.objects.create(name="perm-other", branch=cls.other)
+
+    def retrieve(self, user, group):
+        request = self.factory.get(f"/contact-groups/{group.pk}/")
+        # a fresh instance, so the user's branch is not cached on it yet
+        force_authenticate(request, user=CustomUser.objects.get(pk=user.pk))
+        return ContactGroupBulkViewSet.as_view({"get": "retrieve"})(request, pk=group.pk)
+
+    def test_own_branch_object_is_allowed(self):
+        self.assertEqual(self.retrieve(self.other_user, self.other_group).status_code, 200)
+
+    def test_other_branch_object_is_denied(self):
+        self.assertEqual(self.retrieve(self.other_user, self.main_group).status_code, 404)
+        # past the queryset scope the object check still refuses it
+        request = Request(self.factory.get("/"))
+        request.user = self.other_user
+        self.assertFalse(IsMainBranchOrOwnBranch().has_object_permission(request, None, self.main_group))
+
+    def test_main_branch_user_is_allowed_everywhere(self):
+        for group in (self.main_group, self.other_group):
+            with self.subTest(group=group.name):
+                self.assertEqual(self.retrieve(self.main_user, group).status_code, 200)
+
+    def test_branch_is_resolved_once_per_request(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.retrieve(self.other_user, self.other_group).status_code, 200)
+        branch_reads = [query for query in queries.captured_queries if 'FROM "master_branch"' in query["sql"]]
+        self.assertEqual(len(branch_reads), 1)
+
+    def test_object_check_reuses_the_request_context(self):
+        request = Request(self.factory.get("/"))
+        request.user = CustomUser.objects.get(pk=self.other_user.pk)
+        permission = IsMainBranchOrOwnBranch()
+        permission.has_object_permission(request, None, self.other_group)
+        view = ContactGroupBulkViewSet(request=request)
+        with self.assertNumQueries(0):
+            self.assertTrue(permission.has_object_permission(request, None, self.other_group))
+            self.assertFalse(permission.has_object_permission(request, None, self.main_group))
+            self.assertEqual(view._valid_branch_for(request.user), self.other)
+
+
+class PagedOnePerPage(PagedKeysetPagination):
+    page_size = 1
+
+
+class ContactGroupExportViewSet(ContactGroupBulkViewSet):
+    search_fields = ("name",)
+    ordering = ("name",)
+    pagination_class = PagedOnePerPage
+
+
+class StreamingExportTests(TestCase):
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.main_user = main_branch_superuser("export-main")
+        cls.other = Branch.objects.create(
+            name="Export Branch", address="1 Quay", city="Dubai", state="Dubai", country="AE", contact_number="0"
+        )
+        cls.other_user = CustomUser.objects.create_user(username="export-other", email="export-other@example.invalid", branch=cls.other)
+        for name in ("export-b", "export-a", "other-c"):
+            ContactGroup.objects.create(name=name, description="x", branch=cls.main_user.branch)
+        ContactGroup.objects.create(name="export-d", description="x", branch=cls.other)
+
+    def export(self, params, user=None):
+        request = self.factory.get("/contact-groups/", params)
+        force_authenticate(request, user=user or self.main_user)
+        return ContactGroupExportViewSet.as_view({"get": "list"})(request)
+
+    def test_ndjson_streams_every_filtered_row(self):
+        response = self.export({"format": "ndjson", "search": "export"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        # every match despite the one-row pages, in the view's ordering
+        self.assertEqual([row["name"] for row in rows], ["export-a", "export-b", "export-d"])
+
+    def test_csv_streams_a_header_and_the_rows(self):
+        response = self.export({"format": "csv", "search": "export", "ordering": "-name"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="contactgroup.csv"')
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,name,description")
+        self.assertEqual([line.split(",")[1] for line in lines[1:]], ["export-d", "export-b", "export-a"])
+
+    def test_plain_list_is_still_paginated(self):
+        response = self.export({"search": "export"})
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_export_is_branch_scoped(self):
+        response = self.export({"format": "ndjson"}, user=self.other_user)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["name"] for row in rows], ["export-d"])
+
+    def test_unknown_format_is_a_bad_request(self):
+        response = self.export({"format": "xlsx"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("format", response.data)
+
+
+class SystemGeneratedWriteProtectTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = main_branch_superuser()
+        cls.category = ExpenseCategory.objects.create(name="sg-category", is_system_generated=True)
+        cls.method = PaymentMethod.objects.create(name="sg-method", is_system_generated=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_viewset_outside_base_viewset_is_guarded_by_the_middleware(self):
+        url = f"/purchase/api/expense-categories/{self.category.pk}/"
+        response = self.client.patch(url, {"name": "renamed"}, format="json")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, 403)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.name, "sg-category")
+
+    def test_base_viewset_refuses_writes_itself(self):
+        url = f"/accounting/payment-methods/{self.method.pk}/"
+        response = self.client.patch(url, {"name": "renamed"}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.method.refresh_from_db()
+        self.assertEqual(self.method.name, "sg-method")
+
+    def test_other_rows_stay_writable(self):
+        category = ExpenseCategory.objects.create(name="plain-category")
+        response = self.client.patch(f"/purchase/api/expense-categories/{category.pk}/", {"name": "renamed"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        category.refresh_from_db()
+        self.assertEqual(category.name, "renamed")
+
+
+class ChildAccountSerializer(serializers.ModelSerializer):
+    parent_name = serializers.CharField(source="parent_account.name", read_only=True)
+
+    class Meta:
+        model = ChartofAccounts
+        fields = ("id", "name", "parent_account", "parent_name")
+
+
+class ChildAccountViewSet(BaseModelViewSet):
+    queryset = ChartofAccounts.objects.filter(name__startswith="etag-child")
+    serializer_class = ChildAccountSerializer
+    ordering = ("id",)
+
+
+class OpaqueAccountSerializer(serializers.ModelSerializer):
+    label = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChartofAccounts
+        fields = ("id", "label")
+
+    def get_label(self, obj):
+        return str(obj)
+
+
+class OpaqueAccountViewSet(ChildAccountViewSet):
+    serializer_class = OpaqueAccountSerializer
+
+
+class ConditionalGetTests(TestCase):
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = main_branch_superuser()
+        branch = cls.user.branch
+        # a seeded root: new roots can collide with the seeded codes
+        cls.parent = ChartofAccounts.objects.get(branch=branch, type="liability", parent_account__isnull=True)
+        cls.children = [
+            ChartofAccounts.objects.create(name=f"etag-child-{i}", type="liability", parent_account=cls.parent, branch=branch)
+            for i in range(2)
+        ]
+
+    def get(self, viewset, etag=None, action="list", **kwargs):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        request = self.factory.get("/accounts/", **headers)
+        force_authenticate(request, user=self.user)
+        return viewset.as_view({"get": action})(request, **kwargs)
+
+    def test_list_etag_round_trip(self):
+        first = self.get(PaymentMethodListViewSet)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        again = self.get(PaymentMethodListViewSet, first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_list_etag_changes_on_insert_edit_and_delete(self):
+        etag = self.get(PaymentMethodListViewSet)["ETag"]
+        method = PaymentMethod.objects.create(name="etag-new")
+        self.assertEqual(self.get(PaymentMethodListViewSet, etag).status_code, 200)
+
+        etag = self.get(PaymentMethodListViewSet)["ETag"]
+        method.name = "etag-renamed"
+        method.save()
+        self.assertEqual(self.get(PaymentMethodListViewSet, etag).status_code, 200)
+
+        etag = self.get(PaymentMethodListViewSet)["ETag"]
+        method.delete()
+        self.assertEqual(self.get(PaymentMethodListViewSet, etag).status_code, 200)
+
+    def test_editing_a_nested_row_outside_the_list_changes_the_etag(self):
+        first = self.get(ChildAccountViewSet)
+        self.assertEqual([row["parent_name"] for row in first.data], [self.parent.name] * 2)
+        self.assertEqual(self.get(ChildAccountViewSet, first["ETag"]).status_code, 304)
+
+        # the parent is not in the listed queryset, only rendered through it
+        self.parent.name = "etag-renamed-parent"
+        self.parent.save()
+        second = self.get(ChildAccountViewSet, first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual([row["parent_name"] for row in second.data], ["etag-renamed-parent"] * 2)
+
+    def test_detail_etag_follows_nested_rows_too(self):
+        pk = self.children[0].pk
+        first = self.get(ChildAccountViewSet, action="retrieve", pk=pk)
+        self.assertEqual(self.get(ChildAccountViewSet, first["ETag"], action="retrieve", pk=pk).status_code, 304)
+        self.parent.save()
+        self.assertEqual(self.get(ChildAccountViewSet, first["ETag"], action="retrieve", pk=pk).status_code, 200)
+
+    def test_untraceable_serializer_sends_no_validators(self):
+        response = self.get(OpaqueAccountViewSet)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertEqual(len(response.data), 2)
+
+    def test_list_filters_the_queryset_once(self):
+        with mock.patch.object(BaseModelViewSet, "filter_backends", [CountingFilter]):
+            CountingFilter.calls = 0
+            self.assertEqual(self.get(ChildAccountViewSet).status_code, 200)
+            self.assertEqual(CountingFilter.calls, 1)
+
+
+class CountingFilter:
+    calls = 0
+
+    def filter_queryset(self, request, queryset, view):
+        CountingFilter.calls += 1
+        return queryset
+
+
+class ReferenceCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.method = PaymentMethod.objects.create(name="ref-cash", commission=Decimal("1.50"))
+
+    def setUp(self):
+        # the test rollback doesn't bump the version
+        invalidate_reference(PaymentMethod)
+
+    def test_lookups_return_their_own_instances(self):
+        first = get_reference(PaymentMethod, self.method.pk)
+        first.name = "changed by a caller"
+        second = get_reference(PaymentMethod, str(self.method.pk))
+        self.assertIsNot(first, second)
+        self.assertEqual(second.name, "ref-cash")
+        self.assertEqual(second.commission, Decimal("1.50"))
+        self.assertFalse(second._state.adding)
+
+    def test_list_instances_are_not_shared_either(self):
+        first = {obj.pk: obj for obj in get_reference_list(PaymentMethod)}
+        second = {obj.pk: obj for obj in get_reference_list(PaymentMethod)}
+        self.assertIsNot(first[self.method.pk], second[self.method.pk])
+
+    def test_cached_lookup_costs_no_query_and_follows_saves(self):
+        get_reference(PaymentMethod, self.method.pk)
+        with self.assertNumQueries(0):
+            get_reference(PaymentMethod, self.method.pk)
+        self.method.name = "ref-card"
+        self.method.save()
+        self.assertEqual(get_reference(PaymentMethod, self.method.pk).name, "ref-card")
+
+    def test_missing_row(self):
+        with self.assertRaises(PaymentMethod.DoesNotExist):
+            get_reference(PaymentMethod, 10 ** 9)
+
+    def test_row_missing_from_the_snapshot_is_read_from_the_db(self):
+        get_reference(PaymentMethod, self.method.pk)
+        # saved where this process's cache never heard of it (no post_save: another worker)
+        [other] = PaymentMethod.objects.bulk_create([PaymentMethod(name="ref-other-worker")])
+        field = ReferenceRelatedField(queryset=PaymentMethod.objects.all())
+        self.assertEqual(field.to_internal_value(other.pk).name, "ref-other-worker")
+        # and the snapshot was refreshed for the next lookups
+        get_reference(PaymentMethod, other.pk)
+        with self.assertNumQueries(0):
+            get_reference(PaymentMethod, other.pk)
+
+    def test_branch_saves_invalidate_the_ports_lists(self):
+        version = _version("master.Ports")
+        branch = Branch.objects.filter(is_main_branch=True).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            branch.save()
+        self.assertNotEqual(_version("master.Ports"), version)
+
+
+class HistoryBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+
+    def create(self, name):
+        return ContactGroup.objects.create(name=name, branch=self.branch)
+
+    def history(self, prefix):
+        return ContactGroup.history.filter(name__startswith=prefix).count()
+
+    def test_rows_are_inserted_in_bulk_when_the_block_exits(self):
+        with history_batch():
+            for i in range(3):
+                self.create(f"hb-{i}")
+            self.assertEqual(self.history("hb-"), 0)
+        self.assertEqual(self.history("hb-"), 3)
+
+    def test_one_insert_for_all_history_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            with history_batch():
+                for i in range(4):
+                    self.create(f"hq-{i}")
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT INTO")]
+        history_inserts = [sql for sql in inserts if ContactGroup.history.model._meta.db_table in sql]
+        self.assertEqual(len(history_inserts), 1)
+        self.assertEqual(self.history("hq-"), 4)
+
+    def test_outside_a_batch_history_is_written_right_away(self):
+        self.create("hn-0")
+        self.assertEqual(self.history("hn-"), 1)
+
+    def test_rollback_leaves_no_history(self):
+        with self.assertRaises(RuntimeError):
+            with history_batch():
+                self.create("hr-0")
+                raise RuntimeError
+        self.assertFalse(ContactGroup.objects.filter(name="hr-0").exists())
+        self.assertEqual(self.history("hr-"), 0)
+
+    def test_enclosing_rollback_takes_the_flushed_rows(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                with history_batch():
+                    self.create("he-0")
+                self.assertEqual(self.history("he-"), 1)
+                raise RuntimeError
+        self.assertEqual(self.history("he-"), 0)
+
+    def test_savepoint_rollback_drops_only_the_inner_rows(self):
+        with history_batch():
+            self.create("hs-outer")
+            try:
+                with history_batch():
+                    self.create("hs-inner")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.create("hs-after")
+        self.assertEqual(
+            set(ContactGroup.history.filter(name__startswith="hs-").values_list("name", flat=True)),
+            {"hs-outer", "hs-after"},
+        )
+        self.assertFalse(ContactGroup.objects.filter(name="hs-inner").exists())
+
+
+class SeedPipelineTests(TestCase):
+    def test_current_manifest_skips_the_pipeline(self):
+        self.assertEqual(SeedManifest.objects.get(name=SEED_MANIFEST_NAME).version, SEED_MANIFEST_VERSION)
+        PaymentMethod.objects.filter(name="Cheque").delete()
+        self.assertIsNone(run_seed_pipeline())
+        self.assertFalse(PaymentMethod.objects.filter(name="Cheque").exists())
+
+    def test_stale_manifest_reapplies_missing_rows(self):
+        SeedManifest.objects.filter(name=SEED_MANIFEST_NAME).update(version=SEED_MANIFEST_VERSION - 1)
+        PaymentMethod.objects.filter(name="Cheque").delete()
+        result = run_seed_pipeline()
+        self.assertEqual(result["payment_methods"], 1)
+        self.assertEqual(SeedManifest.objects.get(name=SEED_MANIFEST_NAME).version, SEED_MANIFEST_VERSION)
+
+    def test_force_reapplies_a_current_manifest(self):
+        PaymentMethod.objects.filter(name="Cheque").delete()
+        out = StringIO()
+        call_command("seed_defaults", "--force", stdout=out)
+        self.assertTrue(PaymentMethod.objects.filter(name="Cheque").exists())
+        self.assertIn("payment_methods: 1", out.getvalue())
+        # nothing left to add on a second forced run
+        self.assertEqual(run_seed_pipeline(force=True)["payment_methods"], 0)
+
+    def test_new_branch_gets_the_default_chart_of_accounts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            branch = Branch.objects.create(
+                name="Seed Branch", address="1 Quay", city="Dubai", state="Dubai", country="AE", contact_number="0"
+            )
+        codes = set(ChartofAccounts.objects.filter(branch=branch).values_list("code", flat=True))
+        self.assertEqual(codes, {row["code"] for row in COA_TEMPLATE})
+        self.assertEqual(Accounts.objects.filter(branch=branch, chart_account__isnull=False).count(), len(COA_TEMPLATE))
+        cash = ChartofAccounts.objects.get(branch=branch, code="1110")
+        self.assertEqual(cash.parent_account.code, "1100")
+
+    def test_superuser_created_after_seeding_joins_the_main_branch(self):
+        user = CustomUser.objects.create_superuser(username="late-admin", email="late@example.invalid")
+        self.assertTrue(user.branch.is_main_branch)
+        other = Branch.objects.create(
+            name="Admin Branch", address="1 Quay", city="Dubai", state="Dubai", country="AE", contact_number="0"
+        )
+        user = CustomUser.objects.create_superuser(username="branch-admin", email="branch@example.invalid", branch=other)
+        self.assertEqual(user.branch, other)
+
+
+# The test runner sets "replica" up as a mirror: a second connection to the
+# test database, which only sees committed rows, hence TransactionTestCase.
+@override_settings(DATABASE_REPLICA={"ALIAS": "replica", "ENABLED": True})
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {"default", "replica"}
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        self.user = main_branch_superuser("replica")
+        ContactGroup.objects.create(name="replica-group", branch=self.user.branch)
+
+    def test_reads_leave_the_replica_after_the_first_write(self):
+        with use_replica():
+            self.assertEqual(ContactGroup.objects.all().db, "replica")
+            self.assertTrue(ContactGroup.objects.filter(name="replica-group").exists())
+            ContactGroup.objects.create(name="written", branch=self.user.branch)
+            # pinned: the write has to be visible to the rest of the block
+            self.assertEqual(ContactGroup.objects.all().db, "default")
+        self.assertEqual(ContactGroup.objects.all().db, "default")
+
+    def test_reads_inside_a_transaction_stay_on_the_primary(self):
+        with use_replica(), transaction.atomic():
+            self.assertEqual(ContactGroup.objects.all().db, "default")
+
+    def dispatch(self, request, action):
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connections["replica"]) as replica, CaptureQueriesContext(connection) as primary:
+            response = ContactGroupBulkViewSet.as_view(action)(request)
+        touched = [any("crm_contactgroup" in query["sql"] for query in queries.captured_queries) for queries in (replica, primary)]
+        return response, *touched
+
+    def test_safe_requests_read_from_the_replica(self):
+        response, replica, primary = self.dispatch(self.factory.get("/contact-groups/"), {"get": "list"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["name"] for row in response.data], ["replica-group"])
+        self.assertTrue(replica)
+        self.assertFalse(primary)
+
+    def test_writes_stay_on_the_primary(self):
+        request = self.factory.post("/contact-groups/", {"name": "posted"}, format="json")
+        response, replica, primary = self.dispatch(request, {"post": "create"})
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertFalse(replica)
+        self.assertTrue(primary)
+
+
+class ReadTransactionTests(TestCase):
+    """The test case's own transaction holds the write gate, like a long write would."""
+
+    def run_threads(self, target, count):
+        errors = []
+
+        def run():
+            try:
+                target()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        return errors
+
+    def test_read_blocks_are_not_serialized(self):
+        self.assertTrue(connection.write_gate.held)
+        # every reader waits here inside its open transaction: serialized ones never all arrive
+        barrier = threading.Barrier(3, timeout=5)
+
+        def reader():
+            with read_transactions(), transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                self.assertFalse(connection.write_gate.held)
+                barrier.wait()
+
+        self.assertEqual(self.run_threads(reader, 3), [])
+
+    def test_other_blocks_still_queue_on_the_gate(self):
+        def writer():
+            with transaction.atomic():
+                pass
+
+        with override_settings(SQLITE_PROFILE={**sqlite_profile_config(), "WRITE_GATE_TIMEOUT": 0.2}):
+            errors = self.run_threads(writer, 1)
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], OperationalError)
+
+    def test_only_safe_methods_run_in_read_transactions(self):
+        middleware = ReadTransactionsMiddleware(lambda request: in_read_transactions())
+        factory = RequestFactory()
+        self.assertTrue(middleware(factory.get("/")))
+        self.assertFalse(middleware(factory.post("/")))
+        self.assertFalse(in_read_transactions())
+
+
+class AuthCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = main_branch_superuser("authcache")
+        cls.user.set_password("s3cret-pass")
+        cls.user.save()
+
+    def setUp(self):
+        _cache().clear()
+        self.token = AccessToken.for_user(self.user)
+
+    def authenticate(self):
+        return CachedJWTAuthentication().get_user(self.token)
+
+    def test_cache_holds_values_not_the_user(self):
+        self.authenticate()
+        entry = _cache().get(_entry_key(self.user.pk))
+        dumped = pickle.dumps(entry)
+        self.assertNotIn(b"CustomUser", dumped)
+        self.assertNotIn(self.user.password.encode(), dumped)
+
+    def test_warm_request_costs_no_query(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual((user.pk, user.email, user.branch_id), (self.user.pk, self.user.email, self.user.branch_id))
+            self.assertTrue(user.branch.is_main_branch)
+            self.assertTrue(user.has_perm("accounting.view_currency"))
+        # the rest of the row loads on access
+        self.assertEqual(user.password, self.user.password)
+
+    def test_deactivating_the_user_is_seen_at_once(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_api_requests_authenticate_from_the_cache(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(client.get("/accounting/payment-methods/").status_code, 200)
+        self.assertEqual(client.get("/accounting/payment-methods/").status_code, 200)
+
+
+class FastJSONRendererTests(TestCase):
+    data = {
+        "decimals": [Decimal("12.50"), Decimal("0.1"), Decimal("-1234567.89"), Decimal("0")],
+        "utc": datetime.datetime(2026, 3, 1, 9, 30, 0, 123456, tzinfo=datetime.timezone.utc),
+        "dubai": datetime.datetime(2026, 3, 1, 13, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=4))),
+        "naive": datetime.datetime(2026, 3, 1, 9, 30),
+        "date": datetime.date(2026, 2, 28),
+        "time": datetime.time(23, 59, 1),
+        "uuid": uuid.UUID("0b8e5a4e-3f5c-4d2a-9c1e-6a2b7f0d4e11"),
+        "ids": {1: uuid.uuid4(), 2: None},
+        "text": ["Dubaï — ١٢٣", "line\u2028break", "tab\tquote\"", gettext_lazy("Active")],
+        "nested": [{"amount": Decimal("250.00"), "ok": True, "count": 3, "ratio": 0.25}],
+        "duration": datetime.timedelta(hours=1, seconds=1.5),
+    }
+
+    def test_output_is_byte_equal_to_drf(self):
+        self.assertIsNotNone(orjson)
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_api_responses_are_byte_equal_to_drf(self):
+        PaymentMethod.objects.create(name="fastjson-method")
+        client = APIClient()
+        client.force_authenticate(user=main_branch_superuser("fastjson"))
+        response = client.get("/accounting/payment-methods/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class SearchIndexTests(TestCase):
+    fields = Shipment.search_index_fields
+    values = [
+        {"origin_port": "AEJEA", "destination_port": "INNSA", "shipper": "Sand AND Stone Trading", "consignee": "Near East Foods"},
+        {"origin_port": "EGPSD", "destination_port": "Port-Said", "shipper": 'The "Quoted" Co', "consignee": "NEAR(x, y)"},
+        {"origin_port": "CNSHA", "destination_port": "AEJEA", "shipper": "Dubaï Logistics", "doc_ref_no": "1Z-999-AA0"},
+        {"origin_port": "USNYC", "destination_port": "GBFXT", "shipper": "Andes Freight", "consignee": None},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.shipments = [Shipment.objects.create(branch=branch, **values) for values in cls.values]
+
+    def icontains(self, terms):
+        queryset = Shipment.objects.all()
+        for term in terms:
+            any_field = Q()
+            for name in self.fields:
+                any_field |= Q(**{f"{name}__icontains": term})
+            queryset = queryset.filter(any_field)
+        return set(queryset.values_list("pk", flat=True))
+
+    def indexed(self, terms):
+        queryset = search_queryset(Shipment.objects.all(), terms, self.fields)
+        return None if queryset is None else set(queryset.values_list("pk", flat=True))
+
+    def test_index_matches_icontains(self):
+        self.assertIsNotNone(get_backend())
+        cases = [
+            ["aej"], ["AND"], ["and"], ["NEAR"], ["NOT"], ["OR "], ['"Quoted"'], ['e "q'], ["NEAR(x"], ["Port-Said"],
+            ["1Z-999"], ["dubaï"], ["port", "said"], ["sand", "near"], ["missing"], ["***"], ["x, y)"],
+        ]
+        for terms in cases:
+            with self.subTest(terms=terms):
+                found = self.indexed(terms)
+                self.assertIsNotNone(found)
+                self.assertEqual(found, self.icontains(terms))
+        # FTS keywords are searched as text, not as operators
+        self.assertEqual(self.indexed(["AND"]), {self.shipments[0].pk, self.shipments[3].pk})
+
+    def test_short_terms_fall_back_to_icontains(self):
+        self.assertIsNone(self.indexed(["AE"]))
+        self.assertIsNone(self.indexed(["aejea", "AE"]))
+        self.assertIsNone(self.indexed(["OR"]))
+
+    def test_dashed_terms_on_uuid_fields_fall_back_to_icontains(self):
+        # UUIDs are stored without dashes, which the trigram index can't see through
+        fields = (*self.fields, "id")
+        backend = get_backend()
+        with mock.patch.object(Shipment, "search_index_fields", fields), mock.patch.object(type(backend), "is_installed", return_value=True):
+            term = str(self.shipments[0].pk)
+            self.assertIsNone(backend.filter(Shipment.objects.all(), fields, [term]))
+            self.assertIsNotNone(backend.filter(Shipment.objects.all(), fields, [term.replace("-", "")]))
+
+    def test_saves_and_deletes_keep_the_index_in_sync(self):
+        shipment = self.shipments[3]
+        shipment.shipper = "Pampas Cargo"
+        shipment.save()
+        self.assertEqual(self.indexed(["pampas"]), {shipment.pk})
+        self.assertEqual(self.indexed(["andes"]), set())
+
+        # a save that leaves the indexed columns alone
+        shipment.shipper = "Andes Freight"
+        Shipment.objects.filter(pk=shipment.pk).update(shipper="Andes Freight")
+        shipment.save(update_fields=["updated"])
+        self.assertEqual(self.indexed(["pampas"]), {shipment.pk})
+        shipment.save(update_fields=["shipper"])
+        self.assertEqual(self.indexed(["andes"]), {shipment.pk})
+
+        created = Shipment.objects.create(branch=shipment.branch, origin_port="KEMBA", destination_port="TZDAR")
+        self.assertEqual(self.indexed(["kemba"]), {created.pk})
+        created.delete()
+        self.assertEqual(self.indexed(["kemba"]), set())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM operations_shipment_fts")
+            self.assertEqual(cursor.fetchone()[0], Shipment.objects.count())
+
+
+class GlobalSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.main = Branch.objects.filter(is_main_branch=True).first()
+        cls.other = Branch.objects.create(
+            name="Search Branch", address="1 Quay", city="Dubai", state="Dubai", country="AE", contact_number="0"
+        )
+        cls.main_user = main_branch_superuser("search-main")
+        cls.other_user = CustomUser.objects.create_user(username="search-other", email="search-other@example.invalid", branch=cls.other)
+        cls.other_user.user_permissions.add(*Permission.objects.filter(codename__in=["view_shipment", "view_sales"]))
+        cls.sales_user = CustomUser.objects.create_user(username="search-sales", email="search-sales@example.invalid", branch=cls.main)
+        cls.sales_user.user_permissions.add(Permission.objects.get(codename="view_sales"))
+
+        def shipment(ref, branch=cls.main):
+            return Shipment.objects.create(branch=branch, doc_ref_no=ref, origin_port="AEJEA", destination_port="INNSA")
+
+        cls.contains = shipment("A-ZQX100")
+        cls.prefix = shipment("ZQX100-B")
+        cls.exact = shipment("ZQX100")
+        cls.other_shipment = shipment("ZQX100-OTHER", branch=cls.other)
+        currency = Currency.objects.first()
+        cls.invoice = Sales.objects.create(
+            branch=cls.main, customer=create_customer(cls.main, currency), currency=currency, reference="ZQX100"
+        )
+
+    def setUp(self):
+        _cache().clear()
+
+    def search(self, user, **params):
+        response = self.client.get("/core/search/", params, HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def hits(self, body):
+        return [(hit["type"], hit["id"]) for hit in body["results"]]
+
+    def test_hits_are_ranked_exact_prefix_contains(self):
+        body = self.search(self.main_user, q="zqx100", types="shipment,invoice")
+        self.assertEqual(self.hits(body)[:3], [
+            ("shipment", str(self.exact.pk)),
+            # an exact match on the invoice's second field
+            ("invoice", self.invoice.pk),
+            ("shipment", str(self.other_shipment.pk)),
+        ])
+        scores = [hit["score"] for hit in body["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(body["results"][-1], {**body["results"][-1], "id": str(self.contains.pk), "score": 100})
+
+    def test_limit_per_type_and_has_more(self):
+        body = self.search(self.main_user, q="zqx100", types="shipment,invoice", shipment_limit=2)
+        self.assertEqual([hit["type"] for hit in body["results"]].count("shipment"), 2)
+        self.assertEqual(body["types"], {
+            "shipment": {"count": 2, "has_more": True},
+            "invoice": {"count": 1, "has_more": False},
+        })
+
+    def test_types_without_the_view_permission_are_skipped(self):
+        body = self.search(self.sales_user, q="zqx100")
+        self.assertEqual(self.hits(body), [("invoice", self.invoice.pk)])
+        self.assertEqual(set(body["types"]), {"invoice"})
+
+    def test_other_branch_users_only_see_their_branch(self):
+        body = self.search(self.other_user, q="zqx100")
+        self.assertEqual(self.hits(body), [("shipment", str(self.other_shipment.pk))])
+        # ?branch= only narrows for main-branch users
+        body = self.search(self.other_user, q="zqx100", branch=str(self.main.pk))
+        self.assertEqual(self.hits(body), [("shipment", str(self.other_shipment.pk))])
+
+    def test_main_branch_users_can_narrow_to_a_branch(self):
+        body = self.search(self.main_user, q="zqx100", branch=str(self.other.pk))
+        self.assertEqual(self.hits(body), [("shipment", str(self.other_shipment.pk))])
+
+
+@override_settings(REQUEST_INSTRUMENTATION={"ENABLED": True, "DUPLICATE_THRESHOLD": 3})
+class RequestInstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.groups = [ContactGroup.objects.create(name=f"metrics-{i}", branch=branch) for i in range(3)]
+
+    def setUp(self):
+        metrics_store.reset()
+
+    def read_groups(self):
+        # the same statement once per row: an N+1
+        for group in self.groups:
+            ContactGroup.objects.filter(pk=group.pk).exists()
+
+    def endpoint(self, path):
+        return next(row for row in metrics_store.snapshot() if row["endpoint"] == f"GET {path}")
+
+    def test_records_query_count_and_duplicate_fingerprint(self):
+        def view(request):
+            self.read_groups()
+            PaymentMethod.objects.count()
+            return HttpResponse()
+
+        RequestInstrumentationMiddleware(view)(RequestFactory().get("/n-plus-one/"))
+        row = self.endpoint("/n-plus-one/")
+        self.assertEqual((row["requests"], row["queries_max"], row["n_plus_one_requests"]), (1, 4, 1))
+        [duplicate] = row["duplicate_queries"]
+        self.assertEqual(duplicate["count"], 3)
+        self.assertIn('FROM "crm_contactgroup"', duplicate["sql"])
+
+    def test_streamed_queries_are_counted_when_the_body_is_sent(self):
+        def rows():
+            self.read_groups()
+            yield b"done"
+
+        response = RequestInstrumentationMiddleware(lambda request: StreamingHttpResponse(rows()))(RequestFactory().get("/stream/"))
+        self.assertEqual(metrics_store.snapshot(), [])
+        self.assertEqual(b"".join(response.streaming_content), b"done")
+        self.assertEqual(self.endpoint("/stream/")["queries_max"], 3)
+
+    def test_metrics_are_for_admins_only(self):
+        client = APIClient()
+        client.force_authenticate(user=CustomUser.objects.create_user(username="metrics-user", email="metrics-user@example.invalid"))
+        self.assertEqual(client.get("/core/metrics/requests/").status_code, 403)
+        client.force_authenticate(user=main_branch_superuser("metrics-admin"))
+        response = client.get("/core/metrics/requests/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("endpoints", response.json())
+
+
+class IndexAdvisorTests(TestCase):
+    # the composite indexes added on the advisor's proposals (accounting 0004 / 0006, operations 0003, sales 0002)
+    composites = {
+        GeneralLedger: {("branch", "posting_date", "id"), ("account", "posting_date", "id")},
+        Shipment: {("branch", "created", "id"), ("created", "id")},
+        Sales: {("branch", "created", "id"), ("created", "id")},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        # more invoices than a page, so ?account= pages need the ledger order
+        call_command(
+            "generate_synthetic_data", branches=1, customers=3, vendors=2, shipments=60, pickups=2, stdout=StringIO()
+        )
+
+    def proposals(self):
+        viewsets = [viewset for viewset in iter_viewsets() if viewset.queryset.model in self.composites]
+        _, proposals = advise(viewsets, min_rows=0)
+        return {(proposal.model, proposal.fields) for proposal in proposals}
+
+    def test_added_indexes_are_what_it_proposes(self):
+        with ExitStack() as stack, connection.cursor() as cursor:
+            for model, composites in self.composites.items():
+                kept = [index for index in model._meta.indexes if tuple(index.fields) not in composites]
+                for index in model._meta.indexes:
+                    if index not in kept:
+                        # rolled back with the test
+                        cursor.execute(f'DROP INDEX "{index.name}"')
+                stack.enter_context(mock.patch.object(model._meta, "indexes", kept))
+            proposals = self.proposals()
+        for model, composites in self.composites.items():
+            with self.subTest(model=model._meta.label):
+                self.assertLessEqual({(model, fields) for fields in composites}, proposals)
+
+    def test_nothing_left_to_propose_for_the_list_shapes(self):
+        proposed = {(model, fields) for model, fields in self.proposals() if fields[-1:] == ("id",)}
+        self.assertEqual(proposed, set())
+
+
+class SyntheticDataTests(TestCase):
+    def test_tiny_scale_inserts_the_expected_rows(self):
+        labels = [model._meta.label for model in apps.get_models()]
+        before = {label: apps.get_model(label)._default_manager.count() for label in labels}
+        out = StringIO()
+        call_command("generate_synthetic_data", branches=2, customers=3, vendors=2, shipments=4, pickups=2, stdout=out)
+        inserted = {label: apps.get_model(label)._default_manager.count() - before[label] for label in labels}
+
+        coa = 2 * len(COA_TEMPLATE)
+        expected = {
+            "master.Branch": 2,
+            "accounting.ChartofAccounts": coa,
+            "actors.Customer": 6,
+            "actors.Vendor": 4,
+            "actors.MainActor": 10,
+            # one per party plus one per chart account
+            "accounting.Accounts": 10 + coa,
+            "operations.Shipment": 8,
+            "operations.ShipmentTransportInfo": 8,
+            "operations.PaymentSummary": 8,
+            "sales.Sales": 8,
+            "accounting.JournalVoucher": 8,
+            "accounting.JournalVoucherItems": 16,
+            "accounting.GeneralLedger": 16,
+            "pickup.PickupOrder": 4,
+        }
+        self.assertEqual({label: inserted[label] for label in expected}, expected)
+
+        # the summary the command prints is what reached the database
+        reported = {label: int(count) for label, count in re.findall(r"^  (\w+\.\w+): (\d+)$", out.getvalue(), re.M)}
+        # the chart accounts' Accounts rows come with the seeded COA, not the parties
+        reported["accounting.Accounts"] += coa
+        self.assertEqual(reported, {label: inserted[label] for label in reported})
@@ -1,7 +1,11 @@
 from django.urls import path
 from core.utils.userGroups import GetUserFirstGroupView,AssignUserToGroupView
+from core.utils.requestMetrics import RequestMetricsView
+from core.utils.globalSearch import GlobalSearchView
  
 urlpatterns = [
     path('users/<int:user_id>/assign-group/', AssignUserToGroupView.as_view(), name='assign-user-to-group'),
     path('users/<int:user_id>/first-group/', GetUserFirstGroupView.as_view(), name='get-user-first-group'),
+    path('metrics/requests/', RequestMetricsView.as_view(), name='request-metrics'),
+    path('search/', GlobalSearchView.as_view(), name='global-search'),
 ]
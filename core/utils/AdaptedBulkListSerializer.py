@@ -1,9 +1,48 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import models, transaction
+from django.db.models import signals
+from django.utils import timezone
+from django.utils.module_loading import import_string
 from rest_framework import serializers
 from rest_framework_bulk.serializers import BulkListSerializer, BulkSerializerMixin
 from rest_framework.exceptions import ValidationError
 from rest_framework.fields import SkipField
+from rest_framework.serializers import raise_errors_on_nested_writes
 from rest_framework.settings import api_settings
-from rest_framework.utils import html
+from rest_framework.utils import html, model_meta
+from simple_history.models import HistoricalRecords
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from core.utils.historyPolicy import history_batch
+from core.utils.referenceCacheAPI import ReferenceRelatedField
+
+
+def _live_receivers(signal, model):
+    # Signal has no public way to list its receivers; _live_receivers()
+    # returns (sync, async) lists since Django 5.0 and one flat list before.
+    receivers = signal._live_receivers(model)
+    if isinstance(receivers, tuple):
+        receivers = [*receivers[0], *receivers[1]]
+    return receivers
+
+
+def has_per_row_save_hooks(model):
+    """
+    True when saving `model` has to go through `instance.save()` one row at a
+    time: it overrides save() or has pre_save/post_save receivers other than
+    simple_history's (the bulk helpers write the history rows themselves).
+    `bulk_save_per_row = True` forces the per-row path.
+    """
+    declared = getattr(model, "bulk_save_per_row", None)
+    if declared is not None:
+        return declared
+    if model.save is not models.Model.save:
+        return True
+    return any(
+        not isinstance(getattr(receiver, "__self__", None), HistoricalRecords)
+        for signal in (signals.pre_save, signals.post_save)
+        for receiver in _live_receivers(signal, model)
+    )
 
 class AdaptedBulkListSerializerMixin(object):
     def to_internal_value(self, data):
@@ -32,11 +71,12 @@ class AdaptedBulkListSerializerMixin(object):
 
         ret = []
         errors = []
+        instances = self._resolve_instances(data)
 
         for item in data:
             try:
                 # Code that was inserted
-                self.child.instance = self.instance.get(id=item['id']) if self.instance else None
+                self.child.instance = instances.get(self._key(item)) if self.instance is not None else None
                 self.child.initial_data = item
                 validated = self.child.run_validation(item)
             except ValidationError as exc:
@@ -50,10 +90,311 @@ class AdaptedBulkListSerializerMixin(object):
 
         return ret
 
+    def _id_attr(self):
+        return getattr(self.child.Meta, 'update_lookup_field', 'id')
+
+    def _key(self, item):
+        """Normalized lookup key for a raw item, so '1' / 1 and UUID casing all match."""
+        value = item.get(self._id_attr()) if isinstance(item, dict) else None
+        if value is None:
+            return None
+        try:
+            return str(self.child.Meta.model._meta.get_field(self._id_attr()).to_python(value))
+        except (DjangoValidationError, ValueError, TypeError):
+            return None
+
+    def _resolve_instances(self, data):
+        """One in_bulk() query for every instance touched by a bulk PUT/PATCH."""
+        if self.instance is None or not isinstance(self.instance, models.QuerySet):
+            self._instances = {}
+            return self._instances
+        keys = {key for key in map(self._key, data) if key is not None}
+        found = self.instance.in_bulk(list(keys), field_name=self._id_attr()) if keys else {}
+        self._instances = {str(key): obj for key, obj in found.items()}
+        return self._instances
+
+    def _can_bulk_save(self, all_validated_data):
+        """
+        The set-based path is only taken when it would do exactly what the
+        per-row path does: plain ModelSerializer create/update, no per-row
+        model hooks, and only concrete non-m2m columns being written.
+        """
+        model = self.child.Meta.model
+        if has_per_row_save_hooks(model):
+            return False
+        child_cls = type(self.child)
+        if child_cls.update is not serializers.ModelSerializer.update or child_cls.create is not serializers.ModelSerializer.create:
+            return False
+        concrete = {f.name for f in model._meta.concrete_fields}
+        for validated_data in all_validated_data:
+            raise_errors_on_nested_writes('update', self.child, validated_data)
+            if not set(validated_data) <= concrete:
+                return False
+        return True
+
+    def _history_user(self):
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        return user if user is not None and user.is_authenticated else None
+
+    def create(self, validated_data):
+        if not self._can_bulk_save(validated_data):
+            # per-row saves, history rows still inserted in bulk
+            with history_batch():
+                return super().create(validated_data)
+
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        with transaction.atomic():
+            if hasattr(model, 'history'):
+                return bulk_create_with_history(objs, model, default_user=self._history_user())
+            return model._default_manager.bulk_create(objs)
+
+    def update(self, queryset, all_validated_data):
+        id_attr = self._id_attr()
+        instances = getattr(self, '_instances', None)
+        if instances is None:
+            with history_batch():
+                return super().update(queryset, all_validated_data)
+
+        objs, fields = [], set()
+        for validated_data in all_validated_data:
+            obj = instances.get(self._key(validated_data))
+            if obj is None:
+                raise ValidationError('Could not find all objects to update.')
+            validated_data.pop(id_attr, None)
+            objs.append((obj, validated_data))
+
+        if not self._can_bulk_save([data for _, data in objs]):
+            with history_batch():
+                return [self.child.update(obj, data) for obj, data in objs]
+
+        model = self.child.Meta.model
+        now = timezone.now()
+        auto_now = [f.name for f in model._meta.concrete_fields if getattr(f, 'auto_now', False)]
+        for obj, validated_data in objs:
+            for attr, value in validated_data.items():
+                setattr(obj, attr, value)
+                fields.add(attr)
+            for attr in auto_now:
+                setattr(obj, attr, now)
+        fields.update(auto_now)
+
+        updated = [obj for obj, _ in objs]
+        if not fields:
+            return updated
+        with transaction.atomic():
+            if hasattr(model, 'history'):
+                bulk_update_with_history(updated, model, sorted(fields), default_user=self._history_user())
+            else:
+                model._default_manager.bulk_update(updated, sorted(fields))
+        return updated
+
 class AdaptedBulkListSerializer(AdaptedBulkListSerializerMixin, BulkListSerializer):
     pass
 
-class BulkModelSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+def _parse_paths(raw):
+    """`"no,customer.name,customer.currency"` -> `{"no": {}, "customer": {"name": {}, "currency": {}}}`"""
+    tree = {}
+    for item in (raw or "").split(","):
+        node = tree
+        for part in item.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def sparse_params(request):
+    """(fields tree or None, expand tree) requested by `?fields=` / `?expand=` on a read."""
+    if request is None or request.method not in ("GET", "HEAD"):
+        return None, {}
+    params = request.query_params
+    return _parse_paths(params.get("fields")) or None, _parse_paths(params.get("expand"))
+
+
+def expandable_serializers(serializer_class):
+    """{relation: serializer class} of `serializer_class.expandable_fields`, dotted paths imported."""
+    return {
+        name: import_string(target) if isinstance(target, str) else target
+        for name, target in (getattr(serializer_class, "expandable_fields", None) or {}).items()
+    }
+
+
+def _allowed_expand(serializer_class, tree):
+    """The part of an expand tree the serializers along each path list in `expandable_fields`."""
+    allowed = {}
+    for name, children in tree.items():
+        target = expandable_serializers(serializer_class).get(name)
+        if target is not None:
+            allowed[name] = _allowed_expand(target, children) if issubclass(target, DynamicFieldsMixin) else {}
+    return allowed
+
+
+class DynamicFieldsMixin:
+    """
+    `?fields=no,customer,total` keeps only those fields in the output and
+    `?expand=customer,customer.currency` renders those relations as nested
+    objects instead of ids (dotted paths expand further down; `fields` can
+    reach into an expansion too: `fields=no,customer.name&expand=customer`).
+    Only relations listed in `expandable_fields` expand, each rendered with
+    the serializer named there; others stay ids, so `expand` never shows more
+    than an endpoint already serves. Only applies to reads of the top-level
+    serializer; writes always see every field, and without either parameter
+    the response is unchanged. The
+    matching queryset work (`only()`, select/prefetch for the expansions) is
+    done by `restrict_queryset`, see SparseFieldsetMixin on BaseModelViewSet.
+
+    Mixed into BulkModelSerializer and into the sales, purchase, operations,
+    warehouse and pickup serializers; serializers without it ignore both
+    parameters.
+    """
+
+    # {relation: serializer class or its dotted path} that ?expand= may render
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        # (fields, expand) handed down to an expanded relation
+        self._sparse = kwargs.pop("sparse", None)
+        super().__init__(*args, **kwargs)
+
+    def _sparse_params(self):
+        if self._sparse is not None:
+            return self._sparse
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            # declared nested serializer: not addressed by the query string
+            return None, {}
+        return sparse_params(self.context.get("request"))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, expand = self._sparse_params()
+
+        expanded = set()
+        if expand:
+            relations = model_meta.get_field_info(self.Meta.model).relations
+            expandable = expandable_serializers(type(self))
+            for name, nested_expand in expand.items():
+                relation = relations.get(name)
+                serializer_class = expandable.get(name)
+                if relation is None or serializer_class is None or name in self._declared_fields:
+                    continue
+                kwargs = {"read_only": True, "many": relation.to_many}
+                if issubclass(serializer_class, DynamicFieldsMixin):
+                    kwargs["sparse"] = ((only or {}).get(name) or None, nested_expand)
+                fields[name] = serializer_class(**kwargs)
+                expanded.add(name)
+
+        if only:
+            keep = set(only) | expanded
+            for name in list(fields):
+                if name not in keep:
+                    fields.pop(name)
+        return fields
+
+
+def _relation_lookups(model, tree, prefix=""):
+    """Split the expand tree into select_related and prefetch_related lookups."""
+    select, prefetch = [], []
+    for name, children in tree.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # reverse relations are looked up by accessor name
+            field = next((rel for rel in model._meta.related_objects if rel.get_accessor_name() == name), None)
+        if field is None or not field.is_relation:
+            continue
+        lookup = f"{prefix}{name}"
+        if field.many_to_many or field.one_to_many:
+            # everything below a to-many hop is prefetched as well
+            prefetch.append(lookup)
+            nested_select, nested_prefetch = _relation_lookups(field.related_model, children, f"{lookup}__")
+            prefetch.extend(nested_select + nested_prefetch)
+        else:
+            select.append(lookup)
+            nested_select, nested_prefetch = _relation_lookups(field.related_model, children, f"{lookup}__")
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+    return select, prefetch
+
+
+def _select_related_paths(tree, prefix=""):
+    for name, children in tree.items():
+        yield f"{prefix}{name}"
+        yield from _select_related_paths(children, f"{prefix}{name}__")
+
+
+def _column(model, name):
+    try:
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field.name if field.concrete and not field.many_to_many else None
+
+
+def restrict_queryset(queryset, serializer_class, request, ordering=()):
+    """
+    Shape the queryset after `?fields=` / `?expand=`: join or prefetch only
+    the requested expansions and, when every requested field is a model
+    field, load only those columns (plus the pk and the ordering columns the
+    paginator seeks on). Existing select/prefetch lookups survive only if
+    their relation is still part of the response.
+    """
+    if not (isinstance(serializer_class, type) and issubclass(serializer_class, DynamicFieldsMixin)):
+        return queryset
+    only, expand = sparse_params(request)
+    expand = _allowed_expand(serializer_class, expand)
+    if not only and not expand:
+        return queryset
+
+    model = queryset.model
+    select, prefetch = _relation_lookups(model, expand)
+
+    if only:
+        keep = set(only) | set(expand)
+        declared = serializer_class._declared_fields
+        columns, computed = {model._meta.pk.name}, False
+        for name in keep:
+            column = _column(model, name)
+            if column is not None:
+                columns.add(column)
+            elif name in expand:
+                continue
+            elif name not in declared or not isinstance(declared[name], serializers.BaseSerializer):
+                # method / property fields may read any column
+                computed = True
+
+        current = queryset.query.select_related
+        if current is True:
+            current = {}
+        select = [path for path in _select_related_paths(current or {}) if path.split("__")[0] in keep] + select
+        prefetch = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, "prefetch_through", lookup).split("__")[0] in keep
+        ] + prefetch
+        queryset = queryset.select_related(None).prefetch_related(None)
+
+        if not computed:
+            for term in ordering:
+                column = _column(model, term.lstrip("-").split("__")[0]) if isinstance(term, str) else None
+                if column is not None:
+                    columns.add(column)
+            # joined relations have to be listed in only() too
+            columns.update(path.split("__")[0] for path in select)
+            queryset = queryset.only(*columns)
+
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class BulkModelSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = ReferenceRelatedField
+
     class Meta:
         list_serializer_class = AdaptedBulkListSerializer
-        depth=2
\ No newline at end of file
+        depth = 2
@@ -0,0 +1,132 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+
+from core.utils.authCacheAPI import CachedJWTAuthentication
+from core.utils.branchContext import get_branch_context
+from core.utils.dbRouting import use_replica
+from core.utils.FastJSON import json_dumps
+from core.utils.IsMainBranchOrOwnBranch import IsMainBranchOrOwnBranch
+from core.utils.modelCapabilities import get_model_capabilities
+
+DEFAULTS = {
+    # run fan_out() tasks concurrently; off = one after another on the sync thread
+    "FAN_OUT": True,
+}
+
+
+def async_reads_config():
+    return {**DEFAULTS, **(getattr(settings, "ASYNC_READS", {}) or {})}
+
+
+def _own_connection(func):
+    @wraps(func)
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # pool threads are reused by other requests: don't leave connections behind
+            connections.close_all()
+
+    return run
+
+
+def run_in_thread(func, *args, **kwargs):
+    """
+    Await a sync (ORM / DRF) callable on a thread of the shared pool with
+    its own DB connection. Plain sync_to_async runs it on the request's one
+    sync thread, so calls made together would still run one after another.
+    """
+    return sync_to_async(_own_connection(func), thread_sensitive=False)(*args, **kwargs)
+
+
+async def fan_out(**tasks):
+    """
+    Run independent sync read callables at the same time and return
+    {name: result}. This is thread fan-out of ordinary sync ORM code, not
+    async database I/O: each callable runs on a pool thread with its own
+    connection, so they only see committed data (not the caller's open
+    transaction).
+    """
+    if not async_reads_config()["FAN_OUT"]:
+        return await sync_to_async(lambda: {name: func() for name, func in tasks.items()})()
+    results = await asyncio.gather(*(run_in_thread(func) for func in tasks.values()))
+    return dict(zip(tasks, results))
+
+
+class AsyncReadOnlyView(View):
+    """
+    Base for heavy read-only JSON endpoints. Subclasses implement
+    `aget_data()`, handing independent reads to `fan_out()`, or only the sync
+    `get_data()`, which then runs on a pool thread. Requests are
+    authenticated like the API (cached JWT) and checked against the
+    permissions of BaseModelViewSet, read from the replica when one is
+    configured and rendered with orjson.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    authentication_class = CachedJWTAuthentication
+    permission_classes = [IsAuthenticated, IsMainBranchOrOwnBranch]
+
+    async def aget_data(self, request, *args, **kwargs):
+        return await run_in_thread(self.get_data, request, *args, **kwargs)
+
+    def get_data(self, request, *args, **kwargs):
+        raise NotImplementedError(f"{type(self).__name__} must implement aget_data() or get_data().")
+
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+
+    def check_permissions(self, request):
+        for permission in self.get_permissions():
+            if not permission.has_permission(request, self):
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def check_object_permissions(self, request, obj):
+        """As APIView.check_object_permissions; call it on the object(s) `aget_data()` returns data of."""
+        for permission in self.get_permissions():
+            if not permission.has_object_permission(request, self, obj):
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def scope(self, queryset):
+        """Branch scoping of BaseModelViewSet: main-branch users see every branch."""
+        ctx = self.branch_context
+        if get_model_capabilities(queryset.model).has_branch and not ctx.is_main_branch:
+            return queryset.filter(branch_id=ctx.branch_id)
+        return queryset
+
+    @staticmethod
+    def error(detail, status_code):
+        # same body as DRF's exception handler: a dict detail (simplejwt's InvalidToken) is the body itself
+        body = detail if isinstance(detail, dict) else {"detail": detail}
+        response = HttpResponse(json_dumps(body), status=status_code, content_type="application/json")
+        if status_code == status.HTTP_401_UNAUTHORIZED:
+            response["WWW-Authenticate"] = 'Bearer realm="api"'
+        return response
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            authenticated = await sync_to_async(self.authentication_class().authenticate)(request)
+        except exceptions.APIException as exc:
+            return self.error(exc.detail, exc.status_code)
+        if authenticated is None:
+            return self.error(exceptions.NotAuthenticated.default_detail, status.HTTP_401_UNAUTHORIZED)
+        request.user = authenticated[0]
+        self.branch_context = await sync_to_async(get_branch_context)(request)
+
+        with use_replica():
+            try:
+                await sync_to_async(self.check_permissions)(request)
+                data = await self.aget_data(request, *args, **kwargs)
+            except Http404:
+                return self.error(exceptions.NotFound.default_detail, status.HTTP_404_NOT_FOUND)
+            except exceptions.APIException as exc:
+                return self.error(exc.detail, exc.status_code)
+        return HttpResponse(json_dumps(data), content_type="application/json")
@@ -1,12 +1,21 @@
 
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework_bulk.generics import BulkModelViewSet
 from master.models import Branch
 from core.utils.IsMainBranchOrOwnBranch import IsMainBranchOrOwnBranch
 from core.utils.userSession import get_current_user_branch
+from core.utils.branchContext import get_branch_context, resolve_user_branch
+from core.utils.modelCapabilities import get_model_capabilities
+from core.utils.KeysetPagination import KeysetPagination
+from core.utils.StreamingExport import StreamingExportMixin
+from core.utils.ConditionalGet import ConditionalGetMixin
+from core.utils.dbRouting import ReplicaReadMixin
+from core.utils.AdaptedBulkListSerializer import restrict_queryset
+from core.utils.searchIndexAPI import IndexedSearchFilter
 
 class IsAuthenticated(permissions.IsAuthenticated):
     pass
@@ -24,52 +33,109 @@ class BranchScopedMixin:
             return qs.none()  # or just return qs if you want anonymous to see nothing
 
         # If model has a branch field
-        model_cls = self.serializer_class.Meta.model
-        if any(f.name == "branch" for f in model_cls._meta.get_fields()):
-            branch = getattr(user, "branch", None)
-            if branch:
-                if getattr(branch, "is_main_branch", False):
+        if get_model_capabilities(qs.model).has_branch:
+            ctx = get_branch_context(self.request)
+            if ctx.branch is not None:
+                if ctx.is_main_branch:
                     # Main branch → see everything
                     return qs
                 else:
                     # Non-main branch → filter only own branch
-                    return qs.filter(branch=branch)
+                    return qs.filter(branch_id=ctx.branch_id)
 
         # If no branch field, just return all
         return qs
 
 
-class BaseModelViewSet(BranchScopedMixin, BulkModelViewSet):
+class SystemGeneratedProtectMixin:
+    """
+    Refuse PUT/PATCH/DELETE on rows flagged `is_system_generated`, checked on
+    the instances the view loads anyway (get_object, bulk update, bulk
+    destroy) so the protection costs no extra query.
+    """
+
+    protects_system_generated = True
+    system_generated_message = "System-generated records cannot be updated or deleted."
+
+    def _deny_system_generated(self, model, objects):
+        if self.request.method not in ("PUT", "PATCH", "DELETE"):
+            return
+        if not get_model_capabilities(model).has_is_system_generated:
+            return
+        if any(obj.is_system_generated for obj in objects):
+            raise PermissionDenied(self.system_generated_message)
+
+    def get_object(self):
+        obj = super().get_object()
+        if obj is not None:
+            self._deny_system_generated(type(obj), [obj])
+        return obj
+
+    def perform_bulk_update(self, serializer):
+        model = serializer.child.Meta.model
+        instances = getattr(serializer, "_instances", None)
+        if instances is None:
+            ids = [item.get("id") for item in serializer.validated_data]
+            instances = serializer.instance.filter(pk__in=ids, is_system_generated=True) if get_model_capabilities(model).has_is_system_generated else []
+        else:
+            instances = instances.values()
+        self._deny_system_generated(model, instances)
+        return super().perform_bulk_update(serializer)
+
+    def perform_bulk_destroy(self, objects):
+        objects = list(objects)
+        if objects:
+            self._deny_system_generated(type(objects[0]), objects)
+        return super().perform_bulk_destroy(objects)
+
+
+class SparseFieldsetMixin:
+    """
+    Apply `?fields=` / `?expand=` to the queryset as well as the serializer
+    (only for serializers built on DynamicFieldsMixin): the requested
+    expansions are joined / prefetched and everything else is left out.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        ordering = list(queryset.query.order_by) or getattr(self, "ordering", None) or queryset.model._meta.ordering or []
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        return restrict_queryset(queryset, self.get_serializer_class(), self.request, ordering=ordering)
+
+
+class BaseModelViewSet(ReplicaReadMixin, BranchScopedMixin, SystemGeneratedProtectMixin, ConditionalGetMixin, SparseFieldsetMixin, StreamingExportMixin, BulkModelViewSet):
     permission_classes = [IsAuthenticated, IsMainBranchOrOwnBranch]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     ordering_fields = "__all__"
     search_fields = []
     filterset_class = None
+    pagination_class = KeysetPagination
 
     def _valid_branch_for(self, user):
         """Return a valid Branch object for this user, else None."""
-        branch = getattr(user, "branch", None)
-        if branch and Branch.objects.filter(pk=branch.pk).exists():
+        if user is getattr(self.request, "user", None):
+            branch = get_branch_context(self.request).branch
+        else:
+            branch = resolve_user_branch(user)
+        if branch is not None:
             return branch
 
         # Optional fallback from session helper
         try:
-            fb_id = get_current_user_branch()
+            fallback = get_current_user_branch()
         except Exception:
-            fb_id = None
-        if fb_id and Branch.objects.filter(pk=fb_id).exists():
-            return Branch.objects.get(pk=fb_id)
-
-        return None
+            fallback = None
+        return fallback if isinstance(fallback, Branch) else None
 
     def perform_create(self, serializer):
-        branch = self.request.user.branch
+        branch = get_branch_context(self.request).branch
         extra = {"branch": branch}
         serializer.save(**extra)
 
     def perform_update(self, serializer):
         extra = {}
-        branch = self.request.user.branch
+        branch = get_branch_context(self.request).branch
         if branch is not None:
             extra["branch"] = branch
         serializer.save(**extra)
@@ -0,0 +1,241 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import serializers, status
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.response import Response
+
+from core.utils.modelCapabilities import get_model_capabilities
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _model_field(model, attr):
+    if attr == "pk":
+        return model._meta.pk
+    try:
+        return model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        # reverse relations are reached by their accessor (`item_set`)
+        for relation in model._meta.related_objects:
+            if relation.get_accessor_name() == attr:
+                return relation
+    return None
+
+
+def _relation_models(model, source_attrs):
+    """
+    (models read on the way, model of the last attribute or None) when
+    following `source_attrs` from `model`; None when the path leaves the
+    model fields (properties, methods).
+    """
+    reached, current, target = set(), model, None
+    for position, attr in enumerate(source_attrs):
+        if target is not None:
+            reached.add(target)
+        field = _model_field(current, attr)
+        if field is None:
+            return None
+        if not field.is_relation:
+            return (reached, None) if position == len(source_attrs) - 1 else None
+        if field.related_model is None:
+            # generic foreign keys
+            return None
+        if field.many_to_many:
+            through = getattr(field, "through", None) or field.remote_field.through
+            # auto-created join tables have no timestamp to version them by
+            if get_model_capabilities(through).updated_field is None:
+                return None
+            reached.add(through)
+        current = target = field.related_model
+    return reached, target
+
+
+def rendered_models(serializer, model):
+    """
+    The models whose rows `serializer` reads for an instance of `model`,
+    besides the instance's own row: nested serializers (`depth` included),
+    slug / string related fields and dotted sources. None when a field's
+    output can't be traced to tables (method fields, properties, plain
+    nested serializers, join tables without a timestamp).
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    reached = set()
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            return None
+        if field.source == "*":
+            if isinstance(field, serializers.BaseSerializer):
+                nested = rendered_models(field, model)
+                if nested is None:
+                    return None
+                reached |= nested
+            continue
+        path = _relation_models(model, field.source_attrs)
+        if path is None:
+            return None
+        models, target = path
+        reached |= models
+
+        if isinstance(field, serializers.BaseSerializer):
+            child = field.child if isinstance(field, serializers.ListSerializer) else field
+            child_model = getattr(getattr(child, "Meta", None), "model", None)
+            if target is None or child_model is None:
+                return None
+            nested = rendered_models(child, child_model)
+            if nested is None:
+                return None
+            reached |= nested
+        elif isinstance(field, (RelatedField, ManyRelatedField)):
+            relation = field.child_relation if isinstance(field, ManyRelatedField) else field
+            if target is None:
+                return None
+            # a forward pk is the FK column of the row itself; anything else reads the related rows
+            if isinstance(field, ManyRelatedField) or not relation.use_pk_only_optimization():
+                reached.add(target)
+    return reached
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified on `list` and `retrieve` for models with an auto_now
+    timestamp (`updated`, or `updated_at` in master).
+
+    - detail: validators come from the row's timestamp, checked right after
+      `get_object()` (permissions included) and before serializing.
+    - list: one aggregate over the filtered queryset, `max(updated)` plus
+      `count(*)`, so edits and deletes both change the ETag. The full query
+      string (filters, cursor, page size) and the user are part of the tag.
+      Only `If-None-Match` is honoured on lists: a delete does not move
+      `max(updated)`, so `If-Modified-Since` alone could hide it.
+    - nested data: every other table the serializer renders (see
+      `rendered_models()`) adds its whole-table `max(updated)` / `count(*)`,
+      so an edit to a nested row changes the tag of every response that may
+      show it. Views whose serializer can't be traced (method fields and
+      the like) send no validators unless they list the models they read in
+      `conditional_get_models`.
+
+    A match is answered with an empty 304 without touching the serializer.
+    Writes through `QuerySet.update()` don't bump `updated` and are not seen.
+    """
+
+    conditional_get = True
+    conditional_get_models = None
+
+    def _conditional_field(self, model):
+        if not self.conditional_get or self.request.method not in ("GET", "HEAD"):
+            return None
+        return get_model_capabilities(model).updated_field
+
+    def _related_versions(self, model, using):
+        """[(max(updated), count)] of the other tables in the response, or None if they can't be versioned."""
+        related = self.conditional_get_models
+        if related is None:
+            related = rendered_models(self.get_serializer(), model)
+            if related is None:
+                return None
+        versions = []
+        for related_model in sorted(related, key=lambda m: m._meta.label):
+            field = get_model_capabilities(related_model).updated_field
+            if field is None:
+                return None
+            state = related_model._base_manager.using(using).aggregate(last_modified=Max(field), count=Count("pk"))
+            versions.append((state["last_modified"], state["count"]))
+        return versions
+
+    @staticmethod
+    def _latest(last_modified, versions):
+        stamps = [stamp for stamp, _ in versions if stamp is not None]
+        if last_modified is not None:
+            stamps.append(last_modified)
+        return max(stamps) if stamps else None
+
+    @staticmethod
+    def _tag_parts(versions):
+        return [f"{stamp.isoformat() if stamp else ''}:{count}" for stamp, count in versions]
+
+    def filter_queryset(self, queryset):
+        # list() has filtered already: hand its queryset to the listing once
+        filtered = getattr(self, "_conditional_queryset", None)
+        if filtered is not None:
+            self._conditional_queryset = None
+            return filtered
+        return super().filter_queryset(queryset)
+
+    def _etag(self, *parts):
+        request = self.request
+        raw = "|".join(
+            str(part) for part in (
+                request.get_full_path(),
+                getattr(request, "accepted_media_type", ""),
+                getattr(request.user, "pk", ""),
+                *parts,
+            )
+        )
+        return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+    def _not_modified(self, etag, last_modified, allow_if_modified_since=True):
+        if_none_match = self.request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+            tags = parse_etags(if_none_match)
+            return "*" in tags or _strip_weak(etag) in {_strip_weak(tag) for tag in tags}
+        if not allow_if_modified_since or last_modified is None:
+            return False
+        if_modified_since = parse_http_date_safe(self.request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+        return if_modified_since is not None and int(last_modified.timestamp()) <= if_modified_since
+
+    @staticmethod
+    def _with_validators(response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        # responses are per user: let the browser keep them, but revalidate every time
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        field = self._conditional_field(queryset.model)
+        versions = self._related_versions(queryset.model, queryset.db) if field is not None else None
+        if versions is None:
+            self._conditional_queryset = queryset
+            return super().list(request, *args, **kwargs)
+
+        state = queryset.order_by().aggregate(last_modified=Max(field), count=Count("pk"))
+        last_modified = self._latest(state["last_modified"], versions)
+        etag = self._etag(
+            state["count"], state["last_modified"].isoformat() if state["last_modified"] else "", *self._tag_parts(versions)
+        )
+        if self._not_modified(etag, last_modified, allow_if_modified_since=False):
+            return self._with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+        self._conditional_queryset = queryset
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self._with_validators(response, etag, last_modified)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        field = self._conditional_field(type(instance))
+        versions = self._related_versions(type(instance), instance._state.db) if field is not None else None
+        if versions is None:
+            return Response(self.get_serializer(instance).data)
+
+        updated = getattr(instance, field)
+        last_modified = self._latest(updated, versions)
+        etag = self._etag(instance.pk, updated.isoformat() if updated else "", *self._tag_parts(versions))
+        if self._not_modified(etag, last_modified):
+            return self._with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+        return self._with_validators(Response(self.get_serializer(instance).data), etag, last_modified)
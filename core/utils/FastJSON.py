@@ -0,0 +1,103 @@
+import datetime
+import decimal
+import json
+
+from django.conf import settings
+from django.utils.functional import Promise
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: without it the DRF renderer / parser code paths are used
+    orjson = None
+
+if orjson is not None:
+    # UTC datetimes end in "Z" like DRF's encoder; dicts keyed by ints / UUIDs are allowed
+    _ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _decimal(obj):
+    # like DecimalField output: a string unless COERCE_DECIMAL_TO_STRING is off
+    return str(obj) if api_settings.COERCE_DECIMAL_TO_STRING else float(obj)
+
+
+class FastJSONEncoder(JSONEncoder):
+    """DRF's encoder, with decimals written the way DecimalField writes them."""
+
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return _decimal(obj)
+        return super().default(obj)
+
+
+def _default(obj):
+    """Types orjson leaves to us, converted the way FastJSONEncoder does."""
+    if isinstance(obj, decimal.Decimal):
+        return _decimal(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _drf_default(obj):
+    """_default() with decimals as floats, as DRF's JSONEncoder writes them."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return _default(obj)
+
+
+def json_dumps(data):
+    """Compact UTF-8 JSON bytes, through orjson when it is installed."""
+    if orjson is None:
+        return json.dumps(data, cls=FastJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer on orjson, with the same bytes as the stock renderer:
+    ISO dates with "Z" for UTC, UUIDs as strings and decimals the serializers
+    did not already turn into strings as floats (json_dumps() keeps those as
+    strings). Indented output (`; indent=4`), ensure_ascii and a missing
+    orjson fall back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.ensure_ascii or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_drf_default, option=_ORJSON_OPTIONS)
+        # same escaping as JSONRenderer: valid JSON, but not valid JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSONParser on orjson for UTF-8 bodies. Numbers parse like the stock
+    parser (floats; DecimalField turns them into exact Decimals) and
+    NaN / Infinity are rejected like STRICT_JSON does.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "").replace("_", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -1,4 +1,6 @@
 from rest_framework.permissions import BasePermission
+from core.utils.branchContext import get_branch_context
+from core.utils.modelCapabilities import get_model_capabilities
 
 class IsMainBranchOrOwnBranch(BasePermission):
     """
@@ -11,9 +13,13 @@ class IsMainBranchOrOwnBranch(BasePermission):
         return request.user and request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
+        ctx = get_branch_context(request)
+
         # If user is from main branch, allow everything
-        if request.user.branch and request.user.branch.is_main_branch:
+        if ctx.is_main_branch:
             return True
 
         # Otherwise, restrict access to user's own branch
-        return hasattr(obj, 'branch_display') and obj.branch_display == request.user.branch
+        if get_model_capabilities(obj).has_branch:
+            return ctx.branch_id is not None and obj.branch_id == ctx.branch_id
+        return hasattr(obj, 'branch_display') and obj.branch_display == ctx.branch
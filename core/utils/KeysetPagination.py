@@ -0,0 +1,255 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        # keep microseconds, DjangoJSONEncoder truncates them and the cursor would drift
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset (seek) pagination on the view's ordering plus the primary key.
+
+    Every page is fetched with `WHERE (ordering, pk) > (last row)` instead of
+    an OFFSET, so deep pages cost the same as the first one and no COUNT(*) is
+    ever issued. The ordering is taken from the queryset (OrderingFilter has
+    already applied `?ordering=` or `view.ordering` by then), falling back to
+    `view.ordering`, then the model's Meta.ordering, and always ends with the
+    primary key so the position of a row is unique.
+
+    Paging is opt-in per request: only `?page_size=` or `?cursor=` switch
+    the response to `{next, previous, results}`; without them the list is
+    the plain JSON array it always was, so existing clients keep working.
+    Set `paginate_by_default = True` on a subclass (PagedKeysetPagination)
+    to page every request.
+
+    Views that really need page numbers or totals can opt out by setting
+    `pagination_class = OffsetPagination` (or None) on the viewset.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+    paginate_by_default = False
+
+    def requested(self, request):
+        """Whether this request asked for pages (or the paginator pages everything)."""
+        params = request.query_params
+        return self.paginate_by_default or self.page_size_query_param in params or self.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if not self.requested(request):
+            return None
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.keys = self.get_keys(queryset, view)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor.get("r"))
+        position = cursor.get("p") if cursor else None
+
+        queryset = queryset.order_by(*self._order_by(reverse=self.reverse))
+        if position is not None:
+            queryset = queryset.filter(self._seek(position, reverse=self.reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+
+        if self.reverse:
+            self.has_previous = has_more
+            self.has_next = position is not None
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if self.has_next or self.has_previous:
+            self.display_page_controls = True
+        return self.page
+
+    # --- ordering ---------------------------------------------------------
+
+    def get_keys(self, queryset, view):
+        """
+        Return `[(lookup, descending, nullable), ...]` for the effective
+        ordering, ending with the primary key.
+        """
+        ordering = [o for o in queryset.query.order_by if isinstance(o, str)]
+        if not ordering:
+            ordering = getattr(view, "ordering", None) or queryset.model._meta.ordering or []
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        pk_name = self.model._meta.pk.name
+        keys, seen = [], set()
+        for term in ordering:
+            if not isinstance(term, str) or term == "?":
+                continue
+            descending = term.startswith("-")
+            resolved = self._resolve(term.lstrip("-"))
+            if resolved is None or resolved[0] in seen:
+                continue
+            lookup, nullable = resolved
+            seen.add(lookup)
+            keys.append((lookup, descending, nullable))
+
+        if not ({pk_name, "pk"} & seen):
+            descending = keys[-1][1] if keys else True
+            keys.append((pk_name, descending, False))
+        return keys
+
+    def _resolve(self, lookup):
+        """Map an ordering term to a concrete column lookup, or None if it can't be seeked on."""
+        opts, parts, nullable = self.model._meta, lookup.split("__"), False
+        for i, part in enumerate(parts):
+            try:
+                field = opts.pk if part == "pk" else opts.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if field.many_to_many or field.one_to_many:
+                return None
+            nullable = nullable or getattr(field, "null", False)
+            if field.is_relation:
+                if i == len(parts) - 1:
+                    # order by the FK column, not the related model's Meta.ordering
+                    parts[i] = field.attname
+                    break
+                opts = field.related_model._meta
+            elif i != len(parts) - 1:
+                return None
+            else:
+                parts[i] = field.name
+        return "__".join(parts), nullable
+
+    def _order_by(self, reverse=False):
+        terms = []
+        for lookup, descending, nullable in self.keys:
+            desc = descending != reverse
+            if not nullable:
+                terms.append(f"-{lookup}" if desc else lookup)
+            else:
+                nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+                terms.append(F(lookup).desc(**nulls) if desc else F(lookup).asc(**nulls))
+        return terms
+
+    def _seek(self, position, reverse=False):
+        """
+        Build `(k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...` for the keys, where
+        ">" means "comes after" in the (possibly reversed) ordering. NULLs
+        always sort last in the forward direction.
+        """
+        if len(position) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+
+        query, equal = Q(pk__in=[]), Q()
+        for (lookup, descending, nullable), value in zip(self.keys, position):
+            after = self._after(lookup, descending != reverse, nullable, value, reverse)
+            if after is not None:
+                query |= equal & after
+            equal &= Q(**{f"{lookup}__isnull": True}) if value is None else Q(**{lookup: value})
+        return query
+
+    @staticmethod
+    def _after(lookup, desc, nullable, value, reverse):
+        if value is None:
+            # NULLs are last going forward (nothing after them) and first going back
+            return Q(**{f"{lookup}__isnull": False}) if reverse else None
+        after = Q(**{f"{lookup}__{'lt' if desc else 'gt'}": value})
+        if nullable and not reverse:
+            after |= Q(**{f"{lookup}__isnull": True})
+        return after
+
+    # --- cursor -----------------------------------------------------------
+
+    def _position(self, instance):
+        values = []
+        for lookup, _, _ in self.keys:
+            value = instance
+            for part in lookup.split("__"):
+                value = getattr(value, part, None) if value is not None else None
+            values.append(_encode_value(value))
+        return values
+
+    def encode_cursor(self, cursor):
+        token = b64encode(json.dumps(cursor, separators=(",", ":")).encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            position = cursor.get("p")
+            if position is not None:
+                cursor["p"] = [
+                    None if value is None else self._field_for(lookup).to_python(value)
+                    for (lookup, _, _), value in zip(self.keys, position)
+                ] + position[len(self.keys):]
+        except (TypeError, ValueError, AttributeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _field_for(self, lookup):
+        opts, field = self.model._meta, None
+        for part in lookup.split("__"):
+            field = opts.pk if part == "pk" else opts.get_field(part)
+            if field.is_relation:
+                target = field.target_field
+                opts = field.related_model._meta
+                if part == field.attname:
+                    field = target
+        return field
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor({"p": self._position(self.page[-1])})
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor({"p": self._position(self.page[0]), "r": 1})
+
+
+class PagedKeysetPagination(KeysetPagination):
+    """
+    KeysetPagination that pages every request, for append-only tables
+    (ledgers, move and activity logs) that are too big to list whole.
+    """
+
+    paginate_by_default = True
+
+
+class OffsetPagination(LimitOffsetPagination):
+    """
+    Explicit opt-out for viewsets that need `count` and `?limit=&offset=`.
+    Costs a COUNT(*) plus an OFFSET scan per page, so avoid it on big tables.
+    """
+
+    default_limit = 50
+    max_limit = 500
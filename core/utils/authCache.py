@@ -0,0 +1,138 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from core.utils.branchContext import resolve_user_branch
+
+DEFAULTS = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "TIMEOUT": 60,
+}
+
+# bumped on branch / group permission changes, which affect many users at once
+GLOBAL_VERSION_KEY = "authcache:version"
+
+# what a request reads off request.user and its branch; the password hash and
+# profile columns stay out of the cache and load on access like deferred fields
+USER_FIELDS = ("id", "username", "email", "is_active", "is_staff", "is_superuser", "user_type", "branch_id")
+BRANCH_FIELDS = ("id", "branch_id", "name", "is_main_branch", "active")
+# ModelBackend's permission caches, filled by user.get_all_permissions()
+PERM_CACHES = ("_user_perm_cache", "_group_perm_cache", "_perm_cache")
+
+
+def auth_cache_config():
+    return {**DEFAULTS, **(getattr(settings, "AUTH_CACHE", {}) or {})}
+
+
+def _cache():
+    return caches[auth_cache_config()["CACHE"]]
+
+
+def _user_version_key(user_id):
+    return f"authcache:user:{user_id}:version"
+
+
+def _versions(user_id):
+    """(global version, user version), created on first use."""
+    cache = _cache()
+    keys = [GLOBAL_VERSION_KEY, _user_version_key(user_id)]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return found[keys[0]], found[keys[1]]
+
+
+def _entry_key(user_id):
+    global_version, user_version = _versions(user_id)
+    return f"authcache:user:{user_id}:{user_version}:{global_version}"
+
+
+def _attnames(model, fields):
+    # in column order, as Model.from_db() expects the values of a partial row
+    return [field.attname for field in model._meta.concrete_fields if field.attname in fields]
+
+
+def _values(instance, fields):
+    return tuple(getattr(instance, attname) for attname in _attnames(type(instance), fields))
+
+
+def _instance(model, fields, values):
+    return model.from_db(model._default_manager.db, _attnames(model, fields), values)
+
+
+def user_entry(user):
+    """The plain-value cache entry of `user`: its USER_FIELDS, its branch's BRANCH_FIELDS and its permissions."""
+    branch = resolve_user_branch(user)
+    user.get_all_permissions()
+    return {
+        "user": _values(user, USER_FIELDS),
+        "branch": _values(branch, BRANCH_FIELDS) if branch is not None else None,
+        "perms": {name: sorted(getattr(user, name, ())) for name in PERM_CACHES},
+    }
+
+
+def user_from_entry(entry):
+    """A CustomUser with only USER_FIELDS loaded, its branch and permission caches set from `entry`."""
+    user_model = get_user_model()
+    user = _instance(user_model, USER_FIELDS, entry["user"])
+    branch_model = user_model._meta.get_field("branch").related_model
+    # None too: "no branch" is remembered (dangling branch ids would query every time)
+    user._state.fields_cache["branch"] = (
+        _instance(branch_model, BRANCH_FIELDS, entry["branch"]) if entry["branch"] is not None else None
+    )
+    for name, perms in entry["perms"].items():
+        setattr(user, name, set(perms))
+    return user
+
+
+def invalidate_user(user_id):
+    _cache().set(_user_version_key(user_id), uuid.uuid4().hex, None)
+
+
+def invalidate_all_users():
+    _cache().set(GLOBAL_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _after_commit(func, *args):
+    func(*args)
+    # and once more after commit, in case a request cached the old state meanwhile
+    transaction.on_commit(lambda: func(*args))
+
+
+def register_auth_cache_signals():
+    user_model = get_user_model()
+
+    def _user_changed(sender, instance, **kwargs):
+        _after_commit(invalidate_user, instance.pk)
+
+    def _all_changed(sender, **kwargs):
+        _after_commit(invalidate_all_users)
+
+    def _membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        if not action.startswith("post_"):
+            return
+        if not reverse:
+            _after_commit(invalidate_user, instance.pk)
+        elif pk_set:
+            for user_id in pk_set:
+                _after_commit(invalidate_user, user_id)
+        else:
+            # group.customuser_set.clear(): the users are unknown here
+            _after_commit(invalidate_all_users)
+
+    post_save.connect(_user_changed, sender=user_model, dispatch_uid="authcache_user_save")
+    post_delete.connect(_user_changed, sender=user_model, dispatch_uid="authcache_user_delete")
+    for label in ("master.Branch", "auth.Group"):
+        post_save.connect(_all_changed, sender=label, dispatch_uid=f"authcache_save_{label}")
+        post_delete.connect(_all_changed, sender=label, dispatch_uid=f"authcache_delete_{label}")
+    m2m_changed.connect(_membership_changed, sender=user_model.groups.through, dispatch_uid="authcache_user_groups")
+    m2m_changed.connect(_membership_changed, sender=user_model.user_permissions.through, dispatch_uid="authcache_user_perms")
+    m2m_changed.connect(_all_changed, sender=Group.permissions.through, dispatch_uid="authcache_group_perms")
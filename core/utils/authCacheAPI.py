@@ -0,0 +1,51 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.utils.authCache import _cache, _entry_key, auth_cache_config, user_entry, user_from_entry
+
+# The authentication class itself; the cache keys and the invalidation
+# signals live in core.utils.authCache, which CoreConfig.ready() imports
+# without pulling in DRF / simplejwt.
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps what a request needs of the user for a short
+    TTL (core.utils.authCache.USER_FIELDS, its branch and its permission
+    sets), so a warm request costs no auth query. The cache holds plain
+    values, never the pickled user or its password hash: a hit rebuilds a
+    minimal CustomUser, whose other columns load on access. Entries are keyed
+    by user id plus version tokens that saves of the user, its group /
+    permission assignments, branches and group permissions bump.
+    """
+
+    def get_user(self, validated_token):
+        if not auth_cache_config()["ENABLED"]:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        cache = _cache()
+        key = _entry_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user = super().get_user(validated_token)
+            entry = user_entry(user)
+            # the token's own digest of the hash, enough for the revoke check below
+            entry["password"] = get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None
+            cache.set(key, entry, auth_cache_config()["TIMEOUT"])
+            return user_from_entry(entry)
+
+        # same checks as the parent, against the cached row
+        user = user_from_entry(entry)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry["password"]:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+
+from django.core.exceptions import ObjectDoesNotExist
+
+
+@dataclass(frozen=True)
+class BranchContext:
+    branch: object = None
+    branch_id: object = None
+    is_main_branch: bool = False
+
+
+ANONYMOUS = BranchContext()
+
+
+def resolve_user_branch(user):
+    """
+    Returns the user's Branch, or None when the user has none or it points at
+    a deleted branch (CustomUser.branch has no DB constraint).
+    """
+    if getattr(user, "branch_id", None) is None:
+        return None
+    try:
+        return user.branch
+    except ObjectDoesNotExist:
+        return None
+
+
+def get_branch_context(request):
+    """
+    Resolves the user's branch once per request and caches it on the request,
+    so scoping, permissions and perform_create share it without re-querying.
+    """
+    target = getattr(request, "_request", request)
+    ctx = getattr(target, "_branch_context", None)
+    user = getattr(request, "user", None)
+    if ctx is not None and getattr(target, "_branch_context_user", None) is user:
+        return ctx
+
+    if user is None or not user.is_authenticated:
+        ctx = ANONYMOUS
+    else:
+        branch = resolve_user_branch(user)
+        ctx = BranchContext(
+            branch=branch,
+            branch_id=getattr(branch, "pk", None),
+            is_main_branch=bool(getattr(branch, "is_main_branch", False)),
+        )
+
+    target._branch_context = ctx
+    target._branch_context_user = user
+    return ctx
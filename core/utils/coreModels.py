@@ -1,9 +1,9 @@
 from django.db import models
 from django.conf import settings
-from simple_history.models import HistoricalRecords
 import uuid
 
 from master.models import Branch
+from core.utils.historyPolicy import PolicyHistoricalRecords
 
 
 class UUIDPk(models.Model):
@@ -26,7 +26,7 @@ class StampedOwnedActive(UUIDPk):
         related_query_name="%(app_label)s_%(class)s_created",
     )
     active = models.BooleanField(default=True)
-    history = HistoricalRecords(inherit=True)
+    history = PolicyHistoricalRecords(inherit=True)
     is_system_generated = models.BooleanField(default=False)
 
     class Meta:
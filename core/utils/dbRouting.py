@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# same as rest_framework.permissions.SAFE_METHODS; the router is loaded with
+# the settings, so it does not import DRF
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+DEFAULTS = {
+    "ALIAS": "replica",
+    "ENABLED": True,
+}
+
+
+def replica_config():
+    return {**DEFAULTS, **(getattr(settings, "DATABASE_REPLICA", {}) or {})}
+
+
+def replica_alias():
+    """The replica alias when one is configured and enabled, else None."""
+    config = replica_config()
+    if not config["ENABLED"] or config["ALIAS"] not in settings.DATABASES:
+        return None
+    return config["ALIAS"]
+
+
+class _RoutingState:
+    __slots__ = ("replica", "pinned")
+
+    def __init__(self, replica=False):
+        self.replica = replica
+        # set by the first write: later reads in the same scope must see it
+        self.pinned = False
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+@contextmanager
+def use_replica():
+    """
+    Send reads inside the block to the replica. The block falls back to the
+    primary for good as soon as it writes, and reads inside a transaction
+    always stay on the primary.
+    """
+    token = _state.set(_RoutingState(replica=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    token = _state.set(_RoutingState(replica=False))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def replica_reads(func):
+    """Decorator form of `use_replica()` for report / export services."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def reading_from_replica():
+    """The alias reads should use right now, or None for the primary."""
+    state = _state.get()
+    if state is None or not state.replica or state.pinned:
+        return None
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return replica_alias()
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica only inside `use_replica()` (ReplicaReadMixin
+    enters it for GET / HEAD / OPTIONS requests); everything else, writes
+    included, goes to `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        return reading_from_replica()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, replica_config()["ALIAS"]}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its schema from the primary
+        if db == replica_config()["ALIAS"]:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method requests from the replica: the request runs inside
+    `use_replica()`, and the main queryset is bound to the replica so
+    streamed exports, which are read after the view has returned, use it too.
+    Set `read_from_replica = False` on views that must read their own writes
+    from other requests straight away.
+    """
+
+    read_from_replica = True
+
+    def _replica_request(self, request):
+        return self.read_from_replica and request.method in SAFE_METHODS and replica_alias() is not None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self._replica_request(request):
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        alias = reading_from_replica()
+        return queryset.using(alias) if alias else queryset
@@ -0,0 +1,179 @@
+import uuid
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib.auth import get_permission_codename
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from core.utils.AsyncReadView import AsyncReadOnlyView, fan_out
+from core.utils.searchIndex import search_queryset
+
+
+@dataclass(frozen=True)
+class SearchType:
+    """One kind of hit of the global search: the model, its reference columns and what a hit shows."""
+
+    key: str
+    model: str
+    fields: tuple
+    # None: the value of the field that matched
+    title: str = None
+    subtitle: tuple = ()
+    # ids the frontend needs to open the hit besides its own (e.g. the parent shipment)
+    links: tuple = ()
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+
+# in display order; a type wins ties in ranking over the types after it
+SEARCH_TYPES = (
+    SearchType("shipment", "operations.Shipment", ("doc_ref_no",), "doc_ref_no", ("origin_port", "destination_port")),
+    SearchType("invoice", "sales.Sales", ("no", "reference", "po_number"), "no", ("reference", "status"), ("shipment_id",)),
+    SearchType(
+        "transport", "operations.ShipmentTransportInfo",
+        ("bill_of_lading", "tracking_no", "air_waybill_number", "ground_waybill_no"),
+        subtitle=("transport_mode", "leg_type"), links=("shipment_id",),
+    ),
+    SearchType(
+        "pickup", "pickup.PickupOrder", ("ref_no", "sender_phone", "receiver_phone"),
+        subtitle=("receiver_name", "destination", "status"),
+    ),
+    SearchType("contact", "crm.Contact", ("name", "legal_name", "code", "phone", "email"), "name", ("type", "phone", "email")),
+    SearchType("handling_unit", "warehouse.HandlingUnit", ("hu_code",), "hu_code", ("hu_type", "status"), ("shipment_id",)),
+)
+
+EXACT, PREFIX, CONTAINS = 3, 2, 1
+
+
+def rank_expression(fields, term):
+    """
+    Score of a row: an exact match beats a prefix match beats a substring
+    match, and within a tier the earlier field wins (tier * 100 - position).
+    """
+    whens = []
+    for tier, lookup in ((EXACT, "iexact"), (PREFIX, "istartswith")):
+        for position, name in enumerate(fields):
+            whens.append(When(**{f"{name}__{lookup}": term}, then=Value(tier * 100 - position)))
+    return Case(*whens, default=Value(CONTAINS * 100), output_field=IntegerField())
+
+
+def _matched_field(row, fields, term):
+    needle = term.casefold()
+    for name in fields:
+        value = row.get(name)
+        if value is not None and needle in str(value).casefold():
+            return name
+    return fields[0]
+
+
+def search_type(search, queryset, term, limit):
+    """
+    The `limit` best hits of one type in `queryset` (already branch scoped),
+    plus whether there are more. The candidate rows come from the search
+    index when it can answer the term, else from the icontains query.
+    """
+    matched = search_queryset(queryset, [term], search.fields)
+    if matched is None:
+        q = Q()
+        for name in search.fields:
+            q |= Q(**{f"{name}__icontains": term})
+        matched = queryset.filter(q)
+
+    columns = dict.fromkeys(
+        ("pk", "branch_id", "created", *search.fields, search.title or search.fields[0], *search.subtitle, *search.links)
+    )
+    rows = list(
+        matched.annotate(_rank=rank_expression(search.fields, term))
+        .order_by("-_rank", "-created", "-pk")
+        .values("_rank", *columns)[: limit + 1]
+    )
+    hits = []
+    for row in rows[:limit]:
+        matched_field = _matched_field(row, search.fields, term)
+        hit = {
+            "type": search.key,
+            "id": row["pk"],
+            "title": row[search.title or matched_field],
+            "subtitle": " · ".join(str(row[name]) for name in search.subtitle if row[name] not in (None, "")),
+            "matched_field": matched_field,
+            "score": row["_rank"],
+            "branch": row["branch_id"],
+            "created": row["created"],
+        }
+        hit.update({name: row[name] for name in search.links})
+        hits.append(hit)
+    return {"hits": hits, "has_more": len(rows) > limit}
+
+
+class GlobalSearchView(AsyncReadOnlyView):
+    """
+    GET /core/search/?q=<term>: shipments, invoices, transport documents,
+    pickup orders, contacts and handling units whose reference contains the
+    term, in one ranked list. One query per type, fanned out concurrently
+    (one after another on SQLite).
+
+    Params: `types` (comma separated keys, default all), `limit` (hits per
+    type) and `<type>_limit` to override it for one type; main-branch users
+    may narrow to one branch with `branch`. A type is only searched for
+    users with the view permission on its model.
+    """
+
+    default_limit = 5
+    max_limit = 25
+
+    def _limit(self, request, key):
+        raw = request.GET.get(f"{key}_limit", request.GET.get("limit"))
+        try:
+            return max(1, min(int(raw), self.max_limit)) if raw is not None else self.default_limit
+        except ValueError:
+            return self.default_limit
+
+    @staticmethod
+    def viewable(user, types):
+        def can_view(search):
+            opts = search.get_model()._meta
+            return user.has_perm(f"{opts.app_label}.{get_permission_codename('view', opts)}")
+
+        return [search for search in types if can_view(search)]
+
+    def scope(self, queryset):
+        queryset = super().scope(queryset)
+        branch = self.request.GET.get("branch")
+        if branch and self.branch_context.is_main_branch:
+            try:
+                queryset = queryset.filter(branch_id=uuid.UUID(branch))
+            except ValueError:
+                queryset = queryset.none()
+        return queryset
+
+    async def aget_data(self, request):
+        term = request.GET.get("q", "").strip()
+        keys = [key for key in request.GET.get("types", "").split(",") if key]
+        types = [search for search in SEARCH_TYPES if not keys or search.key in keys]
+        types = await sync_to_async(self.viewable)(request.user, types)
+        if not term or not types:
+            return {"query": term, "results": [], "types": {}}
+
+        def task(search):
+            queryset = self.scope(search.get_model()._default_manager.all())
+            return lambda: search_type(search, queryset, term, self._limit(request, search.key))
+
+        tasks = {search.key: task(search) for search in types}
+        if connections[SEARCH_TYPES[0].get_model()._default_manager.db].vendor == "sqlite":
+            # a connection per thread costs more than these short indexed reads
+            found = await sync_to_async(lambda: {key: func() for key, func in tasks.items()})()
+        else:
+            found = await fan_out(**tasks)
+        order = {search.key: position for position, search in enumerate(SEARCH_TYPES)}
+        results = sorted(
+            (hit for result in found.values() for hit in result["hits"]),
+            key=lambda hit: (-hit["score"], order[hit["type"]]),
+        )
+        return {
+            "query": term,
+            "results": results,
+            "types": {key: {"count": len(result["hits"]), "has_more": result["has_more"]} for key, result in found.items()},
+        }
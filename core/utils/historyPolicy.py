@@ -0,0 +1,215 @@
+import json
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from simple_history.models import HistoricalRecords
+from simple_history.signals import post_create_historical_record, pre_create_historical_record
+
+DEFAULTS = {
+    # buffer the history rows of a history_batch() block and insert them in bulk when it exits
+    "BATCH": True,
+    "BATCH_SIZE": 500,
+    "ARCHIVE_AFTER_DAYS": 365,
+    "ARCHIVE_CHUNK_SIZE": 1000,
+}
+
+
+def history_policy_config():
+    return {**DEFAULTS, **(getattr(settings, "HISTORY_POLICY", {}) or {})}
+
+
+def records_history(instance, update_fields=None):
+    """
+    Whether a save is worth a history row. Models may declare
+    `history_tracked_fields`: a `save(update_fields=[...])` touching none of
+    them (recomputed totals, paid amounts, ...) is not recorded. Creates,
+    deletes and full saves always are, and the next recorded row carries the
+    current values of the untracked fields anyway.
+    """
+    tracked = getattr(type(instance), "history_tracked_fields", None)
+    if tracked is None or update_fields is None:
+        return True
+    return not set(tracked).isdisjoint(update_fields)
+
+
+class _HistoryBatch:
+    """History rows buffered by one history_batch() block on one database."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.records = []
+
+    def add(self, history_instance, signal_kwargs):
+        self.records.append((history_instance, signal_kwargs))
+        if len(self.records) >= history_policy_config()["BATCH_SIZE"]:
+            self.flush()
+
+    def flush(self):
+        records, self.records = self.records, []
+        by_model = {}
+        for history_instance, _ in records:
+            by_model.setdefault(type(history_instance), []).append(history_instance)
+
+        batch_size = history_policy_config()["BATCH_SIZE"]
+        for model, rows in by_model.items():
+            model._default_manager.using(self.alias).bulk_create(rows, batch_size=batch_size)
+
+        for history_instance, signal_kwargs in records:
+            post_create_historical_record.send(
+                sender=type(history_instance), history_instance=history_instance, **signal_kwargs
+            )
+
+
+# {alias: batch} of the innermost history_batch() block
+_batches = ContextVar("history_batches", default=None)
+
+
+@contextmanager
+def history_batch(using=None):
+    """
+    An atomic block whose saves buffer their history rows and insert them
+    with one bulk_create per history table when the block exits (or every
+    BATCH_SIZE rows), inside the block's transaction: when the block or an
+    enclosing one rolls back, the history goes with it.
+
+    A nested history_batch() has its own buffer and savepoint. A plain
+    atomic block inside the batch whose error is caught without leaving the
+    batch would keep its rows in the buffer; use a nested history_batch()
+    there instead.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    if not history_policy_config()["BATCH"]:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    batch = _HistoryBatch(using)
+    with transaction.atomic(using=using):
+        token = _batches.set({**(_batches.get() or {}), using: batch})
+        try:
+            yield batch
+        finally:
+            _batches.reset(token)
+        # saves made by post_create_historical_record receivers go to the enclosing batch
+        batch.flush()
+
+
+def _current_batch(alias):
+    return (_batches.get() or {}).get(alias)
+
+
+class PolicyHistoricalRecords(HistoricalRecords):
+    """
+    HistoricalRecords honouring `history_tracked_fields` and, inside a
+    history_batch() block, inserting the rows with one `bulk_create` per
+    history table when the block exits instead of one INSERT per save.
+    Elsewhere, and for histories with m2m fields, rows are written right
+    away as usual. `pre_create_historical_record` fires when the row is
+    built, `post_create_historical_record` once it is stored.
+    """
+
+    def post_save(self, instance, created, using=None, update_fields=None, **kwargs):
+        if not created and not records_history(instance, update_fields):
+            return
+        super().post_save(instance, created, using=using, update_fields=update_fields, **kwargs)
+
+    def create_historical_record(self, instance, history_type, using=None):
+        manager = getattr(instance, self.manager_name)
+        if manager.model._history_m2m_fields:
+            return super().create_historical_record(instance, history_type, using)
+
+        using = using if self.use_base_model_db else None
+        batch = _current_batch(using or router.db_for_write(manager.model, instance=instance))
+        if batch is None:
+            return super().create_historical_record(instance, history_type, using)
+
+        history_date = getattr(instance, "_history_date", timezone.now())
+        history_user = self.get_history_user(instance)
+        history_change_reason = self.get_change_reason_for_object(instance, history_type, using)
+
+        attrs = {field.attname: getattr(instance, field.attname) for field in self.fields_included(instance)}
+        if getattr(manager.model, "history_relation", None) is not None:
+            attrs["history_relation"] = instance
+
+        history_instance = manager.model(
+            history_date=history_date,
+            history_type=history_type,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            **attrs,
+        )
+        signal_kwargs = {
+            "instance": instance,
+            "history_date": history_date,
+            "history_user": history_user,
+            "history_change_reason": history_change_reason,
+            "using": using,
+        }
+        pre_create_historical_record.send(sender=manager.model, history_instance=history_instance, **signal_kwargs)
+        batch.add(history_instance, signal_kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Archiving
+# ---------------------------------------------------------------------------
+
+def history_models(labels=None):
+    """[(model, history model)] for every model with simple_history, optionally filtered by label."""
+    out = []
+    for model in apps.get_models():
+        manager_name = getattr(model._meta, "simple_history_manager_attribute", None)
+        if not manager_name or (labels and model._meta.label not in labels):
+            continue
+        out.append((model, getattr(model, manager_name).model))
+    return out
+
+
+def archivable(model, history_model, cutoff):
+    """
+    History rows older than `cutoff` that a newer row of the same object
+    supersedes. The latest row of each object stays in place, so `.history`
+    and `most_recent()` keep working for everything that still exists.
+    """
+    pk_name = model._meta.pk.attname
+    newer = history_model._default_manager.filter(
+        **{pk_name: OuterRef(pk_name)}, history_date__gt=OuterRef("history_date")
+    )
+    return history_model._default_manager.filter(history_date__lt=cutoff).filter(Exists(newer))
+
+
+def archive_chunk(model, history_model, cutoff, chunk_size=None):
+    """
+    Move one chunk of archivable rows into a compressed HistoryArchive row.
+    Returns the number of rows moved (0 when there is nothing left).
+    """
+    from core.models import HistoryArchive
+
+    chunk_size = chunk_size or history_policy_config()["ARCHIVE_CHUNK_SIZE"]
+    manager = history_model._default_manager
+    with transaction.atomic():
+        ids = list(archivable(model, history_model, cutoff).order_by("history_date", "pk").values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return 0
+        rows = list(manager.filter(pk__in=ids).order_by("history_date", "pk").values())
+        HistoryArchive.objects.create(
+            model=history_model._meta.label,
+            from_date=rows[0]["history_date"],
+            to_date=rows[-1]["history_date"],
+            row_count=len(rows),
+            data=zlib.compress(json.dumps(rows, cls=DjangoJSONEncoder).encode("utf-8"), 9),
+        )
+        manager.filter(pk__in=ids).delete()
+    return len(rows)
+
+
+def archive_cutoff(days=None):
+    days = history_policy_config()["ARCHIVE_AFTER_DAYS"] if days is None else days
+    return timezone.now() - timedelta(days=days)
@@ -0,0 +1,318 @@
+import datetime
+import decimal
+import re
+import uuid
+from dataclasses import dataclass, field
+
+from django.db import connections, models
+from django.urls import URLPattern, URLResolver, get_resolver
+from django_filters import filters as df_filters
+
+from core.utils.KeysetPagination import KeysetPagination
+from core.utils.modelCapabilities import get_model_capabilities
+
+RANGE_LOOKUPS = {"gt", "gte", "lt", "lte", "range"}
+EQUALITY_LOOKUPS = {"exact", "in", "isnull"}
+RANGE_FILTERS = (df_filters.RangeFilter, df_filters.DateRangeFilter, df_filters.DateFromToRangeFilter, df_filters.DateTimeFromToRangeFilter)
+
+# SQLite: "SCAN shipment" is a full scan, "SEARCH ... USING INDEX" is not;
+# PostgreSQL: "Seq Scan" and a "Sort" node above the scan.
+_FULL_SCAN = re.compile(r"\bSCAN\b(?!.*\bUSING\b.*\bINDEX\b)|Seq Scan")
+_SORT = re.compile(r"USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY|\bSort\b(?! Key)|Sort Key")
+
+
+@dataclass
+class Shape:
+    """A representative list query of a viewset: equality / range predicates and an ordering."""
+
+    label: str
+    equal: tuple = ()
+    ranged: tuple = ()
+    ordering: tuple = ()
+    # filter shapes: the filtered column; the page is then sorted in memory, which is fine
+    column: str = None
+    # paged filter shapes: the filtered column, whose rows are read in list order
+    grouped: str = None
+    plan: str = ""
+
+    @property
+    def full_scan(self):
+        return bool(_FULL_SCAN.search(self.plan))
+
+    @property
+    def sort(self):
+        return bool(_SORT.search(self.plan))
+
+
+@dataclass
+class Proposal:
+    model: type
+    fields: tuple
+    reasons: list = field(default_factory=list)
+
+    @property
+    def index(self):
+        return models.Index(fields=list(self.fields))
+
+    def meta(self):
+        return f"models.Index(fields={list(self.fields)!r})"
+
+
+@dataclass
+class ViewsetReport:
+    viewset: type
+    model: type
+    rows: int = 0
+    shapes: list = field(default_factory=list)
+    text_search: list = field(default_factory=list)
+    low_cardinality: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+
+
+def iter_viewsets(urlconf=None):
+    """Every DRF view class routed in the URLconf, once, in URL order."""
+    seen = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern):
+                cls = getattr(pattern.callback, "cls", None)
+                if cls is not None and cls not in seen and getattr(cls, "queryset", None) is not None:
+                    seen.add(cls)
+                    yield cls
+
+    yield from walk(get_resolver(urlconf).url_patterns)
+
+
+def _local_field(model, name):
+    """The model's own concrete field for a filter / ordering name, or None (joins, methods)."""
+    if not name or "__" in name:
+        return None
+    try:
+        f = model._meta.pk if name == "pk" else model._meta.get_field(name)
+    except Exception:
+        return None
+    return f if f.concrete and not f.many_to_many else None
+
+
+def existing_indexes(model):
+    """Column tuples the table is already indexed on (B-tree prefix candidates)."""
+    opts = model._meta
+    indexes = [(opts.pk.column,)]
+    for f in opts.local_concrete_fields:
+        if f.db_index or f.unique:
+            indexes.append((f.column,))
+    for index in opts.indexes:
+        if not index.condition and index.fields:
+            indexes.append(tuple(opts.get_field(name.lstrip("-")).column for name in index.fields))
+    for constraint in opts.constraints:
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields and not constraint.condition:
+            indexes.append(tuple(opts.get_field(name).column for name in constraint.fields))
+    for together in opts.unique_together:
+        indexes.append(tuple(opts.get_field(name).column for name in together))
+    return indexes
+
+
+def is_covered(model, fields, indexes=None):
+    """True if an existing index starts with these fields, in this order."""
+    columns = tuple(model._meta.get_field(name).column for name in fields)
+    return any(index[: len(columns)] == columns for index in (indexes or existing_indexes(model)))
+
+
+def _is_branch_scoped(viewset, model):
+    from core.utils.BaseModelViewSet import BranchScopedMixin
+
+    return issubclass(viewset, BranchScopedMixin) and get_model_capabilities(model).has_branch
+
+
+def _list_ordering(viewset, model):
+    """The ordering of the default list request, including the pk tail keyset pagination adds."""
+    queryset = viewset.queryset.all()
+    if issubclass(getattr(viewset, "pagination_class", None) or object, KeysetPagination):
+        paginator = KeysetPagination()
+        paginator.model = model
+        paginator.keys = paginator.get_keys(queryset, viewset)
+        return tuple(key for key, _, _ in paginator.keys)
+    ordering = getattr(viewset, "ordering", None) or model._meta.ordering or []
+    return tuple(ordering if not isinstance(ordering, str) else [ordering])
+
+
+def _pages_every_request(viewset):
+    return getattr(getattr(viewset, "pagination_class", None), "paginate_by_default", False)
+
+
+def _filters(viewset, model):
+    """(name, lookup kind) for each filterset filter on one of the model's own columns."""
+    filterset_class = getattr(viewset, "filterset_class", None)
+    found = []
+    if filterset_class is not None:
+        for name, flt in filterset_class.base_filters.items():
+            if flt.method is not None:
+                found.append((name, "method"))
+            elif isinstance(flt, RANGE_FILTERS) or flt.lookup_expr in RANGE_LOOKUPS:
+                found.append((flt.field_name, "range"))
+            elif flt.lookup_expr in EQUALITY_LOOKUPS:
+                found.append((flt.field_name, "equal"))
+            else:
+                found.append((flt.field_name, "text"))
+    for name in getattr(viewset, "filterset_fields", None) or []:
+        found.append((name, "equal"))
+    return found
+
+
+def collect_shapes(viewset):
+    """The queries the viewset's list endpoint issues: default listing and one per filter column."""
+    model = viewset.queryset.model
+    report = ViewsetReport(viewset=viewset, model=model)
+    ordering = []
+    for term in _list_ordering(viewset, model):
+        f = _local_field(model, term.lstrip("-"))
+        if f is None:
+            # an index can only serve the ordering up to the first joined column
+            break
+        ordering.append(f.name)
+    ordering = tuple(ordering)
+    filters = _filters(viewset, model)
+    scoped = _is_branch_scoped(viewset, model)
+    paged = _pages_every_request(viewset)
+
+    if scoped:
+        report.shapes.append(Shape("list (own branch)", equal=("branch",), ordering=ordering))
+    elif ("branch", "equal") in filters:
+        # unscoped views filtered by ?branch= issue the same query
+        report.shapes.append(Shape("list (?branch=)", equal=("branch",), ordering=ordering))
+    report.shapes.append(Shape("list (main branch)" if scoped else "list", ordering=ordering))
+
+    seen = {"branch"}
+    for name, kind in filters:
+        f = _local_field(model, name)
+        if kind == "method" or f is None:
+            report.skipped.append(name)
+            continue
+        if kind == "text":
+            report.text_search.append(f.name)
+            continue
+        if f.name in seen:
+            continue
+        seen.add(f.name)
+        if isinstance(f, models.BooleanField) or f.choices:
+            report.low_cardinality.append(f.name)
+            continue
+        equal, ranged = ((f.name,), ()) if kind == "equal" else ((), (f.name,))
+        if scoped:
+            equal = ("branch",) + equal
+        if paged and kind == "equal":
+            # every page of ?<column>= is read in list order, so the index has to give that order too
+            report.shapes.append(Shape(f"filter {f.name} (paged)", equal=equal, ordering=ordering, grouped=f.name))
+            continue
+        report.shapes.append(Shape(f"filter {f.name}", equal=equal, ranged=ranged, ordering=ordering, column=f.name))
+
+    report.text_search.extend(name.lstrip("^=@$") for name in getattr(viewset, "search_fields", None) or [])
+    return report
+
+
+def _sample(model, f):
+    """A real value of the column when there is one, else a placeholder of its type."""
+    value = model._default_manager.exclude(**{f"{f.attname}__isnull": True}).values_list(f.attname, flat=True).first()
+    if value is not None:
+        return value
+    target = f.target_field if f.is_relation else f
+    if isinstance(target, (models.UUIDField,)):
+        return uuid.uuid4()
+    if isinstance(target, models.DateTimeField):
+        return datetime.datetime.now(datetime.timezone.utc)
+    if isinstance(target, models.DateField):
+        return datetime.date.today()
+    if isinstance(target, models.DecimalField):
+        return decimal.Decimal(0)
+    if isinstance(target, (models.IntegerField, models.AutoField)):
+        return 0
+    return "x"
+
+
+def explain(shape, model, using="default", page_size=KeysetPagination.page_size):
+    queryset = model._default_manager.using(using).all()
+    for name in shape.equal:
+        f = model._meta.get_field(name)
+        queryset = queryset.filter(**{f.attname: _sample(model, f)})
+    for name in shape.ranged:
+        f = model._meta.get_field(name)
+        queryset = queryset.filter(**{f"{f.attname}__gte": _sample(model, f)})
+    if shape.ordering:
+        queryset = queryset.order_by(*(f"-{name}" for name in shape.ordering))
+    shape.plan = queryset[: page_size + 1].explain()
+    return shape
+
+
+def _wanted(model, shape):
+    """Index for a shape: the filtered column, or the scope columns followed by the list ordering."""
+    if shape.column:
+        return (shape.column,)
+    fields = list(shape.equal) + [name for name in shape.ordering if name not in shape.equal]
+    return () if fields == [model._meta.pk.name] else tuple(fields)
+
+
+def _rows_per_value(model, name, using="default"):
+    f = model._meta.get_field(name)
+    manager = model._default_manager.using(using)
+    values = manager.exclude(**{f"{f.attname}__isnull": True}).values(f.attname).distinct().count()
+    return manager.count() / max(values, 1)
+
+
+def _needs_index(shape, run_explain):
+    if not run_explain:
+        return True
+    # a filter served by any index is fine; the default list must also come out in order
+    return shape.full_scan if shape.column else shape.full_scan or shape.sort
+
+
+def advise(viewsets=None, using="default", run_explain=True, min_rows=1000):
+    """
+    Return ([ViewsetReport], [Proposal]). An index is proposed when the
+    default list query scans or sorts the table (so does an equality filter
+    on a view that pages every request, once its values average more than a
+    page of rows), or another filter query scans it, no existing index starts
+    with the shape's columns and the table has at least `min_rows` rows
+    (sorting a small table beats maintaining an index).
+    """
+    reports, proposals = [], {}
+    for viewset in viewsets or iter_viewsets():
+        report = collect_shapes(viewset)
+        model = report.model
+        report.rows = model._default_manager.using(using).count()
+        indexes = existing_indexes(model)
+        for shape in report.shapes:
+            if run_explain:
+                explain(shape, model, using=using)
+            wanted = _wanted(model, shape)
+            if not wanted or is_covered(model, wanted, indexes) or report.rows < min_rows:
+                continue
+            if not _needs_index(shape, run_explain):
+                continue
+            if shape.grouped and _rows_per_value(model, shape.grouped, using) <= KeysetPagination.page_size:
+                # a value's rows mostly fit on one page: sorting them is cheap
+                continue
+            proposal = proposals.setdefault((model, wanted), Proposal(model, wanted))
+            proposal.reasons.append(f"{viewset.__name__}: {shape.label}")
+        reports.append(report)
+
+    # (branch, created, id) also serves the (branch, created) and (branch,) shapes
+    ordered = sorted(proposals.values(), key=lambda p: (p.model._meta.label, -len(p.fields)))
+    kept = []
+    for proposal in ordered:
+        wider = next((k for k in kept if k.model is proposal.model and k.fields[: len(proposal.fields)] == proposal.fields), None)
+        if wider is not None:
+            wider.reasons.extend(proposal.reasons)
+        else:
+            kept.append(proposal)
+    return reports, kept
+
+
+def create_index_sql(proposal, using="default"):
+    connection = connections[using]
+    index = proposal.index
+    index.set_name_with_model(proposal.model)
+    with connection.schema_editor(collect_sql=True) as editor:
+        return str(index.create_sql(proposal.model, editor)) + ";"
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    has_branch: bool = False
+    has_is_system_generated: bool = False
+    has_active: bool = False
+    # auto_now timestamp ("updated" on StampedOwnedActive, "updated_at" in master)
+    updated_field: Optional[str] = None
+
+
+_registry = {}
+
+
+def _concrete(model, name):
+    try:
+        return model._meta.get_field(name).concrete
+    except FieldDoesNotExist:
+        return False
+
+
+def _updated_field(model):
+    for name in ("updated", "updated_at"):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.concrete and getattr(field, "auto_now", False):
+            return name
+    return None
+
+
+def _inspect(model):
+    return ModelCapabilities(
+        has_branch=_concrete(model, "branch"),
+        has_is_system_generated=_concrete(model, "is_system_generated"),
+        has_active=_concrete(model, "active"),
+        updated_field=_updated_field(model),
+    )
+
+
+def build_model_registry():
+    """
+    Inspect every installed model once (called from CoreConfig.ready()) so
+    request-time code never has to walk `_meta.get_fields()`.
+    """
+    _registry.clear()
+    for model in apps.get_models():
+        _registry[model] = _inspect(model)
+
+
+def get_model_capabilities(model):
+    """
+    Returns the ModelCapabilities of a model class (or instance).
+    """
+    if not isinstance(model, type):
+        model = type(model)
+    caps = _registry.get(model)
+    if caps is None:
+        # models created after startup (tests, dynamic models)
+        caps = _registry[model] = _inspect(model)
+    return caps
@@ -0,0 +1,176 @@
+import logging
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.utils.historyPolicy import history_batch
+
+logger = logging.getLogger("core.outbox")
+
+DEFAULTS = {
+    "INLINE": True,
+    "THREADS": 4,
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 8,
+    "BACKOFF_SECONDS": 5,
+    "MAX_BACKOFF_SECONDS": 3600,
+    "LEASE_SECONDS": 300,
+    "RETAIN_DAYS": 7,
+}
+
+_handlers = {}
+
+
+def outbox_config():
+    return {**DEFAULTS, **(getattr(settings, "OUTBOX", {}) or {})}
+
+
+def outbox_handler(topic):
+    """
+    Register the function that processes `topic`. It receives the event
+    payload and runs in the same transaction that marks the event done, so
+    anything it writes is committed exactly once; it should also tolerate the
+    referenced rows having changed or disappeared since the event was written.
+    """
+
+    def decorator(func):
+        _handlers[topic] = func
+        return func
+
+    return decorator
+
+
+def enqueue(topic, payload=None, key=None):
+    """
+    Record follow-up work in the current transaction. With a `key`, nothing is
+    written while an event with the same key is still pending (the handler
+    reads current state, so one run covers both saves).
+    Returns the new OutboxEvent, or None when it was coalesced.
+    """
+    from core.models import OutboxEvent
+
+    if key and OutboxEvent.objects.filter(key=key, status=OutboxEvent.Status.PENDING).exists():
+        return None
+
+    event = OutboxEvent.objects.create(topic=topic, payload=payload or {}, key=key)
+    if outbox_config()["INLINE"]:
+        # no worker needed: run it right after the commit (the worker retries it if it fails)
+        transaction.on_commit(lambda: process_events(claim(ids=[event.pk])))
+    return event
+
+
+def claim(batch_size=None, ids=None):
+    """
+    Lease up to `batch_size` due events (pending, or processing with an
+    expired lease from a worker that died) with a single UPDATE, so several
+    workers can poll the table without handing out the same event twice.
+    """
+    from core.models import OutboxEvent
+
+    config = outbox_config()
+    now = timezone.now()
+    due = Q(status=OutboxEvent.Status.PENDING, available_at__lte=now) | Q(
+        status=OutboxEvent.Status.PROCESSING, locked_at__lt=now - timedelta(seconds=config["LEASE_SECONDS"])
+    )
+
+    candidates = OutboxEvent.objects.filter(due)
+    if ids is not None:
+        candidates = candidates.filter(pk__in=ids)
+    candidates = list(candidates.order_by("id").values_list("pk", flat=True)[: batch_size or config["BATCH_SIZE"]])
+    if not candidates:
+        return []
+
+    token = uuid.uuid4().hex
+    OutboxEvent.objects.filter(due, pk__in=candidates).update(
+        status=OutboxEvent.Status.PROCESSING,
+        locked_at=now,
+        locked_by=token,
+        attempts=F("attempts") + 1,
+    )
+    return list(OutboxEvent.objects.filter(locked_by=token, status=OutboxEvent.Status.PROCESSING).order_by("id"))
+
+
+class _LeaseLost(Exception):
+    pass
+
+
+def backoff(attempts):
+    config = outbox_config()
+    return min(config["BACKOFF_SECONDS"] * (2 ** max(attempts - 1, 0)), config["MAX_BACKOFF_SECONDS"])
+
+
+def process_event(event):
+    """Run the handler for one claimed event. Returns True when it succeeded."""
+    from core.models import OutboxEvent
+
+    mine = OutboxEvent.objects.filter(pk=event.pk, locked_by=event.locked_by, status=OutboxEvent.Status.PROCESSING)
+    try:
+        handler = _handlers.get(event.topic)
+        if handler is None:
+            raise LookupError(f"No outbox handler registered for {event.topic!r}")
+        with history_batch():
+            handler(event.payload)
+            # the lease may have expired and been taken over by another worker
+            if not mine.update(status=OutboxEvent.Status.DONE, processed_at=timezone.now(), last_error="", locked_at=None):
+                raise _LeaseLost()
+    except _LeaseLost:
+        logger.warning("Outbox event %s (%s) lost its lease; handler rolled back", event.pk, event.topic)
+        return False
+    except Exception:
+        config = outbox_config()
+        failed = event.attempts >= config["MAX_ATTEMPTS"]
+        logger.exception("Outbox event %s (%s) failed on attempt %s", event.pk, event.topic, event.attempts)
+        mine.update(
+            status=OutboxEvent.Status.FAILED if failed else OutboxEvent.Status.PENDING,
+            available_at=timezone.now() + timedelta(seconds=backoff(event.attempts)),
+            last_error=traceback.format_exc()[-4000:],
+            locked_at=None,
+            locked_by=None,
+        )
+        return False
+    return True
+
+
+def _process_in_thread(event):
+    try:
+        return process_event(event)
+    finally:
+        # worker threads own their connections
+        connections.close_all()
+
+
+def process_events(events, threads=1):
+    if not events:
+        return 0, 0
+    if threads <= 1 or len(events) == 1:
+        results = [process_event(event) for event in events]
+    else:
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="outbox") as pool:
+            results = list(pool.map(_process_in_thread, events))
+    succeeded = sum(1 for ok in results if ok)
+    return succeeded, len(results) - succeeded
+
+
+def drain(batch_size=None, threads=None):
+    """Claim and process one batch. Returns (succeeded, failed)."""
+    config = outbox_config()
+    threads = threads or config["THREADS"]
+    if connections["default"].vendor == "sqlite":
+        # a single writer at a time; parallel handlers only trade places on the file lock
+        threads = 1
+    return process_events(claim(batch_size=batch_size), threads=threads)
+
+
+def purge_processed(days=None):
+    from core.models import OutboxEvent
+
+    days = outbox_config()["RETAIN_DAYS"] if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboxEvent.objects.filter(status=OutboxEvent.Status.DONE, processed_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,161 @@
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+# Small, rarely edited tables that almost every transactional request reads.
+REFERENCE_MODELS = [
+    "accounting.Currency",
+    "accounting.PaymentMethod",
+    "master.UnitofMeasurement",
+    "master.UnitofMeasurementLength",
+    "master.Ports",
+    "master.MasterData",
+    "master.ShipmentPrefixes",
+    "master.ApplicationSettings",
+]
+
+# other tables a reference table's cached responses read (PortsViewSet joins
+# nearest_branch): their saves and deletes invalidate it too
+REFERENCE_DEPENDENCIES = {
+    "master.Ports": ["master.Branch"],
+}
+
+DEFAULTS = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "TIMEOUT": 300,
+}
+
+
+def reference_cache_config():
+    return {**DEFAULTS, **(getattr(settings, "REFERENCE_CACHE", {}) or {})}
+
+
+def _cache():
+    return caches[reference_cache_config()["CACHE"]]
+
+
+def _label(model):
+    if not isinstance(model, type):
+        model = type(model)
+    return model._meta.label
+
+
+def is_reference_model(model):
+    return reference_cache_config()["ENABLED"] and _label(model) in REFERENCE_MODELS
+
+
+def _version(label):
+    """
+    Current version token of a table. Every cached value of the table is
+    stored under it, so bumping the token invalidates them all at once.
+    """
+    cache = _cache()
+    key = f"refcache:{label}:version"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_reference(model):
+    _cache().set(f"refcache:{_label(model)}:version", uuid.uuid4().hex, None)
+
+
+def invalidate_all_references():
+    for label in REFERENCE_MODELS:
+        invalidate_reference(apps.get_model(label))
+
+
+# {label: (version, rows)} so repeated lookups only pay for the version check
+_local = {}
+
+
+def _columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _rows(model):
+    """
+    {pk: column values} snapshot of the whole table, read through the cache.
+    Only plain tuples are shared (between requests and threads); every
+    lookup builds its own instance from them.
+    """
+    label = _label(model)
+    version = _version(label)
+    local = _local.get(label)
+    if local is not None and local[0] == version:
+        return local[1]
+
+    cache = _cache()
+    key = f"refcache:{label}:{version}:rows"
+    rows = cache.get(key)
+    if rows is None:
+        model = apps.get_model(label)
+        pk_index = _columns(model).index(model._meta.pk.attname)
+        rows = {values[pk_index]: values for values in model._default_manager.order_by("pk").values_list(*_columns(model))}
+        cache.set(key, rows, reference_cache_config()["TIMEOUT"])
+    _local[label] = (version, rows)
+    return rows
+
+
+def _instance(model, values):
+    return model.from_db(model._default_manager.db, _columns(model), values)
+
+
+def get_reference(model, pk):
+    """
+    Cached equivalent of `model.objects.get(pk=pk)` for reference tables
+    (raises `model.DoesNotExist` the same way). Other models hit the DB.
+    Each call returns a new instance, so callers may modify it.
+    """
+    if not is_reference_model(model):
+        return model._default_manager.get(pk=pk)
+    values = _rows(model).get(model._meta.pk.to_python(pk))
+    if values is None:
+        # the snapshot may predate the row: another worker's cache (LocMem) never heard of its save
+        obj = model._default_manager.filter(pk=pk).first()
+        if obj is None:
+            raise model.DoesNotExist(f"{model._meta.object_name} matching query does not exist.")
+        invalidate_reference(model)
+        return obj
+    return _instance(model, values)
+
+
+def get_reference_list(model):
+    if not is_reference_model(model):
+        return list(model._default_manager.order_by("pk"))
+    return [_instance(model, values) for values in _rows(model).values()]
+
+
+def get_reference_singleton(model):
+    """The single row of ApplicationSettings / ShipmentPrefixes, or None."""
+    rows = get_reference_list(model)
+    return rows[0] if rows else None
+
+
+def register_reference_cache_signals():
+    def _invalidate(sender, **kwargs):
+        invalidate_reference(sender)
+        # and once more after commit, in case a reader cached the old rows meanwhile
+        transaction.on_commit(lambda: invalidate_reference(sender))
+
+    for label in REFERENCE_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_invalidate, sender=model, dispatch_uid=f"refcache_postsave_{label}")
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=f"refcache_postdelete_{label}")
+
+    def _dependency_changed(sender, **kwargs):
+        for label, dependencies in REFERENCE_DEPENDENCIES.items():
+            if sender._meta.label in dependencies:
+                _invalidate(apps.get_model(label))
+
+    for label in {dependency for dependencies in REFERENCE_DEPENDENCIES.values() for dependency in dependencies}:
+        model = apps.get_model(label)
+        post_save.connect(_dependency_changed, sender=model, dispatch_uid=f"refcache_dep_postsave_{label}")
+        post_delete.connect(_dependency_changed, sender=model, dispatch_uid=f"refcache_dep_postdelete_{label}")
@@ -0,0 +1,70 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from core.utils.branchContext import get_branch_context
+from core.utils.modelCapabilities import get_model_capabilities
+from core.utils.referenceCache import _cache, _label, _version, get_reference, is_reference_model, reference_cache_config
+from core.utils.StreamingExport import CSVRenderer, NDJSONRenderer
+
+# DRF side of the reference cache. Kept apart from core.utils.referenceCache,
+# which CoreConfig.ready() imports, so that processes which never serve the
+# API (migrate, the outbox worker, archive_history) don't load DRF at startup.
+
+
+class ReferenceRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves reference-table ids from the cache
+    instead of one `queryset.get()` per field. Filtered querysets
+    (limit_choices_to, custom querysets) and other models keep DRF's behaviour.
+    """
+
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        model = queryset.model
+        if self.pk_field is not None or queryset.query.where or not is_reference_model(model):
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return get_reference(model, data)
+        except model.DoesNotExist:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError, ValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class ReferenceCacheMixin:
+    """
+    Serve list responses of a reference model from the cache. The response
+    data is stored per table version and full URL (filters, search, ordering
+    and cursor included), so the first request of each variant reads the DB
+    and the rest cost no query until a save or delete bumps the version.
+    Export formats (ndjson / csv) are always streamed from the DB.
+    """
+
+    def list(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        if not is_reference_model(model) or isinstance(
+            getattr(request, "accepted_renderer", None), (NDJSONRenderer, CSVRenderer)
+        ):
+            return super().list(request, *args, **kwargs)
+
+        scope = ""
+        if get_model_capabilities(model).has_branch:
+            ctx = get_branch_context(request)
+            scope = "all" if ctx.is_main_branch else ctx.branch_id
+        label = _label(model)
+        variant = hashlib.sha1(f"{request.build_absolute_uri()}|{scope}".encode("utf-8")).hexdigest()
+        key = f"refcache:{label}:{_version(label)}:list:{variant}"
+
+        cache = _cache()
+        data = cache.get(key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, reference_cache_config()["TIMEOUT"])
+            return response
+        return Response(data)
@@ -0,0 +1,102 @@
+import re
+import threading
+from collections import Counter
+
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Normalize a query so the same statement with other parameters compares equal."""
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _LITERAL_RE.sub("?", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class RequestMetricsStore:
+    """
+    In-process aggregates per endpoint (method + view name). Each worker keeps
+    its own numbers; they reset on restart or via DELETE on the endpoint.
+    """
+
+    MAX_FINGERPRINTS = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, *, queries, db_ms, response_ms, duplicates):
+        with self._lock:
+            row = self._endpoints.get(endpoint)
+            if row is None:
+                row = self._endpoints[endpoint] = {
+                    "requests": 0,
+                    "queries_total": 0,
+                    "queries_max": 0,
+                    "db_ms_total": 0.0,
+                    "response_ms_total": 0.0,
+                    "response_ms_max": 0.0,
+                    "n_plus_one_requests": 0,
+                    "duplicates": Counter(),
+                }
+            row["requests"] += 1
+            row["queries_total"] += queries
+            row["queries_max"] = max(row["queries_max"], queries)
+            row["db_ms_total"] += db_ms
+            row["response_ms_total"] += response_ms
+            row["response_ms_max"] = max(row["response_ms_max"], response_ms)
+            if duplicates:
+                row["n_plus_one_requests"] += 1
+                row["duplicates"].update(duplicates)
+                if len(row["duplicates"]) > self.MAX_FINGERPRINTS * 2:
+                    row["duplicates"] = Counter(dict(row["duplicates"].most_common(self.MAX_FINGERPRINTS)))
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {key: dict(row, duplicates=row["duplicates"].copy()) for key, row in self._endpoints.items()}
+
+        result = []
+        for endpoint, row in endpoints.items():
+            n = row["requests"]
+            result.append({
+                "endpoint": endpoint,
+                "requests": n,
+                "queries_avg": round(row["queries_total"] / n, 2),
+                "queries_max": row["queries_max"],
+                "db_ms_avg": round(row["db_ms_total"] / n, 2),
+                "response_ms_avg": round(row["response_ms_total"] / n, 2),
+                "response_ms_max": round(row["response_ms_max"], 2),
+                "n_plus_one_requests": row["n_plus_one_requests"],
+                "duplicate_queries": [
+                    {"sql": sql, "count": count}
+                    for sql, count in row["duplicates"].most_common(self.MAX_FINGERPRINTS)
+                ],
+            })
+        return sorted(result, key=lambda r: r["queries_avg"] * r["requests"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+metrics_store = RequestMetricsStore()
+
+
+class RequestMetricsView(APIView):
+    """
+    Aggregated per-endpoint query counts, DB time, response time and N+1
+    suspects collected by RequestInstrumentationMiddleware. DELETE resets.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({"endpoints": metrics_store.snapshot()})
+
+    def delete(self, request):
+        metrics_store.reset()
+        return Response(status=204)
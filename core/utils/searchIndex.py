@@ -0,0 +1,273 @@
+import sqlite3
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, models, router
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_migrate, post_save, pre_delete
+
+DEFAULTS = {
+    "ENABLED": True,
+    # trigram indexes can't answer shorter terms; those searches use icontains
+    "MIN_TERM_LENGTH": 3,
+}
+
+
+def search_index_config():
+    return {**DEFAULTS, **(getattr(settings, "SEARCH_INDEX", {}) or {})}
+
+
+def indexed_models():
+    """
+    Models that declare `search_index_fields`: the model's own text
+    columns searched with icontains.
+    """
+    return [model for model in apps.get_models() if getattr(model, "search_index_fields", None)]
+
+
+class SearchBackend:
+    """Keeps the search structures of indexed models and narrows querysets with them."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def available(self):
+        return False
+
+    def install(self, model):
+        """Create the model's search structures if missing; True if they were created."""
+        return False
+
+    def is_installed(self, model):
+        return False
+
+    def rebuild(self, model):
+        pass
+
+    def sync(self, model, queryset):
+        """Re-index the rows of `queryset` (a queryset of `model`)."""
+
+    def remove(self, model, pks):
+        pass
+
+    def filter(self, queryset, fields, terms):
+        """`queryset` narrowed to rows matching every term in any of `fields`, or None to fall back."""
+        return None
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    One FTS5 table per model with the trigram tokenizer, so a MATCH on a
+    phrase is a case-insensitive substring match like icontains. Rows are
+    keyed by the base table's rowid, which every Django table on SQLite has
+    (UUID primary keys included).
+    """
+
+    def available(self):
+        if sqlite3.sqlite_version_info < (3, 34, 0):  # trigram tokenizer
+            return False
+        cache = self.connection.__dict__.setdefault("_search_index", {})
+        if "fts5" not in cache:
+            with self.connection.cursor() as cursor:
+                cursor.execute("PRAGMA compile_options")
+                cache["fts5"] = any(row[0] == "ENABLE_FTS5" for row in cursor.fetchall())
+        return cache["fts5"]
+
+    @staticmethod
+    def table(model):
+        return f"{model._meta.db_table}_fts"
+
+    def is_installed(self, model):
+        """True if the table exists with the model's current `search_index_fields` as columns."""
+        cache = self.connection.__dict__.setdefault("_search_index", {})
+        table = self.table(model)
+        if table not in cache:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT name FROM pragma_table_info(%s)", [table])
+                cache[table] = tuple(row[0] for row in cursor.fetchall()) == tuple(model.search_index_fields)
+        return cache[table]
+
+    def install(self, model):
+        if not self.available() or self.is_installed(model):
+            return False
+        qn = self.connection.ops.quote_name
+        columns = ", ".join(qn(name) for name in model.search_index_fields)
+        with self.connection.cursor() as cursor:
+            # a table built for other columns is replaced
+            cursor.execute(f"DROP TABLE IF EXISTS {qn(self.table(model))}")
+            cursor.execute(f"CREATE VIRTUAL TABLE {qn(self.table(model))} USING fts5({columns}, tokenize = 'trigram')")
+        self.connection.__dict__["_search_index"][self.table(model)] = True
+        self.rebuild(model)
+        return True
+
+    def _insert(self, model, queryset):
+        qn = self.connection.ops.quote_name
+        annotations = {"_search_rowid": RawSQL(f"{qn(model._meta.db_table)}.rowid", ())}
+        annotations.update({f"_search_{i}": F(name) for i, name in enumerate(model.search_index_fields)})
+        rows = queryset.order_by().annotate(**annotations).values_list(*annotations)
+        sql, params = rows.query.sql_with_params()
+        columns = ", ".join(["rowid"] + [qn(name) for name in model.search_index_fields])
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {qn(self.table(model))} ({columns}) {sql}", params)
+
+    def _rowids(self, model, queryset):
+        qn = self.connection.ops.quote_name
+        rowids = queryset.order_by().annotate(_search_rowid=RawSQL(f"{qn(model._meta.db_table)}.rowid", ()))
+        return rowids.values_list("_search_rowid", flat=True)
+
+    def rebuild(self, model):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.connection.ops.quote_name(self.table(model))}")
+        self._insert(model, model._base_manager.using(self.connection.alias).all())
+
+    def sync(self, model, queryset):
+        rowids = list(self._rowids(model, queryset))
+        if not rowids:
+            return
+        self._delete(model, rowids)
+        self._insert(model, queryset)
+
+    def remove(self, model, pks):
+        queryset = model._base_manager.using(self.connection.alias).filter(pk__in=pks)
+        self._delete(model, list(self._rowids(model, queryset)))
+
+    def _delete(self, model, rowids):
+        if rowids:
+            placeholders = ", ".join(["%s"] * len(rowids))
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.connection.ops.quote_name(self.table(model))} WHERE rowid IN ({placeholders})", rowids)
+
+    def filter(self, queryset, fields, terms):
+        model = queryset.model
+        if not set(fields) <= set(model.search_index_fields) or not self.is_installed(model):
+            return None
+        # UUIDs are stored as 32 hex digits and icontains strips the dashes from the term
+        if any("-" in term for term in terms) and any(isinstance(model._meta.get_field(name), models.UUIDField) for name in fields):
+            return None
+        qn = self.connection.ops.quote_name
+        table = self.table(model)
+        scope = "{%s}" % " ".join(fields)
+        # every term in any of the searched columns, each term a quoted phrase (a substring)
+        phrases = ('"%s"' % term.replace('"', '""') for term in terms)
+        match = " AND ".join(f"{scope} : {phrase}" for phrase in phrases)
+        return queryset.alias(
+            _search_rowid=RawSQL(f"{qn(model._meta.db_table)}.rowid", ())
+        ).filter(
+            _search_rowid__in=RawSQL(f"SELECT rowid FROM {qn(table)} WHERE {qn(table)} MATCH %s", (match,))
+        )
+
+
+class PostgresTrigramBackend(SearchBackend):
+    """
+    pg_trgm GIN indexes on UPPER(column), the expression Django's icontains
+    compiles to, so the stock OR'ed icontains query is index-backed and
+    nothing needs syncing.
+    """
+
+    def available(self):
+        return True
+
+    def _indexes(self, model):
+        qn = self.connection.ops.quote_name
+        table = model._meta.db_table
+        for name in sorted(model.search_index_fields):
+            column = model._meta.get_field(name).column
+            yield f"{table}_{column}_trgm"[:63], f"CREATE INDEX IF NOT EXISTS {qn(f'{table}_{column}_trgm'[:63])} ON {qn(table)} USING gin (UPPER({qn(column)}::text) gin_trgm_ops)"
+
+    def is_installed(self, model):
+        names = [name for name, _ in self._indexes(model)]
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_indexes WHERE indexname = ANY(%s)", [names])
+            return cursor.fetchone()[0] == len(names)
+
+    def install(self, model):
+        if self.is_installed(model):
+            return False
+        with self.connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for _, sql in self._indexes(model):
+                cursor.execute(sql)
+        return True
+
+    def rebuild(self, model):
+        self.install(model)
+
+
+BACKENDS = {
+    "sqlite": SQLiteFTS5Backend,
+    "postgresql": PostgresTrigramBackend,
+}
+
+
+def get_backend(using="default"):
+    if not search_index_config()["ENABLED"]:
+        return None
+    connection = connections[using]
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        return None
+    backend = backend_class(connection)
+    return backend if backend.available() else None
+
+
+def search_queryset(queryset, terms, fields):
+    """
+    Index-backed equivalent of `Q(f1__icontains=t) | Q(f2__icontains=t) ...`
+    for every term, or None when the model, fields, terms or database can't
+    use the search index (callers then run the icontains query).
+    """
+    terms = [term for term in terms if term]
+    fields = list(fields)
+    if not terms or not fields or any(len(term) < search_index_config()["MIN_TERM_LENGTH"] for term in terms):
+        return None
+    if not getattr(queryset.model, "search_index_fields", None):
+        return None
+    backend = get_backend(queryset.db)
+    return backend.filter(queryset, fields, terms) if backend is not None else None
+
+
+def install_search_indexes(using="default", models=None, rebuild=False):
+    """Create missing search structures (filled on creation); `rebuild` refills existing ones."""
+    backend = get_backend(using)
+    if backend is None:
+        return []
+    done = []
+    for model in models or indexed_models():
+        if not router.allow_migrate_model(using, model):
+            continue
+        if backend.install(model):
+            done.append(model)
+        elif rebuild and backend.is_installed(model):
+            backend.rebuild(model)
+            done.append(model)
+    return done
+
+
+def register_search_index_signals(app_config):
+    def _backend(model, using):
+        backend = get_backend(using)
+        return backend if backend is not None and backend.is_installed(model) else None
+
+    def _saved(sender, instance, update_fields=None, using="default", **kwargs):
+        if update_fields is not None and set(sender.search_index_fields).isdisjoint(update_fields):
+            return
+        backend = _backend(sender, using)
+        if backend is not None:
+            backend.sync(sender, sender._base_manager.using(using).filter(pk=instance.pk))
+
+    def _deleted(sender, instance, using="default", **kwargs):
+        # before the row goes: its rowid is still there to find
+        backend = _backend(sender, using)
+        if backend is not None:
+            backend.remove(sender, [instance.pk])
+
+    for model in indexed_models():
+        label = model._meta.label
+        post_save.connect(_saved, sender=model, dispatch_uid=f"searchindex_save_{label}")
+        pre_delete.connect(_deleted, sender=model, dispatch_uid=f"searchindex_delete_{label}")
+
+    def _install_after_migrate(sender, using="default", **kwargs):
+        install_search_indexes(using)
+
+    post_migrate.connect(_install_after_migrate, sender=app_config, dispatch_uid="searchindex_post_migrate")
@@ -0,0 +1,24 @@
+from rest_framework import filters
+
+from core.utils.searchIndex import search_queryset
+
+# DRF side of the search index; core.utils.searchIndex stays DRF-free for
+# CoreConfig.ready() (see core.utils.referenceCacheAPI).
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that answers `?search=` from the search index when every
+    searched field is indexed and uses the default icontains lookup (no
+    `^` / `=` / `@` / `$` prefixes). Otherwise, e.g. for terms shorter than
+    the trigram length, it runs the stock OR'ed icontains query.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if search_fields and search_terms and not any(field[0] in self.lookup_prefixes for field in search_fields):
+            filtered = search_queryset(queryset, search_terms, search_fields)
+            if filtered is not None:
+                return filtered
+        return super().filter_queryset(request, queryset, view)
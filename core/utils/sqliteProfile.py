@@ -0,0 +1,113 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.signals import connection_created
+
+DEFAULTS = {
+    "ENABLED": True,
+    "JOURNAL_MODE": "WAL",
+    # NORMAL is durable across application crashes in WAL mode; only an OS
+    # crash / power loss can drop the last transactions
+    "SYNCHRONOUS": "NORMAL",
+    "BUSY_TIMEOUT_MS": 5000,
+    "CACHE_SIZE_KIB": 65536,
+    "MMAP_SIZE": 268435456,
+    "WRITE_GATE": True,
+    "WRITE_GATE_TIMEOUT": 30,
+}
+
+
+def sqlite_profile_config():
+    return {**DEFAULTS, **(getattr(settings, "SQLITE_PROFILE", {}) or {})}
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    config = sqlite_profile_config()
+    if not config["ENABLED"]:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA journal_mode={config['JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous={config['SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA cache_size=-{int(config['CACHE_SIZE_KIB'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(config['MMAP_SIZE'])}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+
+
+def register_sqlite_profile_signals():
+    from core.backends.sqlite3.base import DatabaseWrapper
+
+    # only connections of the profiled engine; plain django.db.backends.sqlite3 stays untouched
+    connection_created.connect(apply_sqlite_pragmas, sender=DatabaseWrapper, dispatch_uid="sqlite_profile_pragmas")
+
+
+# one gate per database file, shared by every thread of the process
+_gates = {}
+_gates_lock = threading.Lock()
+
+
+def _gate(name):
+    with _gates_lock:
+        gate = _gates.get(name)
+        if gate is None:
+            # re-entrant: one thread may hold transactions on two aliases of the same file
+            gate = _gates[name] = threading.RLock()
+        return gate
+
+
+class WriteGate:
+    """
+    Serializes the transactions of one process on one SQLite file. Threads
+    queue on a lock in Python instead of racing for the file lock, which
+    SQLite resolves by failing one of them with "database is locked"
+    (a deferred transaction that has read cannot wait for the writer).
+    """
+
+    def __init__(self, settings_dict):
+        # read at acquire time: the test runner renames the database after connecting
+        self.settings_dict = settings_dict
+        self.lock = None
+
+    @property
+    def held(self):
+        return self.lock is not None
+
+    def acquire(self):
+        config = sqlite_profile_config()
+        if not config["WRITE_GATE"] or self.held:
+            return
+        lock = _gate(str(self.settings_dict["NAME"]))
+        if not lock.acquire(timeout=config["WRITE_GATE_TIMEOUT"]):
+            raise OperationalError("database is locked (timed out waiting for the write gate)")
+        self.lock = lock
+
+    def release(self):
+        if self.held:
+            lock, self.lock = self.lock, None
+            lock.release()
+
+
+_read_only = ContextVar("sqlite_read_transactions", default=False)
+
+
+@contextmanager
+def read_transactions():
+    """
+    Transactions opened inside begin DEFERRED and skip the write gate, so
+    read-only atomic blocks (reports, GET requests) run next to each other
+    and next to a writer instead of queueing behind it. A block that writes
+    after all still works: SQLite takes the write lock at its first write,
+    as with the stock backend.
+    """
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def in_read_transactions():
+    return _read_only.get()
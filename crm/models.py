@@ -102,6 +102,8 @@ class Contact(BranchScopedStampedOwnedActive):
         related_name="contacts",
     )
 
+    search_index_fields = ("code", "name", "legal_name", "phone", "email")
+
     class Meta:
         ordering = ("name",)
         constraints = [
@@ -7,6 +7,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework_bulk import BulkModelViewSet
 from core.utils.BaseModelViewSet import BaseModelViewSet
+from core.utils.KeysetPagination import PagedKeysetPagination
 
 from crm.filters import (
     LeadFilter,
@@ -71,6 +72,7 @@ class LeadActivityViewSet(BaseModelViewSet):
     search_fields = ["subject", "details"]
     ordering_fields = ["activity_at", "created"]
     ordering = ["-activity_at"]
+    pagination_class = PagedKeysetPagination
 
 
 class LeadFollowUpViewSet(BaseModelViewSet):
@@ -1,5 +1,7 @@
 # mainserver/settings.py
 
+import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 
@@ -9,6 +11,8 @@ SECRET_KEY = "CHANGE-ME-IMMEDIATELY"
 
 DEBUG = True
 
+TESTING = sys.argv[1:2] == ["test"]
+
 ALLOWED_HOSTS = ['*']
 
 AUTH_USER_MODEL = "core.CustomUser"
@@ -48,7 +52,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
-     "core.seeders.default_seed.DefaultDataSeedMiddleware",
+    "core.middlewares.requestInstrumentation.RequestInstrumentationMiddleware",
+    "core.middlewares.responseCompression.ResponseCompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
         "corsheaders.middleware.CorsMiddleware",
@@ -58,6 +63,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middlewares.protectSystemGeneratedData.SystemGeneratedWriteProtectMiddleware",
+    "core.middlewares.readTransactions.ReadTransactionsMiddleware",
 ]
 
 
@@ -85,11 +91,59 @@ CORS_ALLOW_ALL_ORIGINS=True
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "core.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # take the write lock at BEGIN so concurrent writers wait instead of failing;
+            # read-only requests begin DEFERRED (core.middlewares.readTransactions)
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
+# ✅ SQLite production profile (core.backends.sqlite3 + core.utils.sqliteProfile)
+# WAL lets readers run next to the writer, busy_timeout makes other processes
+# wait for the lock, and the write gate queues this process's transactions
+# (those that may write: GET / HEAD / OPTIONS requests and `read_transactions()`
+# blocks begin DEFERRED without it).
+# `python manage.py run_benchmarks --sqlite-concurrency 8` compares it with
+# the stock backend.
+SQLITE_PROFILE = {
+    "ENABLED": True,
+    "JOURNAL_MODE": "WAL",
+    "SYNCHRONOUS": "NORMAL",
+    "BUSY_TIMEOUT_MS": 5000,
+    "CACHE_SIZE_KIB": 65536,
+    "MMAP_SIZE": 268435456,
+    "WRITE_GATE": True,
+    "WRITE_GATE_TIMEOUT": 30,
+}
+
+# ✅ Optional read replica (see core.utils.dbRouting)
+# GET / HEAD / OPTIONS requests on the model viewsets and services wrapped in
+# `use_replica()` read from it; writes, and reads after a write in the same
+# request or inside a transaction, stay on `default`. Locally point
+# DB_REPLICA_PATH at a copy of db.sqlite3 (in WAL mode copy it with
+# `sqlite3 db.sqlite3 ".backup db.replica.sqlite3"`, a plain cp misses the
+# -wal file); for Postgres add a "replica" entry with the standby's connection settings.
+if os.environ.get("DB_REPLICA_PATH"):
+    DATABASES["replica"] = {
+        "ENGINE": "core.backends.sqlite3",
+        "NAME": os.environ["DB_REPLICA_PATH"],
+        "TEST": {"MIRROR": "default"},
+    }
+elif TESTING:
+    # a second connection to the test database; the routing tests enable it
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
+DATABASE_ROUTERS = ["core.utils.dbRouting.ReplicaRouter"]
+
+DATABASE_REPLICA = {
+    "ALIAS": "replica",
+    # a mirror can't see the rows a TestCase has not committed
+    "ENABLED": not TESTING,
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -127,7 +181,17 @@ CORS_ALLOWED_ORIGINS = [
 # ✅ DRF config using JWT auth
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.utils.authCacheAPI.CachedJWTAuthentication",
+    ),
+    # orjson-backed JSON (core.utils.FastJSON); same output as DRF's JSONRenderer
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.utils.FastJSON.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.utils.FastJSON.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
     # If you want ALL APIs protected by default:
     "DEFAULT_PERMISSION_CLASSES": (
@@ -150,6 +214,34 @@ SIMPLE_JWT = {
 }
 
 
+# ✅ gzip for responses of at least MIN_LENGTH bytes when the client sends
+# Accept-Encoding: gzip (core.middlewares.responseCompression)
+RESPONSE_COMPRESSION = {
+    "ENABLED": True,
+    "MIN_LENGTH": 1024,
+}
+
+# ✅ Async read path (core.utils.AsyncReadView), effective under ASGI
+# (`uvicorn mainserver.asgi:application`). The API endpoints need no async
+# copies: Django's ASGI handler already runs each request's sync view on a
+# thread of its own. The overview / search views hand their independent sync
+# ORM reads to pool threads (one connection each) so they run at the same
+# time; FAN_OUT=False runs them one after another instead.
+ASYNC_READS = {
+    "FAN_OUT": True,
+}
+
+# ✅ Cached JWT user resolution (see core.utils.authCache)
+# The user's request fields (not its password hash), its branch and
+# permissions are cached for TIMEOUT seconds and invalidated on user /
+# branch / group changes; with several workers point CACHE at a shared
+# backend so invalidations reach all of them.
+AUTH_CACHE = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "TIMEOUT": 60,
+}
+
 # ✅ Djoser settings
 # NOTE: If you want username login, change LOGIN_FIELD to "username"
 DJOSER = {
@@ -161,6 +253,78 @@ DJOSER = {
 }
 
 
+# ✅ Per-request query / latency instrumentation (opt-in)
+# Aggregates: GET /core/metrics/requests/ (admin only). Budgets are keyed by
+# URL name (e.g. "sales-list") or "METHOD url-name"; over-budget requests are
+# logged to the "core.instrumentation" logger.
+REQUEST_INSTRUMENTATION = {
+    "ENABLED": os.environ.get("REQUEST_INSTRUMENTATION", "") == "1",
+    "DUPLICATE_THRESHOLD": 3,
+    "DEFAULT_BUDGET": {"queries": 50, "ms": 1000},
+    "BUDGETS": {},
+}
+
+
+# ✅ Read-through cache for reference tables (currencies, payment methods,
+# UoM, ports, master data, prefixes, app settings). Invalidated on save /
+# delete; with several workers point CACHE at a shared backend (Redis /
+# Memcached), otherwise other processes only see edits after TIMEOUT.
+REFERENCE_CACHE = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "TIMEOUT": 300,
+}
+
+
+# ✅ simple_history policy (see core.utils.historyPolicy)
+# Inside a history_batch() block (per-row bulk writes, outbox handlers), history
+# rows are buffered and bulk-inserted in the same transaction when the block
+# exits; models list `history_tracked_fields` so recompute-only saves skip
+# history. `python manage.py archive_history` moves superseded rows older than
+# ARCHIVE_AFTER_DAYS into compressed HistoryArchive chunks.
+HISTORY_POLICY = {
+    "BATCH": True,
+    "BATCH_SIZE": 500,
+    "ARCHIVE_AFTER_DAYS": 365,
+    "ARCHIVE_CHUNK_SIZE": 1000,
+}
+
+# ✅ Transactional outbox for post-save side effects
+# Balance adjustments, MainActor upserts, HU / DeliveryOrder / costing sync are
+# written as OutboxEvent rows next to the triggering row. INLINE runs each
+# one right after its commit, so nothing waits on a worker; events that fail
+# (or a process that dies before running them) are picked up by
+# `python manage.py run_outbox_worker`. Set OUTBOX_INLINE=0 when a worker
+# drains the table on its own.
+OUTBOX = {
+    "INLINE": os.environ.get("OUTBOX_INLINE", "1") != "0",
+    "THREADS": 4,
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 8,
+    "BACKOFF_SECONDS": 5,
+    "MAX_BACKOFF_SECONDS": 3600,
+    "LEASE_SECONDS": 300,
+    "RETAIN_DAYS": 7,
+}
+
+# ✅ Search index for ?search= / ?q= on models that list `search_index_fields`
+# (see core.utils.searchIndex): an FTS5 trigram table per model on SQLite,
+# pg_trgm GIN indexes on PostgreSQL. Created after migrate and kept in sync by
+# signals; run `python manage.py rebuild_search_index` after bulk writes.
+SEARCH_INDEX = {
+    "ENABLED": True,
+    "MIN_TERM_LENGTH": 3,
+}
+
+# ✅ Financial statements (see accounting.utils.financial_statements)
+# Trial balance / P&L / balance sheet are cached per parameters under a key
+# that changes with every GL posting, so TIMEOUT only bounds memory use.
+FINANCIAL_REPORTS = {
+    "CACHE": "default",
+    "TIMEOUT": 900,
+}
+
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Logifreight API",
     "DESCRIPTION": "API documentation for your Django project",
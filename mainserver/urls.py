@@ -3,11 +3,7 @@ from django.contrib import admin
 from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+from core.utils.lazyView import lazy_view
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounting/', include('accounting.urls')),
@@ -21,9 +17,9 @@ urlpatterns = [
     path('purchase/', include('purchase.urls')),
     path('sales/', include('sales.urls')),
     path('warehouse/', include('warehouse.urls')),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),#the normal api docs path
-    path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),# Swagger UI
-    path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),   # Redoc UI (optional)
+    path("api/schema/", lazy_view("drf_spectacular.views.SpectacularAPIView"), name="schema"),#the normal api docs path
+    path("api/docs/", lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name="schema"), name="swagger-ui"),# Swagger UI
+    path("api/redoc/", lazy_view("drf_spectacular.views.SpectacularRedocView", url_name="schema"), name="redoc"),   # Redoc UI (optional)
     path("auth/", include("djoser.urls")),
     path("auth/", include("djoser.urls.jwt")),
 ]
@@ -1,7 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from simple_history.models import HistoricalRecords
+from core.utils.historyPolicy import PolicyHistoricalRecords
 import uuid
 import re
 
@@ -18,7 +18,7 @@ class UnitofMeasurement(models.Model):
     created = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
     add_by = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True, on_delete=models.PROTECT, related_name="un_add")
-    history = HistoricalRecords()
+    history = PolicyHistoricalRecords()
 
     class Meta:
         verbose_name = "Unit of Measurement"
@@ -44,7 +44,7 @@ class UnitofMeasurementLength(models.Model):
     created = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
     added_by = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True, on_delete=models.PROTECT, related_name="unl_add")
-    history = HistoricalRecords()
+    history = PolicyHistoricalRecords()
 
     class Meta:
         verbose_name = "Unit of Measurement (Length)"
@@ -79,7 +79,7 @@ class Ports(models.Model):
     created = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
     added_by = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True, on_delete=models.PROTECT)
-    history = HistoricalRecords()
+    history = PolicyHistoricalRecords()
 
     class Meta:
         verbose_name = "Ports"
@@ -134,7 +134,7 @@ class Branch(models.Model):
     added_by = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True, on_delete=models.PROTECT, related_name="user_branch_association")
     created = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
-    history = HistoricalRecords()
+    history = PolicyHistoricalRecords()
 
     def __str__(self):
         return f"{self.name} ({self.branch_id})"
@@ -167,7 +167,7 @@ class MasterData(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     active = models.BooleanField(default=True)
-    history = HistoricalRecords()
+    history = PolicyHistoricalRecords()
 
     class Meta:
         indexes = [models.Index(fields=["type_master", "name"])]
@@ -40,23 +40,25 @@ from .filters import (
 )
 
 from core.utils.BaseModelViewSet import BaseModelViewSet
+from core.utils.referenceCache import get_reference_singleton
+from core.utils.referenceCacheAPI import ReferenceCacheMixin
 
 
-class UnitofMeasurementViewSet(BulkModelViewSet):
+class UnitofMeasurementViewSet(ReferenceCacheMixin, BulkModelViewSet):
     queryset = UnitofMeasurement.objects.all()
     serializer_class = UnitofMeasurementSerializer
     filterset_class = UnitofMeasurementFilter
     search_fields = ["name", "symbol"]
 
 
-class UnitofMeasurementLengthViewSet(BulkModelViewSet):
+class UnitofMeasurementLengthViewSet(ReferenceCacheMixin, BulkModelViewSet):
     queryset = UnitofMeasurementLength.objects.all()
     serializer_class = UnitofMeasurementLengthSerializer
     filterset_class = UnitofMeasurementLengthFilter
     search_fields = ["name", "symbol"]
 
 
-class PortsViewSet(BulkModelViewSet):
+class PortsViewSet(ReferenceCacheMixin, BulkModelViewSet):
     queryset = Ports.objects.select_related("nearest_branch").all()
     serializer_class = PortsSerializer
     filterset_class = PortsFilter
@@ -70,7 +72,7 @@ class BranchViewSet(BulkModelViewSet):
     search_fields = ["branch_id", "name", "city", "state", "country"]
 
 
-class MasterDataViewSet(BulkModelViewSet):
+class MasterDataViewSet(ReferenceCacheMixin, BulkModelViewSet):
     queryset = MasterData.objects.all()
     serializer_class = MasterDataSerializer
     filterset_class = MasterDataFilter
@@ -99,10 +101,13 @@ class SingletonMixin:
 
     @action(detail=False, methods=["get", "put", "patch"], url_path="singleton")
     def singleton(self, request):
-        obj = self.get_object()
         if request.method == "GET":
+            # reads come from the reference cache (invalidated on save)
+            obj = get_reference_singleton(self.get_queryset().model) or self.get_object()
             return Response(self.get_serializer(obj).data)
 
+        obj = self.get_object()
+
         serializer = self.get_serializer(obj, data=request.data, partial=(request.method == "PATCH"))
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -3,6 +3,8 @@
 from django.db import models as dj_models
 from django_filters import rest_framework as filters
 
+from core.utils.searchIndex import search_queryset
+
 from .models import (
     Shipment,
     ShipmentDocument,
@@ -44,6 +46,9 @@ class ShipmentFilter(filters.FilterSet):
     def search(self, queryset, name, value):
         if not value:
             return queryset
+        indexed = search_queryset(queryset, [value], Shipment.search_index_fields)
+        if indexed is not None:
+            return indexed
         return queryset.filter(
             dj_models.Q(doc_ref_no__icontains=value)
             | dj_models.Q(origin_port__icontains=value)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('master', '0001_initial'),
+        ('operations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['branch', 'created', 'id'], name='operations__branch__bbf747_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['created', 'id'], name='operations__created_21d61f_idx'),
+        ),
+    ]
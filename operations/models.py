@@ -115,8 +115,13 @@ class Shipment(BranchScopedStampedOwnedActive):
     incoterms = models.CharField(max_length=10, choices=Incoterms.choices, blank=True, null=True)
     payment_term = models.CharField(max_length=10, choices=PaymentTerm.choices, default=PaymentTerm.NONE)
 
+    # ?search= / ?q= columns served by the search index (see core.utils.searchIndex)
+    search_index_fields = ("doc_ref_no", "origin_port", "destination_port", "shipper", "consignee")
+
     class Meta:
         ordering = ["-created"]
+        # the keyset-paginated list: own branch / main branch, newest first
+        indexes = [models.Index(fields=["branch", "created", "id"]), models.Index(fields=["created", "id"])]
 
     def __str__(self):
         return f"{self.shipment_main_type} {self.origin_port}->{self.destination_port} ({self.id})"
@@ -194,6 +199,10 @@ class ShipmentTransportInfo(BranchScopedStampedOwnedActive):
     tracking_no = models.CharField(max_length=120, blank=True, null=True)
     ground_waybill_no = models.CharField(max_length=120, blank=True, null=True)
 
+    search_index_fields = (
+        "state", "airline", "flight_no", "bill_of_lading", "tracking_no", "air_waybill_number", "ground_waybill_no",
+    )
+
     class Meta:
         ordering = ["-created"]
 
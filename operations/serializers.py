@@ -2,7 +2,8 @@
 
 from rest_framework import serializers
 from rest_framework_bulk.serializers import BulkSerializerMixin
-from core.utils.AdaptedBulkListSerializer import AdaptedBulkListSerializer
+from core.utils.AdaptedBulkListSerializer import AdaptedBulkListSerializer, DynamicFieldsMixin
+from core.utils.referenceCacheAPI import ReferenceRelatedField
 
 from .utils import READONLY_FIELDS
 from .models import (
@@ -20,7 +21,7 @@ from .models import (
 )
 
 
-class ShipmentSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Shipment
         fields = "__all__"
@@ -28,7 +29,7 @@ class ShipmentSerializer(BulkSerializerMixin, serializers.ModelSerializer):
         list_serializer_class = AdaptedBulkListSerializer
 
 
-class ShipmentDocumentSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentDocumentSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     document_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -48,7 +49,7 @@ class ShipmentDocumentSerializer(BulkSerializerMixin, serializers.ModelSerialize
             return None
 
 
-class ShipmentNoteSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentNoteSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ShipmentNote
         fields = "__all__"
@@ -56,7 +57,7 @@ class ShipmentNoteSerializer(BulkSerializerMixin, serializers.ModelSerializer):
         list_serializer_class = AdaptedBulkListSerializer
 
 
-class ShipmentTransportInfoSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentTransportInfoSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ShipmentTransportInfo
         fields = "__all__"
@@ -64,7 +65,7 @@ class ShipmentTransportInfoSerializer(BulkSerializerMixin, serializers.ModelSeri
         list_serializer_class = AdaptedBulkListSerializer
 
 
-class ShipmentPackagesSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentPackagesSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ShipmentPackages
         fields = "__all__"
@@ -73,7 +74,7 @@ class ShipmentPackagesSerializer(BulkSerializerMixin, serializers.ModelSerialize
 
 
 # --- Manifest ---
-class ShipmentManifestSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentManifestSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ShipmentManifest
         fields = "__all__"
@@ -81,7 +82,7 @@ class ShipmentManifestSerializer(BulkSerializerMixin, serializers.ModelSerialize
         list_serializer_class = AdaptedBulkListSerializer
 
 
-class ShipmentManifestBookingSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentManifestBookingSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ShipmentManifestBooking
         fields = "__all__"
@@ -89,7 +90,7 @@ class ShipmentManifestBookingSerializer(BulkSerializerMixin, serializers.ModelSe
         list_serializer_class = AdaptedBulkListSerializer
 
 
-class ShipmentManifestHouseSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentManifestHouseSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ShipmentManifestHouse
         fields = "__all__"
@@ -98,7 +99,10 @@ class ShipmentManifestHouseSerializer(BulkSerializerMixin, serializers.ModelSeri
 
 
 # --- Payments / Charges ---
-class PaymentSummarySerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class PaymentSummarySerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {"shipment": ShipmentSerializer, "currency": "accounting.serializers.CurrencySerializer"}
+
     class Meta:
         model = PaymentSummary
         fields = "__all__"
@@ -106,7 +110,12 @@ class PaymentSummarySerializer(BulkSerializerMixin, serializers.ModelSerializer)
         list_serializer_class = AdaptedBulkListSerializer
 
 
-class ShipmentChargesSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentChargesSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {
+        "payment_summary": PaymentSummarySerializer, "charge_currency": "accounting.serializers.CurrencySerializer", "invoice_currency": "accounting.serializers.CurrencySerializer",
+    }
+
     class Meta:
         model = ShipmentCharges
         fields = "__all__"
@@ -114,7 +123,12 @@ class ShipmentChargesSerializer(BulkSerializerMixin, serializers.ModelSerializer
         list_serializer_class = AdaptedBulkListSerializer
 
 
-class ShipmentCostingsSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class ShipmentCostingsSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {
+        "payment_summary": PaymentSummarySerializer, "charge_currency": "accounting.serializers.CurrencySerializer", "invoice_currency": "accounting.serializers.CurrencySerializer",
+    }
+
     class Meta:
         model = ShipmentCostings
         fields = "__all__"
@@ -10,6 +10,7 @@ from operations.models import Shipment, PaymentSummary, ShipmentCharges
 from sales.models import Sales, SalesItem
 from accounting.models import Currency
 from actors.models import Customer
+from core.utils.referenceCache import get_reference
 
 
 def _vat_code_from_tax_rate(tax_rate: Decimal) -> str:
@@ -34,7 +35,7 @@ def generate_invoice_from_shipment(
 ) -> Sales:
     shipment = Shipment.objects.select_for_update().get(pk=shipment_id)
     customer = Customer.objects.get(pk=customer_id)
-    currency = Currency.objects.get(pk=currency_id)
+    currency = get_reference(Currency, currency_id)
 
     ps = PaymentSummary.objects.select_for_update().filter(shipment=shipment).first()
     if not ps:
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from django.db import transaction
 from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from operations.models import ShipmentPackages
+from core.utils.outbox import enqueue, outbox_handler
 from warehouse.models import HandlingUnit
 
+SYNC_PACKAGE_HANDLING_UNITS = "operations.sync_package_handling_units"
+
 
 def _handling_unit_base_data(package: ShipmentPackages) -> dict:
     return {
@@ -52,6 +54,13 @@ def _sync_handling_units(package: ShipmentPackages) -> None:
         HandlingUnit.objects.filter(id__in=[unit.id for unit in units_to_delete]).delete()
 
 
+@outbox_handler(SYNC_PACKAGE_HANDLING_UNITS)
+def _sync_handling_units_event(payload) -> None:
+    package = ShipmentPackages.objects.select_related("shipment").filter(pk=payload["pk"]).first()
+    if package is not None:
+        _sync_handling_units(package)
+
+
 @receiver(pre_save, sender=ShipmentPackages)
 def _cache_old_package_quantity(sender, instance: ShipmentPackages, **kwargs) -> None:
     if not instance.pk:
@@ -64,7 +73,7 @@ def _cache_old_package_quantity(sender, instance: ShipmentPackages, **kwargs) ->
 
 @receiver(post_save, sender=ShipmentPackages)
 def _sync_package_handling_units(sender, instance: ShipmentPackages, created: bool, **kwargs) -> None:
-    transaction.on_commit(lambda: _sync_handling_units(instance))
+    enqueue(SYNC_PACKAGE_HANDLING_UNITS, {"pk": str(instance.pk)}, key=f"{SYNC_PACKAGE_HANDLING_UNITS}:{instance.pk}")
 
 
 @receiver(post_delete, sender=ShipmentPackages)
@@ -1,3 +1,51 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import CustomUser
+from master.models import Branch
+from operations.models import Shipment
+from operations.views import ShipmentOverviewView
+
+
+@override_settings(ASYNC_READS={"FAN_OUT": False})  # pool-thread connections can't see the test transaction
+class ShipmentOverviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.main = Branch.objects.filter(is_main_branch=True).first()
+        cls.other = Branch.objects.create(
+            name="Overview Branch", address="1 Quay", city="Dubai", state="Dubai", country="AE", contact_number="0"
+        )
+        cls.main_user = CustomUser.objects.create_superuser(username="overview-main", email="main@example.invalid", branch=cls.main)
+        cls.other_user = CustomUser.objects.create_user(username="overview-other", email="other@example.invalid", branch=cls.other)
+        cls.shipment = Shipment.objects.create(origin_port="AEJEA", destination_port="INNSA", branch=cls.main)
+
+    def get(self, user=None, shipment=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"} if user else {}
+        return self.client.get(f"/operations/shipments/{(shipment or self.shipment).pk}/overview/", **headers)
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_main_branch_user_gets_the_overview(self):
+        response = self.get(self.main_user)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(set(body), {"shipment", "packages", "transport_info", "payment_summary"})
+        self.assertEqual(body["shipment"]["id"], str(self.shipment.pk))
+
+    def test_other_branch_user_cannot_read_the_shipment(self):
+        self.assertEqual(self.get(self.other_user).status_code, 404)
+
+    def test_object_permission_is_checked_past_the_scope(self):
+        with mock.patch.object(ShipmentOverviewView, "scope", lambda view, queryset: queryset):
+            response = self.get(self.other_user)
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn("shipment", response.json())
+
+
+class AsyncRouteTests(TestCase):
+    def test_no_async_copies_of_the_api_routes(self):
+        self.assertEqual(self.client.get("/operations/async/shipments/").status_code, 404)
+        self.assertEqual(self.client.get("/accounting/async/general-ledger/").status_code, 404)
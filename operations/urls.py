@@ -15,6 +15,7 @@ from .views import (
     PaymentSummaryViewSet,
     ShipmentChargesViewSet,
     ShipmentCostingsViewSet,
+    ShipmentOverviewView,
 )
 
 router = DefaultRouter()
@@ -34,5 +35,6 @@ router.register(r"shipment-charges", ShipmentChargesViewSet, basename="shipment-
 router.register(r"shipment-costings", ShipmentCostingsViewSet, basename="shipment-costings")
 
 urlpatterns = [
+    path("shipments/<uuid:pk>/overview/", ShipmentOverviewView.as_view(), name="shipment-overview"),
     path("", include(router.urls)),
 ]
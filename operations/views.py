@@ -1,5 +1,7 @@
 # operations/views.py
 
+from asgiref.sync import sync_to_async
+from django.http import Http404
 from rest_framework.parsers import FormParser, MultiPartParser
 
 from .utils import stamp_user_on_create
@@ -43,6 +45,7 @@ from .filters import (
     ShipmentCostingsFilter,
 )
 
+from core.utils.AsyncReadView import AsyncReadOnlyView, fan_out
 from core.utils.BaseModelViewSet import BaseModelViewSet
 class ShipmentViewSet(BaseModelViewSet):
     queryset = Shipment.objects.all()
@@ -122,3 +125,30 @@ class ShipmentCostingsViewSet(BaseModelViewSet):
     serializer_class = ShipmentCostingsSerializer
     filterset_class = ShipmentCostingsFilter
     search_fields = ["charge_name", "reference_no", "remarks"]
+
+
+class ShipmentOverviewView(AsyncReadOnlyView):
+    """
+    GET /operations/shipments/<pk>/overview/: the shipment with its packages,
+    transport info and payment summary, permission-checked like
+    ShipmentViewSet's retrieve and the four reads fanned out to pool threads.
+    """
+
+    async def aget_data(self, request, pk):
+        shipment = await self.scope(Shipment.objects.filter(pk=pk)).afirst()
+        if shipment is None:
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(request, shipment)
+
+        def one(queryset, serializer_class):
+            obj = queryset.first()
+            return serializer_class(obj).data if obj is not None else None
+
+        return await fan_out(
+            shipment=lambda: ShipmentSerializer(shipment).data,
+            packages=lambda: ShipmentPackagesSerializer(
+                ShipmentPackages.objects.filter(shipment_id=pk).select_related("package_unit", "mass_unit"), many=True
+            ).data,
+            transport_info=lambda: one(ShipmentTransportInfo.objects.filter(shipment_id=pk), ShipmentTransportInfoSerializer),
+            payment_summary=lambda: one(PaymentSummary.objects.filter(shipment_id=pk), PaymentSummarySerializer),
+        )
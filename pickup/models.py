@@ -79,6 +79,7 @@ class PickupOrder(BranchScopedStampedOwnedActive):
     instruction = models.TextField(blank=True, null=True)
     remarks = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=50, choices=PICKUP_REQUEST_STATUS, default="PENDING")
+    search_index_fields = ("code", "from_location", "destination", "receiver_name", "receiver_phone", "sender_phone", "ref_no")
     class Meta: verbose_name="Pickup Order"; verbose_name_plural="Pickup Orders"; ordering=["-created"]; indexes=[models.Index(fields=["status"]), models.Index(fields=["vendor"]), models.Index(fields=["sender_Customer"]), models.Index(fields=["branch"]), models.Index(fields=["active"])]
     def __str__(self): return f"PickupOrder {self.code} - {self.sender_Customer} → {self.receiver_name}"
 
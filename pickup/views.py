@@ -11,6 +11,7 @@ from .models import Vehicle, Rider, PickupRequest, PickupOrder, PickupPackage, P
 from .serializers import VehicleSerializer, RiderSerializer, PickupRequestSerializer, PickupOrderSerializer, PickupPackageSerializer, PickupRunsheetSerializer, DeliveryOrderSerializer, DeliveryAttemptSerializer, ProofOfDeliverySerializer, DeliveryRunsheetSerializer, ReturnToVendorSerializer, RtvBranchReturnSerializer, DispatchManifestSerializer, ReceiveManifestSerializer
 from .filters import VehicleFilter, RiderFilter, PickupRequestFilter, PickupOrderFilter, PickupPackageFilter, PickupRunsheetFilter, DeliveryOrderFilter, DeliveryAttemptFilter, ProofOfDeliveryFilter, DeliveryRunsheetFilter, ReturnToVendorFilter, RtvBranchReturnFilter, DispatchManifestFilter, ReceiveManifestFilter
 from core.utils.BaseModelViewSet import BaseModelViewSet
+from core.utils.KeysetPagination import PagedKeysetPagination
 
 class VehicleViewSet(BaseModelViewSet):
     queryset = Vehicle.objects.all()
@@ -66,6 +67,7 @@ class DeliveryAttemptViewSet(BaseModelViewSet):
     serializer_class = DeliveryAttemptSerializer
     filterset_class = DeliveryAttemptFilter
     search_fields = ["delivery_order__code","remarks"]
+    pagination_class = PagedKeysetPagination
 
 
 class ProofOfDeliveryViewSet(BaseModelViewSet):
@@ -5,7 +5,7 @@ from decimal import Decimal
 import uuid
 
 from django.conf import settings
-from django.db import models, transaction
+from django.db import models
 from django.db.models import Q, Sum, F, DecimalField, ExpressionWrapper
 from django.core.exceptions import ValidationError
 
@@ -15,9 +15,13 @@ from core.utils.coreModels import (
     StampedOwnedActive,
 )
 from actors.models import Supplier
+from core.utils.outbox import enqueue, outbox_handler
 
 D0 = Decimal("0.00")
 
+SYNC_VENDOR_BILL_ITEM_COSTING = "purchase.sync_vendor_bill_item_costing"
+SYNC_EXPENSE_ITEM_COSTING = "purchase.sync_expense_item_costing"
+
 
 # -----------------------------
 # Helpers for AP -> Operations
@@ -127,6 +131,20 @@ def _sync_expense_item_to_shipment_costing(ei: "ExpensesItems"):
     ps.recompute_from_lines(save=True)
 
 
+@outbox_handler(SYNC_VENDOR_BILL_ITEM_COSTING)
+def _sync_vendor_bill_item_costing_event(payload):
+    vbi = VendorBillItems.objects.select_related("vendorbills", "shipment").filter(pk=payload["pk"]).first()
+    if vbi is not None:
+        _sync_vendor_bill_item_to_shipment_costing(vbi)
+
+
+@outbox_handler(SYNC_EXPENSE_ITEM_COSTING)
+def _sync_expense_item_costing_event(payload):
+    ei = ExpensesItems.objects.select_related("expenses", "shipment").filter(pk=payload["pk"]).first()
+    if ei is not None:
+        _sync_expense_item_to_shipment_costing(ei)
+
+
 # -----------------------------
 # Models
 # -----------------------------
@@ -138,6 +156,9 @@ class VendorBillsGroup(BranchScopedStampedOwnedActive):
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default="pending")
     total_amount = models.DecimalField(default=D0, max_digits=18, decimal_places=2)
 
+    # total_amount is recomputed from the bills (see core.utils.historyPolicy)
+    history_tracked_fields = ["no", "status", "branch", "active"]
+
     class Meta:
         ordering = ["-created", "-id"]
         constraints = [
@@ -210,6 +231,12 @@ class Expenses(BranchScopedStampedOwnedActive):
 
     paid_from = models.ForeignKey("accounting.ChartofAccounts", on_delete=models.PROTECT, related_name="expenses_paid_from", verbose_name="Paid From (Bank Account)")
 
+    # subtotal / taxable / total and paid / remaining are recomputed from items and payments
+    history_tracked_fields = [
+        "exp_no", "status", "invoice_reference", "supplier", "expense_category", "currency", "date", "due_date",
+        "shipment", "discount_amount", "vat_amount", "paid_from", "branch", "active",
+    ]
+
     class Meta:
         verbose_name = "Expense"
         verbose_name_plural = "Expenses"
@@ -311,7 +338,7 @@ class ExpensesItems(models.Model):
             self.expenses.recalc_from_items(save=True)
             self.expenses.update_status(save=True)
 
-        transaction.on_commit(lambda: _sync_expense_item_to_shipment_costing(self))
+        enqueue(SYNC_EXPENSE_ITEM_COSTING, {"pk": str(self.pk)}, key=f"{SYNC_EXPENSE_ITEM_COSTING}:{self.pk}")
 
     def delete(self, *args, **kwargs):
         from operations.models import ShipmentCostings
@@ -364,6 +391,13 @@ class VendorBills(TransactionBasedBranchScopedStampedOwnedActive):
     bill_status = models.CharField(choices=BILL_STATUS, default="due", max_length=20, verbose_name="Bill Status")
     remarks = models.TextField(blank=True, null=True, verbose_name="Remarks")
 
+    # the amounts are recomputed from bill items and payment entries
+    history_tracked_fields = [
+        "no", "vendor", "invoice_reference", "date", "due_date", "currency", "vendor_bills_group", "shipment",
+        "bill_status", "remarks", "approved", "approved_at", "approved_by", "voided_reason", "voided_at",
+        "exchange_rate", "branch", "active",
+    ]
+
     class Meta:
         verbose_name = "Vendor Bill"
         verbose_name_plural = "Vendor Bills"
@@ -475,7 +509,7 @@ class VendorBillItems(models.Model):
             self.vendorbills.recalc_from_items(save=True)
             self.vendorbills.update_status(save=True)
 
-        transaction.on_commit(lambda: _sync_vendor_bill_item_to_shipment_costing(self))
+        enqueue(SYNC_VENDOR_BILL_ITEM_COSTING, {"pk": str(self.pk)}, key=f"{SYNC_VENDOR_BILL_ITEM_COSTING}:{self.pk}")
 
     def delete(self, *args, **kwargs):
         from operations.models import ShipmentCostings
@@ -518,6 +552,12 @@ class VendorPayments(TransactionBasedBranchScopedStampedOwnedActive):
     tds_type = models.CharField(max_length=100, blank=True, null=True, verbose_name="TDS Type")
     status = models.CharField(max_length=20, choices=STATUS, default="pending")
 
+    # amount is recomputed from the payment entries
+    history_tracked_fields = [
+        "no", "vendor", "paid_from", "date", "remarks", "currency", "bank_charges", "tds_amount", "tds_type", "status",
+        "approved", "approved_at", "approved_by", "voided_reason", "voided_at", "exchange_rate", "branch", "active",
+    ]
+
     class Meta:
         verbose_name = "Vendor Payment"
         verbose_name_plural = "Vendor Payments"
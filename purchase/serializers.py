@@ -2,6 +2,9 @@
 from django.db import transaction
 from rest_framework import serializers
 
+from core.utils.AdaptedBulkListSerializer import DynamicFieldsMixin
+from core.utils.referenceCacheAPI import ReferenceRelatedField
+
 from .models import (
     VendorBillsGroup, ExpenseCategory, Expenses, ExpensesItems,
     VendorBills, VendorBillItems,
@@ -9,21 +12,21 @@ from .models import (
 )
 
 
-class VendorBillsGroupSerializer(serializers.ModelSerializer):
+class VendorBillsGroupSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = VendorBillsGroup
         fields = "__all__"
         read_only_fields = ("created", "updated", "user_add", "history")
 
 
-class ExpenseCategorySerializer(serializers.ModelSerializer):
+class ExpenseCategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ExpenseCategory
         fields = "__all__"
         read_only_fields = ("created", "updated", "user_add", "history")
 
 
-class ExpensesItemsSerializer(serializers.ModelSerializer):
+class ExpensesItemsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ExpensesItems
         fields = "__all__"
@@ -39,8 +42,10 @@ class ExpensesItemsSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class ExpensesSerializer(serializers.ModelSerializer):
+class ExpensesSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     expenses_items = ExpensesItemsSerializer(many=True, required=False)
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {"currency": "accounting.serializers.CurrencySerializer", "expense_category": ExpenseCategorySerializer}
 
     class Meta:
         model = Expenses
@@ -90,15 +95,20 @@ class ExpensesSerializer(serializers.ModelSerializer):
         return instance
 
 
-class VendorBillItemsSerializer(serializers.ModelSerializer):
+class VendorBillItemsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = VendorBillItems
         fields = "__all__"
         read_only_fields = ("id",)
 
 
-class VendorBillsSerializer(serializers.ModelSerializer):
+class VendorBillsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     bill_items = VendorBillItemsSerializer(many=True, required=False)
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {
+        "currency": "accounting.serializers.CurrencySerializer", "vendor": "actors.serializers.VendorSerializer",
+        "vendor_bills_group": VendorBillsGroupSerializer,
+    }
 
     class Meta:
         model = VendorBills
@@ -148,15 +158,17 @@ class VendorBillsSerializer(serializers.ModelSerializer):
         return instance
 
 
-class VendorPaymentEntriesSerializer(serializers.ModelSerializer):
+class VendorPaymentEntriesSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = VendorPaymentEntries
         fields = "__all__"
         read_only_fields = ("id",)
 
 
-class VendorPaymentsSerializer(serializers.ModelSerializer):
+class VendorPaymentsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     payment_entries = VendorPaymentEntriesSerializer(many=True, required=False)
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {"currency": "accounting.serializers.CurrencySerializer", "vendor": "actors.serializers.VendorSerializer"}
 
     class Meta:
         model = VendorPayments
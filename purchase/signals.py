@@ -5,8 +5,13 @@ from django.db import transaction
 from django.db.models.signals import post_save, pre_save
 
 from accounting.models import Accounts
+from actors.models import Vendor
+from actors.signals import ensure_main_actor
+from core.utils.outbox import enqueue, outbox_handler
 from purchase.models import VendorBills, VendorPayments
 
+ADJUST_VENDOR_BALANCE = "purchase.adjust_vendor_balance"
+
 
 def _norm(s) -> str:
     return (s or "").strip().lower()
@@ -52,7 +57,7 @@ def _snapshot_approval_state(instance) -> None:
 
 
 def _adjust_vendor_account_balance(vendor, delta: Decimal) -> None:
-    if not vendor or not getattr(vendor, "main_actor", None):
+    if not vendor or not ensure_main_actor(vendor):
         return
 
     delta = Decimal(delta or 0)
@@ -79,14 +84,24 @@ def _adjust_vendor_account_balance(vendor, delta: Decimal) -> None:
         account.save(update_fields=["balance", "name", "branch", "active", "source"])
 
 
-def _apply_if_approved(instance, vendor, delta: Decimal) -> None:
+@outbox_handler(ADJUST_VENDOR_BALANCE)
+def _adjust_vendor_balance_event(payload) -> None:
+    vendor = Vendor.objects.filter(pk=payload["vendor_id"]).first()
+    _adjust_vendor_account_balance(vendor, Decimal(payload["delta"]))
+
+
+def _apply_if_approved(instance, vendor_id, delta: Decimal) -> None:
     is_applied = _should_apply(instance)
     was_applied = bool(getattr(instance, "_was_applied", False))
 
+    if not vendor_id:
+        return
+
+    # Written with the document; the worker applies it exactly once.
     if is_applied and not was_applied:
-        transaction.on_commit(lambda: _adjust_vendor_account_balance(vendor, Decimal(delta)))
+        enqueue(ADJUST_VENDOR_BALANCE, {"vendor_id": vendor_id, "delta": str(Decimal(delta))})
     elif was_applied and not is_applied:
-        transaction.on_commit(lambda: _adjust_vendor_account_balance(vendor, Decimal(delta) * Decimal("-1")))
+        enqueue(ADJUST_VENDOR_BALANCE, {"vendor_id": vendor_id, "delta": str(Decimal(delta) * Decimal("-1"))})
 
 
 def register_purchase_signals() -> None:
@@ -94,10 +109,10 @@ def register_purchase_signals() -> None:
         _snapshot_approval_state(instance)
 
     def _vendor_bill_post_save(sender, instance, created, **kwargs):
-        _apply_if_approved(instance, instance.vendor, Decimal(instance.total_amount or 0))
+        _apply_if_approved(instance, instance.vendor_id, Decimal(instance.total_amount or 0))
 
     def _vendor_payment_post_save(sender, instance, created, **kwargs):
-        _apply_if_approved(instance, instance.vendor, Decimal(instance.amount or 0) * Decimal("-1"))
+        _apply_if_approved(instance, instance.vendor_id, Decimal(instance.amount or 0) * Decimal("-1"))
 
     pre_save.connect(_pre_save, sender=VendorBills, dispatch_uid="vendorbills_presave_snapshot")
     pre_save.connect(_pre_save, sender=VendorPayments, dispatch_uid="vendorpayments_presave_snapshot")
@@ -110,7 +125,7 @@ def register_purchase_signals() -> None:
     if PurchaseReturn:
         def _purchase_return_post_save(sender, instance, created, **kwargs):
             # adjust this field if your model uses supplier instead of vendor
-            _apply_if_approved(instance, instance.vendor, Decimal(instance.total or 0) * Decimal("-1"))
+            _apply_if_approved(instance, instance.vendor_id, Decimal(instance.total or 0) * Decimal("-1"))
 
         pre_save.connect(_pre_save, sender=PurchaseReturn, dispatch_uid="purchasereturn_presave_snapshot")
         post_save.connect(_purchase_return_post_save, sender=PurchaseReturn, dispatch_uid="purchasereturn_postsave_account_update")
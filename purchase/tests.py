@@ -1,3 +1,40 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from accounting.models import Accounts, ChartofAccounts, Currency
+from actors.models import MainActor, Vendor
+from core.models import OutboxEvent
+from core.utils.outbox import claim, process_events
+from master.models import Branch, MasterData
+from purchase.models import VendorBills
+from purchase.signals import ADJUST_VENDOR_BALANCE
+
+
+@override_settings(OUTBOX={"INLINE": False})
+class BillBalanceBeforeMainActorTests(TestCase):
+    """The balance event can reach the worker before the vendor's queued MainActor upsert."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.currency = Currency.objects.create(name="Test Dollar", symbol="T$")
+        cls.agency = MasterData.objects.first()
+
+    def test_approving_creates_the_missing_main_actor(self):
+        vendor = Vendor.objects.create(
+            name="Bill Vendor", address="Warehouse 1", country="AE", agency=self.agency, currency=self.currency,
+            account=ChartofAccounts.objects.first(), cellphone_country_code="+971", cellphone="500000000",
+            branch=self.branch,
+        )
+        self.assertFalse(MainActor.objects.filter(vendor=vendor).exists())
+        VendorBills.objects.create(
+            vendor=vendor, currency=self.currency, branch=self.branch, date=datetime.date(2026, 3, 1),
+            due_date=datetime.date(2026, 3, 31), total_amount=Decimal("120.00"), approved=True,
+        )
+        events = OutboxEvent.objects.filter(topic=ADJUST_VENDOR_BALANCE).values_list("pk", flat=True)
+        self.assertEqual(process_events(claim(ids=list(events))), (1, 0))
+
+        main_actor = MainActor.objects.get(vendor=vendor)
+        self.assertEqual(Accounts.objects.get(actor=main_actor).balance, Decimal("120.00"))
@@ -8,6 +8,9 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 
+from core.utils.BaseModelViewSet import SparseFieldsetMixin
+from core.utils.dbRouting import ReplicaReadMixin
+
 from .models import (
     VendorBillsGroup, ExpenseCategory, Expenses, ExpensesItems,
     VendorBills, VendorBillItems,
@@ -27,7 +30,7 @@ from .filters import (
 )
 
 
-class BaseModelViewSet(viewsets.ModelViewSet):
+class BaseModelViewSet(ReplicaReadMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
 
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_generalledger_accounting__branch__ffacdb_idx'),
+        ('actors', '0002_initial'),
+        ('master', '0001_initial'),
+        ('operations', '0003_shipment_operations__branch__bbf747_idx_and_more'),
+        ('sales', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['branch', 'created', 'id'], name='sales_sales_branch__3ae345_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['created', 'id'], name='sales_sales_created_5b3396_idx'),
+        ),
+    ]
@@ -81,6 +81,8 @@ class Sales(TransactionBasedBranchScopedStampedOwnedActive):
     paid_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)
     balance_due = models.DecimalField(max_digits=20, decimal_places=2, default=0)
 
+    search_index_fields = ("no", "reference", "po_number")
+
     class Meta:
         ordering = ["-created", "-id"]
         constraints = [
@@ -89,7 +91,13 @@ class Sales(TransactionBasedBranchScopedStampedOwnedActive):
             models.CheckConstraint(check=Q(paid_amount__gte=0), name="sales_paid_non_negative"),
             models.CheckConstraint(check=Q(balance_due__gte=0), name="sales_balance_non_negative"),
         ]
-        indexes = [models.Index(fields=["no"]), models.Index(fields=["customer"])]
+        indexes = [
+            models.Index(fields=["no"]),
+            models.Index(fields=["customer"]),
+            # the keyset-paginated list: ?branch= / all branches, newest first
+            models.Index(fields=["branch", "created", "id"]),
+            models.Index(fields=["created", "id"]),
+        ]
 
     def __str__(self):
         return f"Invoice {self.no or self.id} - {self.customer}"
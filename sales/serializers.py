@@ -1,18 +1,23 @@
 from django.db import transaction
 from rest_framework import serializers
 
+from core.utils.AdaptedBulkListSerializer import DynamicFieldsMixin
+from core.utils.referenceCacheAPI import ReferenceRelatedField
+
 from .models import Sales, SalesItem, CustomerPayment, CustomerPaymentItems
 
 
-class SalesItemSerializer(serializers.ModelSerializer):
+class SalesItemSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SalesItem
         fields = "__all__"
         read_only_fields = ("id",)
 
 
-class SalesSerializer(serializers.ModelSerializer):
+class SalesSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     items = SalesItemSerializer(many=True, required=False)
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {"currency": "accounting.serializers.CurrencySerializer", "customer": "actors.serializers.CustomerSerializer"}
 
     class Meta:
         model = Sales
@@ -70,15 +75,17 @@ class SalesSerializer(serializers.ModelSerializer):
         return instance
 
 
-class CustomerPaymentItemsSerializer(serializers.ModelSerializer):
+class CustomerPaymentItemsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomerPaymentItems
         fields = "__all__"
         read_only_fields = ("id",)
 
 
-class CustomerPaymentSerializer(serializers.ModelSerializer):
+class CustomerPaymentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     allocations = CustomerPaymentItemsSerializer(many=True, required=False)
+    serializer_related_field = ReferenceRelatedField
+    expandable_fields = {"currency": "accounting.serializers.CurrencySerializer", "customer": "actors.serializers.CustomerSerializer"}
 
     class Meta:
         model = CustomerPayment
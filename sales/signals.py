@@ -5,6 +5,11 @@ from django.db import transaction
 from django.db.models.signals import post_save, pre_save
 
 from accounting.models import Accounts
+from actors.models import Customer
+from actors.signals import ensure_main_actor
+from core.utils.outbox import enqueue, outbox_handler
+
+ADJUST_CUSTOMER_BALANCE = "sales.adjust_customer_balance"
 
 
 def _norm(s) -> str:
@@ -45,7 +50,7 @@ def _snapshot_approval_state(instance) -> None:
 
 
 def _adjust_customer_account_balance(customer, delta: Decimal) -> None:
-    if not customer or not getattr(customer, "main_actor", None):
+    if not customer or not ensure_main_actor(customer):
         return
 
     delta = Decimal(delta or 0)
@@ -72,16 +77,25 @@ def _adjust_customer_account_balance(customer, delta: Decimal) -> None:
         account.save(update_fields=["balance", "name", "branch", "active", "source"])
 
 
+@outbox_handler(ADJUST_CUSTOMER_BALANCE)
+def _adjust_customer_balance_event(payload) -> None:
+    customer = Customer.objects.filter(pk=payload["customer_id"]).first()
+    _adjust_customer_account_balance(customer, Decimal(payload["delta"]))
+
+
 def _apply_if_approved(instance, delta: Decimal) -> None:
     is_applied = _should_apply(instance)
     was_applied = bool(getattr(instance, "_was_applied", False))
 
-    customer = getattr(instance, "customer", None) or getattr(instance, "client", None)
+    customer_id = getattr(instance, "customer_id", None) or getattr(instance, "client_id", None)
+    if not customer_id:
+        return
 
+    # Written with the document; the worker applies it exactly once.
     if is_applied and not was_applied:
-        transaction.on_commit(lambda: _adjust_customer_account_balance(customer, Decimal(delta)))
+        enqueue(ADJUST_CUSTOMER_BALANCE, {"customer_id": customer_id, "delta": str(Decimal(delta))})
     elif was_applied and not is_applied:
-        transaction.on_commit(lambda: _adjust_customer_account_balance(customer, Decimal(delta) * Decimal("-1")))
+        enqueue(ADJUST_CUSTOMER_BALANCE, {"customer_id": customer_id, "delta": str(Decimal(delta) * Decimal("-1"))})
 
 
 def register_sales_signals() -> None:
@@ -1,3 +1,156 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounting.models import Accounts, ChartofAccounts, Currency
+from actors.models import Customer, MainActor
+from core.models import CustomUser, OutboxEvent
+from core.utils.outbox import claim, process_events
+from sales.signals import ADJUST_CUSTOMER_BALANCE
+from master.models import Branch
+from purchase.models import ExpenseCategory
+from sales.models import Sales
+
+
+def create_customer(branch, currency):
+    return Customer.objects.create(
+        customer_type=Customer.CustomerType.COMPANY,
+        country="AE",
+        address_line_1="Warehouse 1",
+        mobile_country_code="+971",
+        mobile_no="500000000",
+        account=ChartofAccounts.objects.first(),
+        currency=currency,
+        branch=branch,
+    )
+
+
+class InvoiceBalanceTests(TestCase):
+    """Approving an invoice moves the customer's balance under the default OUTBOX settings."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.currency = Currency.objects.create(name="Test Dollar", symbol="T$")
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer = create_customer(self.branch, self.currency)
+            self.invoice = Sales.objects.create(
+                customer=self.customer, currency=self.currency, branch=self.branch, total=Decimal("250.00")
+            )
+
+    def balance(self):
+        account = Accounts.objects.filter(actor__customer=self.customer).first()
+        return account.balance if account else Decimal("0")
+
+    def approve(self, invoice, approved=True):
+        invoice.approved = approved
+        invoice.status = "approved" if approved else "draft"
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.save()
+
+    def test_draft_invoice_leaves_the_balance_alone(self):
+        self.assertEqual(self.balance(), Decimal("0"))
+
+    def test_approving_an_invoice_moves_the_balance(self):
+        self.approve(self.invoice)
+        self.assertEqual(self.balance(), Decimal("250.00"))
+        self.assertFalse(OutboxEvent.objects.exclude(status=OutboxEvent.Status.DONE).exists())
+
+    def test_unapproving_reverses_it(self):
+        self.approve(self.invoice)
+        self.approve(self.invoice, approved=False)
+        self.assertEqual(self.balance(), Decimal("0"))
+
+
+@override_settings(OUTBOX={"INLINE": False})
+class InvoiceBalanceBeforeMainActorTests(TestCase):
+    """The balance event can reach the worker before the customer's queued MainActor upsert."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.currency = Currency.objects.create(name="Test Dollar", symbol="T$")
+
+    def test_approving_creates_the_missing_main_actor(self):
+        customer = create_customer(self.branch, self.currency)
+        self.assertFalse(MainActor.objects.filter(customer=customer).exists())
+        Sales.objects.create(
+            customer=customer, currency=self.currency, branch=self.branch, total=Decimal("80.00"), status="approved"
+        )
+        events = OutboxEvent.objects.filter(topic=ADJUST_CUSTOMER_BALANCE).values_list("pk", flat=True)
+        self.assertEqual(process_events(claim(ids=list(events))), (1, 0))
+
+        main_actor = MainActor.objects.get(customer=customer)
+        self.assertEqual(Accounts.objects.get(actor=main_actor).balance, Decimal("80.00"))
+
+
+class SparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.filter(is_main_branch=True).first()
+        cls.user = CustomUser.objects.create_superuser(username="sparse", email="sparse@example.invalid", branch=cls.branch)
+        cls.currency = Currency.objects.create(name="Test Dollar", symbol="T$")
+        customer = create_customer(cls.branch, cls.currency)
+        cls.invoices = [
+            Sales.objects.create(customer=customer, currency=cls.currency, branch=cls.branch, reference=f"sparse-{i}")
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, params=None):
+        response = self.client.get("/sales/sales/", params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_without_params_the_shape_is_unchanged(self):
+        rows = self.get()
+        self.assertEqual(len(rows), 3)
+        self.assertIn("items", rows[0])
+        # relations stay ids
+        self.assertEqual(rows[0]["currency"], self.currency.pk)
+
+    def test_fields_trims_the_rows(self):
+        rows = self.get({"fields": "id,reference"})
+        self.assertEqual([set(row) for row in rows], [{"id", "reference"}] * 3)
+
+    def expanded(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.get({"fields": "id,currency.symbol", "expand": "currency"})
+        return rows, len(queries.captured_queries)
+
+    def test_expand_nests_a_relation_without_a_query_per_row(self):
+        rows, three = self.expanded()
+        self.assertEqual([row["currency"] for row in rows], [{"symbol": "T$"}] * 3)
+        for invoice in self.invoices:
+            Sales.objects.create(customer=invoice.customer, currency=self.currency, branch=self.branch)
+        rows, six = self.expanded()
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(three, six)
+
+    def test_purchase_serializers_take_the_params_too(self):
+        ExpenseCategory.objects.create(name="sparse-category")
+        response = self.client.get("/purchase/api/expense-categories/", {"fields": "name"})
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()
+        self.assertTrue(rows)
+        self.assertTrue(all(set(row) == {"name"} for row in rows))
+
+    def test_only_listed_relations_expand(self):
+        Sales.objects.filter(pk__in=[invoice.pk for invoice in self.invoices]).update(user_add=self.user)
+        rows = self.get({"fields": "id,user_add", "expand": "user_add"})
+        for row in rows:
+            # stays an id: the user row (password hash, permissions) is never rendered
+            self.assertEqual(row["user_add"], self.user.pk)
+        self.assertNotIn(self.user.password, str(rows))
+
+    def test_expanded_relations_render_with_their_serializer(self):
+        rows = self.get({"fields": "id,customer.mobile_no", "expand": "customer"})
+        self.assertEqual([row["customer"] for row in rows], [{"mobile_no": "500000000"}] * 3)
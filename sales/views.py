@@ -1,11 +1,17 @@
 from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.utils.BaseModelViewSet import SparseFieldsetMixin
+from core.utils.ConditionalGet import ConditionalGetMixin
+from core.utils.dbRouting import ReplicaReadMixin
+from core.utils.searchIndexAPI import IndexedSearchFilter
+from core.utils.StreamingExport import StreamingExportMixin
+
 from .models import Sales, SalesItem, CustomerPayment, CustomerPaymentItems
 from .serializers import (
     SalesSerializer,
@@ -21,9 +27,9 @@ from .filters import (
 )
 
 
-class BaseModelViewSet(viewsets.ModelViewSet):
+class BaseModelViewSet(ReplicaReadMixin, ConditionalGetMixin, SparseFieldsetMixin, StreamingExportMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
 
 
 class SalesViewSet(BaseModelViewSet):
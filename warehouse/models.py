@@ -101,6 +101,8 @@ class HandlingUnit(BranchScopedStampedOwnedActive):
     barcode = models.CharField(max_length=80, null=True, blank=True)
     user_add = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, null=True, blank=True, editable=False, default=get_current_user, related_name="hu_user_add")
 
+    search_index_fields = ("hu_code", "barcode", "container_no", "seal_no")
+
     def __str__(self):
         return self.hu_code
 
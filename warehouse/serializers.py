@@ -3,7 +3,8 @@ from __future__ import annotations
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework_bulk import BulkListSerializer, BulkSerializerMixin
-from core.utils.AdaptedBulkListSerializer import AdaptedBulkListSerializer
+from core.utils.AdaptedBulkListSerializer import AdaptedBulkListSerializer, DynamicFieldsMixin
+from core.utils.referenceCacheAPI import ReferenceRelatedField
 from operations.models import ShipmentPackages
 from warehouse.models import (
     Warehouse, Zone, Location, HandlingUnit,
@@ -15,12 +16,14 @@ from warehouse.models import (
 User = get_user_model()
 
 
-class BulkStampedModelSerializer(BulkSerializerMixin, serializers.ModelSerializer):
+class BulkStampedModelSerializer(DynamicFieldsMixin, BulkSerializerMixin, serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
     created = serializers.DateTimeField(read_only=True)
     updated = serializers.DateTimeField(read_only=True)
     user_add = serializers.PrimaryKeyRelatedField(read_only=True)
 
+    serializer_related_field = ReferenceRelatedField
+
     class Meta:
         list_serializer_class = BulkListSerializer
         update_lookup_field = "id"
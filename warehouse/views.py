@@ -27,6 +27,7 @@ from warehouse.models import (
 )
 
 from core.utils.BaseModelViewSet import BaseModelViewSet
+from core.utils.KeysetPagination import PagedKeysetPagination
 
 def _as_list(x):
     return x if isinstance(x, list) else [x]
@@ -131,6 +132,7 @@ class InventoryMoveViewSet(BaseModelViewSet):
     serializer_class = InventoryMoveSerializer
     filterset_class = InventoryMoveFilter
     search_fields = ("ref", "note")
+    pagination_class = PagedKeysetPagination
 
 
 class CycleCountViewSet(BaseModelViewSet):